@@ -0,0 +1,189 @@
+import numpy as np
+
+import engine
+
+# ==========================================
+# 몬테카를로 결과 스트리밍 집계 (모든 경로를 메모리에 두지 않음)
+# ==========================================
+# - 고정 구간 히스토그램: 경로 chunk 가 나올 때마다 개수만 누적하므로 메모리는 구간 수에만 비례
+# - 같은 구간 경계(edges)를 쓰는 집계끼리는 merge 로 합칠 수 있음 (작업자별 부분 결과 병합)
+# - 구간 밖 값은 양 끝의 underflow/overflow 칸에 넣고 실제 최솟값/최댓값을 따로 기록
+# - 분위수는 누적 개수를 구간 안에서 선형 보간 (오차는 구간 폭 이내)
+
+DEFAULT_BINS = 1024
+
+
+def histogram(edges):
+    edges = np.asarray(edges, dtype=float)
+    return {
+        "edges": edges,
+        "counts": np.zeros(len(edges) + 1, dtype=np.int64),
+        "nan": 0,
+        "min": np.inf,
+        "max": -np.inf,
+    }
+
+
+def histogram_update(hist, values):
+    values = np.asarray(values, dtype=float).ravel()
+    finite = values[~np.isnan(values)]
+    hist["nan"] += values.size - finite.size
+    if finite.size:
+        idx = np.searchsorted(hist["edges"], finite, side="right")
+        hist["counts"] += np.bincount(idx, minlength=len(hist["counts"]))
+        hist["min"] = min(hist["min"], finite.min())
+        hist["max"] = max(hist["max"], finite.max())
+    return hist
+
+
+def histogram_merge(a, b):
+    if not np.array_equal(a["edges"], b["edges"]):
+        raise ValueError("구간 경계가 다른 히스토그램은 합칠 수 없습니다.")
+    return {
+        "edges": a["edges"],
+        "counts": a["counts"] + b["counts"],
+        "nan": a["nan"] + b["nan"],
+        "min": min(a["min"], b["min"]),
+        "max": max(a["max"], b["max"]),
+    }
+
+
+def _interpolate_quantiles(counts, lower, upper, qs):
+    # counts/lower/upper: (..., 칸 수), qs: 백분위(0~100) → (len(qs), ...)
+    cdf = np.cumsum(counts, axis=-1)
+    total = cdf[..., -1:]
+    out = []
+    for q in np.atleast_1d(qs):
+        target = np.maximum(q / 100 * total, 1e-12)
+        pick = np.argmax(cdf >= target, axis=-1)[..., None]
+        before = np.take_along_axis(cdf, pick, axis=-1) - np.take_along_axis(counts, pick, axis=-1)
+        in_bin = np.take_along_axis(counts, pick, axis=-1)
+        frac = np.clip((target - before) / np.maximum(in_bin, 1), 0, 1)
+        lo = np.take_along_axis(lower, pick, axis=-1)
+        hi = np.take_along_axis(upper, pick, axis=-1)
+        value = lo + frac * (hi - lo)
+        out.append(np.where(total > 0, value, np.nan)[..., 0])
+    return np.array(out)
+
+
+def histogram_quantile(hist, qs):
+    edges = hist["edges"]
+    lower = np.concatenate([[hist["min"]], edges])
+    upper = np.concatenate([edges, [hist["max"]]])
+    # 실제 최솟값/최댓값으로 양 끝 칸을 좁힘
+    lower = np.clip(lower, hist["min"], hist["max"])
+    upper = np.clip(upper, hist["min"], hist["max"])
+    return _interpolate_quantiles(hist["counts"], lower, upper, qs)
+
+
+def monthly_histogram(n_months, edges):
+    # 월별 히스토그램 (월 × 칸) - 팬 차트(분위수 밴드)용
+    edges = np.asarray(edges, dtype=float)
+    return {
+        "edges": edges,
+        "counts": np.zeros((int(n_months), len(edges) + 1), dtype=np.int64),
+        "min": np.full(int(n_months), np.inf),
+        "max": np.full(int(n_months), -np.inf),
+    }
+
+
+def monthly_histogram_update(hist, values):
+    # values: (경로 수, 월 수)
+    values = np.asarray(values, dtype=float)
+    n_months, n_bins = hist["counts"].shape
+    idx = np.searchsorted(hist["edges"], values, side="right")
+    flat = idx + n_bins * np.arange(n_months)[None, :]
+    hist["counts"] += np.bincount(flat.ravel(), minlength=n_months * n_bins).reshape(n_months, n_bins)
+    hist["min"] = np.minimum(hist["min"], values.min(axis=0))
+    hist["max"] = np.maximum(hist["max"], values.max(axis=0))
+    return hist
+
+
+def monthly_histogram_merge(a, b):
+    if not np.array_equal(a["edges"], b["edges"]):
+        raise ValueError("구간 경계가 다른 히스토그램은 합칠 수 없습니다.")
+    return {
+        "edges": a["edges"],
+        "counts": a["counts"] + b["counts"],
+        "min": np.minimum(a["min"], b["min"]),
+        "max": np.maximum(a["max"], b["max"]),
+    }
+
+
+def monthly_histogram_quantile(hist, qs):
+    # → (len(qs), 월 수)
+    edges = hist["edges"]
+    n_months = hist["counts"].shape[0]
+    lo_m, hi_m = hist["min"][:, None], hist["max"][:, None]
+    lower = np.concatenate([lo_m, np.broadcast_to(edges, (n_months, len(edges)))], axis=1)
+    upper = np.concatenate([np.broadcast_to(edges, (n_months, len(edges))), hi_m], axis=1)
+    lower = np.clip(lower, lo_m, hi_m)
+    upper = np.clip(upper, lo_m, hi_m)
+    return _interpolate_quantiles(hist["counts"], lower, upper, qs)
+
+
+def pilot_edges(values, bins=DEFAULT_BINS, margin=0.5):
+    # 시범 chunk 의 값 범위를 margin 만큼 넓혀 고정 구간 경계 생성
+    values = np.asarray(values, dtype=float)
+    values = values[np.isfinite(values)]
+    if values.size == 0:
+        return np.linspace(-1.0, 1.0, bins + 1)
+    lo, hi = values.min(), values.max()
+    span = hi - lo if hi > lo else max(abs(hi), 1.0)
+    return np.linspace(lo - margin * span, hi + margin * span, bins + 1)
+
+
+# ==========================================
+# 위험 지표 집계기 (월별 잔고 밴드, 최저 잔고 분포, 회수 월 분포, 경로별 지표 분포)
+# ==========================================
+def risk_aggregator(n_months, balance_edges, metric_edges):
+    return {
+        "balance": monthly_histogram(n_months, balance_edges),
+        "metrics": {k: histogram(e) for k, e in metric_edges.items()},
+        # 회수 월: 0 = 처음부터 흑자, 1..M = 해당 월부터 흑자 유지, M+1 = 기간 내 미회수
+        "payback": np.zeros(int(n_months) + 2, dtype=np.int64),
+        "negative_paths": 0,
+        "n_paths": 0,
+    }
+
+
+def risk_aggregator_from_pilot(metrics, balance, bins=DEFAULT_BINS):
+    balance = np.asarray(balance)
+    return risk_aggregator(
+        balance.shape[-1],
+        pilot_edges(balance, bins),
+        {k: pilot_edges(v, bins) for k, v in metrics.items()},
+    )
+
+
+def risk_update(agg, metrics, balance):
+    balance = np.asarray(balance)
+    monthly_histogram_update(agg["balance"], balance)
+    for key, hist in agg["metrics"].items():
+        histogram_update(hist, metrics[key])
+    months = engine.payback_month(balance)
+    agg["payback"] += np.bincount(months, minlength=len(agg["payback"]))
+    agg["negative_paths"] += int((balance.min(axis=-1) < 0).sum())
+    agg["n_paths"] += balance.shape[0]
+    return agg
+
+
+def risk_merge(a, b):
+    return {
+        "balance": monthly_histogram_merge(a["balance"], b["balance"]),
+        "metrics": {k: histogram_merge(a["metrics"][k], b["metrics"][k]) for k in a["metrics"]},
+        "payback": a["payback"] + b["payback"],
+        "negative_paths": a["negative_paths"] + b["negative_paths"],
+        "n_paths": a["n_paths"] + b["n_paths"],
+    }
+
+
+def risk_summary(agg, percentiles=(5, 50, 95)):
+    n = max(agg["n_paths"], 1)
+    summary = {k: dict(zip(percentiles, histogram_quantile(h, percentiles))) for k, h in agg["metrics"].items()}
+    summary["balance_bands"] = dict(zip(percentiles, monthly_histogram_quantile(agg["balance"], percentiles)))
+    summary["prob_negative_balance"] = agg["negative_paths"] / n
+    summary["payback_distribution"] = agg["payback"] / n
+    summary["prob_no_payback"] = agg["payback"][-1] / n
+    summary["n_paths"] = agg["n_paths"]
+    return summary
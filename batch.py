@@ -0,0 +1,115 @@
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+import engine
+import portfolio
+import scenarios
+
+# ==========================================
+# 시나리오 파일 일괄 평가 (명령행, Streamlit 없이 실행)
+# ==========================================
+# 사용 예:
+#   python batch.py sites.csv -o results.csv
+#   python batch.py sites.parquet -o results.parquet --schedules schedules.csv --method monthly
+#
+# - 입력 파일의 각 행이 시나리오 하나입니다. p10.py 변수 이름(scenarios.P10_DEFAULTS)과 같은 열만
+#   모델 입력으로 쓰고, 나머지 열(사이트명 등)은 결과에 그대로 남깁니다. 없는 변수는 기본값을 씁니다.
+# - 결과: 입력 열 + 지표 열 (scenarios.p10_evaluate 와 동일)
+# - --schedules: 시나리오별 월별 현금흐름 (scenario, month 기준 긴 형식). CSV 는 chunk 단위로 이어 씁니다.
+#   --exact 반올림방식 을 주면 정산용 정수 원 모드 (deal.Deal.exact): 금액·잔고 열이 int64 원 단위이고
+#   고정 지급 단계의 끝전은 단계 마지막 달에 정산합니다. 결과 지표 파일은 그대로 실수 계산입니다.
+# - --portfolio: 모든 행을 사이트로 보고 설치 시점(install_month / install_date)만큼 밀어 합산한
+#   포트폴리오 월별 현금흐름 (portfolio.py). 포트폴리오 지표는 표준 오류 출력으로 보여줍니다.
+# - 파일 형식은 확장자로 구분합니다 (.csv / .parquet, .pq). Parquet 은 pyarrow 가 필요합니다.
+
+SCHEDULE_KEYS = ("phase", "revenue", "opex", "op_profit", "principal", "investor", "company", "balance")
+PARQUET_EXTENSIONS = (".parquet", ".pq")
+
+
+def _is_parquet(path):
+    return os.path.splitext(path)[1].lower() in PARQUET_EXTENSIONS
+
+
+def read_table(path):
+    return pd.read_parquet(path) if _is_parquet(path) else pd.read_csv(path)
+
+
+def write_table(table, path):
+    if _is_parquet(path):
+        table.to_parquet(path, index=False)
+    else:
+        table.to_csv(path, index=False)
+
+
+def schedule_frame(params, offset=0, rounding=None):
+    # 시나리오 chunk → 긴 형식 월별 스케줄 (각 시나리오의 기간까지만)
+    col, sched, _ = scenarios.p10_schedule(params, rounding=rounding)
+    n_scenarios = col["simulation_years"].shape[0]
+    months = sched["month"]
+    active = months[None, :] <= col["simulation_years"] * 12
+    rows, month_idx = np.nonzero(active)
+
+    frame = {"scenario": rows + offset, "month": months[month_idx]}
+    for key in SCHEDULE_KEYS:
+        values = np.broadcast_to(sched[key], (n_scenarios, len(months)))
+        frame[key] = values[rows, month_idx]
+    return pd.DataFrame(frame)
+
+
+def write_schedules(table, path, base=None, chunk_size=scenarios.DEFAULT_CHUNK_SIZE, rounding=None):
+    # CSV 는 chunk 마다 이어 써서 전체 (시나리오 × 월) 표를 메모리에 두지 않음
+    params = {c: table[c].to_numpy() for c in table.columns if c in scenarios.P10_DEFAULTS}
+    parquet = _is_parquet(path)
+    parts = []
+    for start in range(0, len(table), chunk_size):
+        chunk = {k: v[start:start + chunk_size] for k, v in params.items()}
+        frame = schedule_frame({**(base or {}), **chunk}, offset=start, rounding=rounding)
+        if parquet:
+            parts.append(frame)
+        else:
+            frame.to_csv(path, index=False, mode="w" if start == 0 else "a", header=start == 0)
+    if parquet and parts:
+        pd.concat(parts, ignore_index=True).to_parquet(path, index=False)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="EV 충전 투자 시나리오 일괄 평가 (p10 모델)")
+    parser.add_argument("scenarios", help="시나리오 파일 (.csv / .parquet)")
+    parser.add_argument("-o", "--output", required=True, help="결과 지표 파일 (.csv / .parquet)")
+    parser.add_argument("--schedules", help="월별 현금흐름 파일 (생략하면 저장하지 않음)")
+    parser.add_argument("--portfolio", help="포트폴리오 월별 현금흐름 파일 (생략하면 계산하지 않음)")
+    parser.add_argument("--method", choices=("monthly", "closed_form"), default="monthly",
+                        help="closed_form 은 IRR 없이 구간 합으로 빠르게 계산")
+    parser.add_argument("--chunk-size", type=int, default=scenarios.DEFAULT_CHUNK_SIZE,
+                        help="한 번에 계산하는 시나리오 수")
+    parser.add_argument("--exact", choices=tuple(engine.ROUNDING),
+                        help="월별 현금흐름을 정수 원 단위로 정산 (원 미만 반올림 방식)")
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    table = read_table(args.scenarios)
+    if table.empty:
+        print("시나리오가 없습니다.", file=sys.stderr)
+        return 1
+
+    results = scenarios.evaluate_rows(table, chunk_size=args.chunk_size, method=args.method)
+    write_table(results, args.output)
+    if args.schedules:
+        write_schedules(table, args.schedules, chunk_size=args.chunk_size, rounding=args.exact)
+    if args.portfolio:
+        result = portfolio.evaluate(table, chunk_size=args.chunk_size)
+        write_table(result["monthly"], args.portfolio)
+        for key, value in result["metrics"].items():
+            print(f"{key}: {value:,.4f}" if isinstance(value, float) else f"{key}: {value:,}", file=sys.stderr)
+
+    print(f"{len(table):,}개 시나리오 평가 완료 ({time.perf_counter() - started:.2f}초)", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
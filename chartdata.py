@@ -0,0 +1,96 @@
+import numpy as np
+import pandas as pd
+
+# ==========================================
+# 차트용 데이터 축소 - 브라우저로 보내기 전에 서버에서 점 수를 제한
+# ==========================================
+# 사용 예:
+#   chart_df = chartdata.downsample(df, "누적월", ["회사_누적현금"])               # 선 → LTTB, MAX_POINTS 점 이하
+#   chart_df = chartdata.downsample(df, "누적월", ["회사수익"], method="minmax")   # 급변 값 → 구간별 최소·최대
+#   yearly = chartdata.yearly_rollup(df, "누적월", sums=["회사수익"], lasts=["회사_누적현금"])
+#
+# - 반환 행 수는 원본 크기와 관계없이 max_points 이하입니다. 원본이 그보다 작으면 그리는 열만 남기고 그대로.
+# - lttb (Largest-Triangle-Three-Buckets): 첫·끝 점은 두고, 구간마다 (앞에서 고른 점, 다음 구간 평균) 과
+#   만드는 삼각형이 가장 큰 점을 고릅니다. 꺾이는 지점(원금 상환 달의 계단 등)이 남아 선 모양이 유지됩니다.
+#   LTTB 가 건너뛸 수 있는 전체 최솟값·최댓값 행은 따로 남깁니다.
+# - minmax: 첫·끝 점 + 구간마다 최솟값·최댓값 두 점. 마이너스 구간이나 짧은 급락을 놓치면 안 되는 값에 씁니다.
+# - 여러 열은 열마다 max_points / 열 수 만큼 골라 합칩니다 (모든 열이 같은 x 행을 공유).
+
+MAX_POINTS = 500
+MAX_MONTHLY_BARS = 120      # 이보다 긴 기간의 월별 막대는 연 단위로 묶음
+METHODS = ("lttb", "minmax")
+
+
+def lttb_indices(x, y, n_out):
+    # 남길 행 번호 (오름차순, n_out 개)
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    n = len(x)
+    if n_out >= n:
+        return np.arange(n)
+    if n_out < 3:
+        return np.array([0, n - 1])[:max(n_out, 0)]
+
+    # 첫·끝 점을 뺀 가운데를 n_out - 2 개 구간으로
+    edges = np.linspace(1, n - 1, n_out - 1).astype(int)
+    selected = np.empty(n_out, dtype=np.int64)
+    selected[0], selected[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        if i == n_out - 3:
+            next_x, next_y = x[-1], y[-1]
+        else:
+            next_x, next_y = x[hi:edges[i + 2]].mean(), y[hi:edges[i + 2]].mean()
+        area = np.abs((x[a] - next_x) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (next_y - y[a]))
+        a = lo + int(np.argmax(area))
+        selected[i + 1] = a
+    return selected
+
+
+def minmax_indices(y, n_buckets):
+    # 첫·끝 행 + 구간별 최솟값·최댓값 행 번호 (오름차순, 최대 2 × n_buckets + 2 개)
+    y = np.asarray(y, dtype=float)
+    n = len(y)
+    if 2 * n_buckets + 2 >= n:
+        return np.arange(n)
+    bucket = np.arange(n) * n_buckets // n
+    order = np.lexsort((y, bucket))
+    starts = np.searchsorted(bucket[order], np.arange(n_buckets))
+    ends = np.append(starts[1:], n)
+    return np.unique(np.concatenate([[0, n - 1], order[starts], order[ends - 1]]))
+
+
+def downsample(frame, x, columns, max_points=MAX_POINTS, method="lttb"):
+    # x + columns 열만, max_points 행 이하로 (x 오름차순 가정)
+    if method not in METHODS:
+        raise ValueError(f"지원하지 않는 축소 방식: {method}")
+    columns = list(columns)
+    frame = frame[[x, *columns]]
+    if len(frame) <= max_points:
+        return frame.reset_index(drop=True)
+
+    per_column = max(max_points // len(columns), 4)
+    xs = frame[x].to_numpy()
+    parts = []
+    for c in columns:
+        y = frame[c].to_numpy()
+        if method == "lttb":
+            parts += [lttb_indices(xs, y, per_column - 2), [np.argmin(y), np.argmax(y)]]
+        else:
+            parts.append(minmax_indices(y, (per_column - 2) // 2))
+    return frame.iloc[np.unique(np.concatenate(parts))].reset_index(drop=True)
+
+
+def yearly_rollup(frame, month, sums=(), lasts=(), mins=()):
+    # 월별 표 → 연 단위 (년차, 그 해 마지막 월, 합계 / 연말 값 / 연중 최솟값)
+    year = (frame[month].to_numpy() - 1) // 12 + 1
+    grouped = frame.groupby(year, sort=True)
+    result = pd.DataFrame({"년차": grouped[month].size().index, month: grouped[month].max().to_numpy()})
+    for name in sums:
+        result[name] = grouped[name].sum().to_numpy()
+    for name in lasts:
+        result[name] = grouped[name].last().to_numpy()
+    for name in mins:
+        result[name] = grouped[name].min().to_numpy()
+    return result
@@ -0,0 +1,106 @@
+import numpy as np
+
+import irr
+
+# ==========================================
+# 구간별 상수 현금흐름의 닫힌 형태(closed-form) 평가
+# ==========================================
+# 모든 모델에서 월 현금흐름은 구간(프로모션/정상, 1·2·3단계, 원금 상환월) 안에서 일정합니다.
+# 구간마다 대표월 하나만 엔진으로 계산하고 등비급수로 합산하므로,
+# 월별 배열을 만들지 않고 O(구간 수) 로 합계·NPV·ROI·최저 잔고를 구합니다.
+
+FLOW_KEYS = ("revenue", "opex", "op_profit", "principal", "investor", "company")
+
+
+def segments(breakpoints, total_months):
+    # 경계 월 목록 → (구간 시작 월 - 1, 구간 길이). 각 구간은 (start, start + length] 월
+    # 경계 배열마다 마지막 축(경계 개수)은 그대로 두고 앞쪽(시나리오) 축만 맞춤
+    points = [np.atleast_1d(np.asarray(b)) for b in breakpoints]
+    lead = np.broadcast_shapes(*[p.shape[:-1] for p in points])
+    points = [np.broadcast_to(p, lead + p.shape[-1:]) for p in points]
+    inner = np.clip(np.sort(np.concatenate(points, axis=-1), axis=-1), 0, total_months)
+    zero = np.zeros_like(inner[..., :1])
+    edges = np.concatenate([zero, inner, zero + total_months], axis=-1)
+    return edges[..., :-1], np.diff(edges, axis=-1)
+
+
+def discount_weights(starts, lengths, rate, first_period=1):
+    # 구간 (a, a+L] 의 할인계수 합: Σ_{m=a+1}^{a+L} v^(m - 1 + first_period), v = 1/(1+r)
+    rate = np.asarray(rate, dtype=float)
+    v = 1 / (1 + rate)
+    head = v ** (starts + first_period)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        series = np.where(rate == 0, lengths, (1 - v ** lengths) / (1 - np.where(rate == 0, 0.5, v)))
+    return head * series
+
+
+def segment_flows(deal, total_months, **params):
+    # → (구간 시작 월 - 1, 구간 길이, 구간 대표월 현금흐름, 유효 구간 여부)
+    breakpoints = deal.breakpoints(**params)
+    starts, lengths = segments(breakpoints, total_months)
+    return starts, lengths, deal.flows(starts + 1, **params), lengths > 0
+
+
+def evaluate(deal, total_months, rate=0.0, initial_balance=0.0, first_period=1, **params):
+    # deal: deal.Deal (deal.P10 등), 구간 경계와 월 현금흐름을 딜에서 가져옴
+    # 반환: {"total": {항목: 합계}, "npv": {항목: 할인합}, "min_balance", "final_balance"}
+    # first_period: 1 이면 1개월차를 1기 할인 (0시점 값을 앞에 붙이는 p10.py/profit.py 방식),
+    #               0 이면 1개월차를 할인하지 않음 (p5.py/profit2.py 의 npf.npv 사용 방식)
+    starts, lengths, flows, live = segment_flows(deal, total_months, **params)
+    weights = discount_weights(starts, lengths, rate, first_period)
+    total = {}
+    npv = {}
+    for key in FLOW_KEYS:
+        if key in flows:
+            value = np.where(live, flows[key], 0)
+            total[key] = (value * lengths).sum(axis=-1)
+            npv[key] = (value * weights).sum(axis=-1)
+
+    # 누적 잔고는 구간 안에서 선형 → 최저값은 각 구간의 첫 달 또는 마지막 달
+    company = np.where(live, flows["company"], 0)
+    end_balance = initial_balance + np.cumsum(company * lengths, axis=-1)
+    first_balance = end_balance - company * (lengths - 1)
+    candidates = np.where(live, np.minimum(first_balance, end_balance), np.inf)
+
+    return {
+        "total": total,
+        "npv": npv,
+        "min_balance": candidates.min(axis=-1),
+        "final_balance": end_balance[..., -1],
+    }
+
+
+# 월 IRR 이분법 범위 (월 -50% ~ +100%, 이 범위 밖은 해 없음으로 처리)
+IRR_BRACKET = (-0.5, 1.0)
+IRR_ITERATIONS = 64
+
+
+def irr_monthly(deal, total_months, initial_outflow, key="investor", **params):
+    # 0시점 -initial_outflow 후 월 현금흐름이 모두 0 이상인 경우(투자자 현금흐름)의 월 IRR
+    # 부호가 한 번만 바뀌어 NPV 가 할인율에 대해 단조 감소하므로, 구간 합 NPV 로 이분법 (월별 배열 없음)
+    # 반환: (월 IRR, 상태 코드 - irr.IRR_OK / irr.IRR_NO_ROOT)
+    starts, lengths, flows, live = segment_flows(deal, total_months, **params)
+    value = np.where(live, flows[key], 0)
+    initial = np.asarray(initial_outflow, dtype=float).reshape(value.shape[:-1])
+
+    def npv(rate):
+        return (value * discount_weights(starts, lengths, rate[..., None], 1)).sum(axis=-1) - initial
+
+    lo = np.full(initial.shape, IRR_BRACKET[0])
+    hi = np.full(initial.shape, IRR_BRACKET[1])
+    has_root = (npv(lo) >= 0) & (npv(hi) <= 0) & (initial > 0)
+    for _ in range(IRR_ITERATIONS):
+        mid = 0.5 * (lo + hi)
+        positive = npv(mid) > 0
+        lo = np.where(positive, mid, lo)
+        hi = np.where(positive, hi, mid)
+    rate = np.where(has_root, 0.5 * (lo + hi), np.nan)
+    status = np.where(has_root, irr.IRR_OK, irr.IRR_NO_ROOT).astype(np.int8)
+    return rate, status
+
+
+def roi(total_return, initial_investment):
+    # (총 현금흐름 / 초기 투자액) × 100, 초기 투자액이 0 이하이면 0
+    initial_investment = np.asarray(initial_investment, dtype=float)
+    safe = np.where(initial_investment > 0, initial_investment, 1)
+    return np.where(initial_investment > 0, total_return / safe * 100, 0)
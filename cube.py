@@ -0,0 +1,171 @@
+import argparse
+import itertools
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+import closed_form
+import deal
+import irr
+import scenarios
+
+# ==========================================
+# 사전 계산 큐브 - p10.py 주요 변수 격자의 지표를 디스크에 저장하고 다선형 보간으로 조회
+# ==========================================
+# 사용 예:
+#   python cube.py -o cube                         # 기본 격자(AXES) 계산 → cube/cube.npy, cube/meta.json
+#   c = cube.open_cube("cube")                     # 메모리 맵으로 열기 (큐브 전체를 읽지 않음)
+#   cube.lookup(c, {"daily_kwh": 23.4, "normal_price": 295})   # 격자 밖이면 None
+#   cube.evaluate(c, params)                       # 격자 안이면 보간, 밖이면 엔진 계산 → (지표 dict, 보간 여부)
+#
+# - 큐브 = AXES 의 모든 조합 × METRICS. 축이 아닌 변수는 계산 시점의 base 값으로 고정되고 meta.json 에 기록됩니다.
+#   조회 시 축이 아닌 변수가 base 와 다르거나 축 값이 격자 범위 밖이면 보간하지 않습니다.
+# - 지표는 closed_form 으로 계산합니다 (투자자 IRR 은 구간 합 이분법). 할인율은 NPV 에만 쓰이므로
+#   할인율 축은 마지막에 두고, 같은 현금흐름의 투자자 IRR 을 할인율마다 다시 계산하지 않습니다.
+# - 조회는 2^(축 수) 개 꼭짓점만 읽습니다 (기본 5개 축 → 32개 행).
+
+AXES = {
+    "daily_kwh": np.arange(0, 60.01, 2.5),
+    "normal_price": np.arange(200, 400.01, 10),
+    "investment_amount": np.arange(0, 5_000_001, 250_000),
+    "p2_share": np.round(np.arange(0, 1.0001, 0.05), 2),
+    "discount_rate_annual": np.round(np.arange(0.01, 0.1501, 0.01), 2),
+}
+RATE_AXIS = "discount_rate_annual"
+METRICS = ("inv_npv", "inv_irr", "inv_roi", "com_npv", "com_roi", "min_balance", "final_balance")
+DEFAULT_CHUNK_SIZE = 32768
+VALUES_FILE = "cube.npy"
+META_FILE = "meta.json"
+
+
+def _chunk_metrics(params, rates):
+    # 할인율 외 변수 chunk → (chunk, 할인율 수, 지표 수)
+    col, total_months, outlay, flow_params = scenarios.p10_inputs(params)
+    investment = col["investment_amount"][:, 0]
+    out = np.empty((len(investment), len(rates), len(METRICS)))
+
+    monthly_irr, _ = closed_form.irr_monthly(deal.P10, total_months, col["investment_amount"], **flow_params)
+    out[:, :, METRICS.index("inv_irr")] = irr.annualize(monthly_irr)[:, None]
+    for j, rate in enumerate(rates):
+        result = closed_form.evaluate(deal.P10, total_months, rate=rate / 12, initial_balance=-outlay,
+                                      first_period=1, **flow_params)
+        com_total = result["total"]["company"] - outlay[:, 0]
+        out[:, j, METRICS.index("inv_npv")] = result["npv"]["investor"] - investment
+        out[:, j, METRICS.index("inv_roi")] = closed_form.roi(result["total"]["investor"] - investment, investment)
+        out[:, j, METRICS.index("com_npv")] = result["npv"]["company"] - outlay[:, 0]
+        out[:, j, METRICS.index("com_roi")] = closed_form.roi(com_total, outlay[:, 0])
+        out[:, j, METRICS.index("min_balance")] = result["min_balance"]
+        out[:, j, METRICS.index("final_balance")] = result["final_balance"]
+    return out
+
+
+def build(path, axes=None, base=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    # 큐브 계산 → path/cube.npy (축 길이..., 지표 수) + path/meta.json
+    axes = {name: np.asarray(values, dtype=float) for name, values in (axes or AXES).items()}
+    for name, values in axes.items():
+        if name not in scenarios.P10_DEFAULTS:
+            raise ValueError(f"지원하지 않는 큐브 축: {name}")
+        if len(values) == 0 or np.any(np.diff(values) <= 0):
+            raise ValueError(f"큐브 축 값은 오름차순이어야 합니다: {name}")
+    base = {k: v for k, v in {**scenarios.P10_DEFAULTS, **(base or {})}.items() if k not in axes}
+
+    # 할인율 축은 마지막으로 (없으면 base 할인율 하나)
+    names = [name for name in axes if name != RATE_AXIS]
+    rates = axes.get(RATE_AXIS, np.array([base.get(RATE_AXIS, scenarios.P10_DEFAULTS[RATE_AXIS])]))
+    shape = tuple(len(axes[name]) for name in names)
+    size = int(np.prod(shape))
+
+    os.makedirs(path, exist_ok=True)
+    values = np.lib.format.open_memmap(os.path.join(path, VALUES_FILE), mode="w+", dtype=np.float64,
+                                       shape=shape + (len(rates), len(METRICS)))
+    flat = values.reshape(size, len(rates), len(METRICS))
+    for start in range(0, size, chunk_size):
+        index = np.unravel_index(np.arange(start, min(start + chunk_size, size)), shape)
+        chunk = {name: axes[name][i] for name, i in zip(names, index)}
+        flat[start:start + len(index[0])] = _chunk_metrics({**base, **chunk}, rates)
+    values.flush()
+    del flat, values
+
+    meta = {
+        "axes": {**{name: axes[name].tolist() for name in names}, RATE_AXIS: np.asarray(rates).tolist()},
+        "metrics": list(METRICS),
+        "base": {k: (v.item() if isinstance(v, np.generic) else v) for k, v in base.items() if k != RATE_AXIS},
+    }
+    with open(os.path.join(path, META_FILE), "w", encoding="utf-8") as f:
+        json.dump(meta, f, ensure_ascii=False, indent=2)
+    return size * len(rates)
+
+
+def open_cube(path):
+    # 메타데이터 + 메모리 맵 배열 (읽는 부분만 디스크에서 가져옴)
+    with open(os.path.join(path, META_FILE), encoding="utf-8") as f:
+        meta = json.load(f)
+    return {
+        "axes": {name: np.asarray(values, dtype=float) for name, values in meta["axes"].items()},
+        "metrics": tuple(meta["metrics"]),
+        "base": meta["base"],
+        "values": np.load(os.path.join(path, VALUES_FILE), mmap_mode="r"),
+    }
+
+
+def lookup(cube, params):
+    # 다선형 보간 → {지표: 값}, 축이 아닌 변수가 base 와 다르거나 격자 밖이면 None
+    p = {**scenarios.P10_DEFAULTS, **params}
+    if any(p.get(name) is not None for name in (*deal.MONTHLY_PARAMS, "start_date")):
+        return None
+    for name, value in cube["base"].items():
+        if not np.isclose(float(p[name]), float(value)):
+            return None
+
+    lo, hi, frac = [], [], []
+    for name, grid in cube["axes"].items():
+        x = float(p[name])
+        if not grid[0] <= x <= grid[-1]:
+            return None
+        i = int(np.clip(np.searchsorted(grid, x, side="right") - 1, 0, max(len(grid) - 2, 0)))
+        j = min(i + 1, len(grid) - 1)
+        lo.append(i)
+        hi.append(j)
+        frac.append(0.0 if j == i else (x - grid[i]) / (grid[j] - grid[i]))
+
+    # 2^d 개 꼭짓점만 읽어 가중합
+    corners = np.array(list(itertools.product((0, 1), repeat=len(lo))))
+    index = tuple(np.where(corners[:, k] == 1, hi[k], lo[k]) for k in range(len(lo)))
+    frac = np.array(frac)
+    weights = np.prod(np.where(corners == 1, frac, 1 - frac), axis=-1)
+    values = np.asarray(cube["values"][index])
+    # 가중치 0 인 꼭짓점은 제외 (격자점 위 조회에서 옆 꼭짓점의 NaN 이 섞이지 않도록)
+    result = np.where(weights[:, None] > 0, weights[:, None] * values, 0.0).sum(axis=0)
+    return {name: float(v) for name, v in zip(cube["metrics"], result)}
+
+
+def evaluate(cube, params):
+    # 큐브 보간, 안 되면 엔진(closed_form + 투자자 IRR) 계산 → (지표 dict, 보간 여부)
+    found = lookup(cube, params) if cube is not None else None
+    # 꼭짓점 값이 NaN 인 지표 (투자액 0 → 투자자 IRR 없음 등) 는 보간 대신 엔진 값으로 채움
+    if found is not None and not np.isnan(list(found.values())).any():
+        return found, True
+    exact = _chunk_metrics(params, [params.get(RATE_AXIS, scenarios.P10_DEFAULTS[RATE_AXIS])])
+    exact = {name: float(v) for name, v in zip(METRICS, exact[0, 0])}
+    if found is None:
+        return exact, False
+    return {name: exact[name] if np.isnan(value) else value for name, value in found.items()}, True
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="p10 사전 계산 큐브 생성")
+    parser.add_argument("-o", "--output", required=True, help="큐브 폴더")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="한 번에 계산하는 조합 수")
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    size = build(args.output, chunk_size=args.chunk_size)
+    print(f"{size:,}개 조합 계산 완료 ({time.perf_counter() - started:.2f}초)", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
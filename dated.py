@@ -0,0 +1,60 @@
+import numpy as np
+
+import irr
+
+# ==========================================
+# 달력 기준 일정 - 실제 날짜·월별 일수와 XNPV / XIRR
+# ==========================================
+# 사용 예:
+#   dates = dated.flow_dates("2025-01-31", 84)      # 0시점(시작일) + 84개월 → 85개 날짜 (1/31 → 2/28 → 3/31 ...)
+#   days = dated.period_days("2025-01-31", 84)      # 월별 실제 일수 (84,) → engine.p10_operating(days_monthly=...)
+#   dated.xnpv(0.05, cash_flows, dates)              # 연 5% XNPV (Excel XNPV 와 같은 정의)
+#   rate, status = dated.xirr(cash_flows, dates)     # 연 XIRR, 상태 코드는 irr.STATUS_LABELS
+#
+# - 월 단위 스케줄의 m개월 차 현금흐름은 시작일에서 m개월 뒤 같은 날에 발생한다고 봅니다.
+#   그 달에 없는 날이면 말일 (1/31 시작 → 2/28, 윤년 2/29). 월 중간 시작도 그대로 반영됩니다.
+# - 시작일 배열 (시나리오 수,) 를 넣으면 결과도 시나리오 축이 붙습니다 (시나리오 수, 날짜 수).
+# - XNPV/XIRR 은 첫 날짜 기준 경과 일수 / 365 를 지수로 씁니다 (Excel 과 같음).
+#   XIRR 은 시점을 월 단위(경과 일수 × 12 / 365)로 바꿔 irr.solve_irr 로 월 수익률을 구한 뒤 연환산합니다.
+#   (1 + 월)^(12 × 일수 / 365) = (1 + 연)^(일수 / 365) 라 같은 해이고, 격자 탐색·상태 코드를 그대로 씁니다.
+# - 이자(1단계)는 계약상 월 이자라 일수와 무관하고, 일수는 월 충전량(일 평균 × 일수)에만 반영됩니다.
+
+DAYS_PER_YEAR = 365.0
+
+
+def flow_dates(start_date, n_months):
+    # 시작일 + 0..n_months 개월 → (..., n_months + 1) datetime64[D]
+    start = np.asarray(start_date, dtype="datetime64[D]")
+    first_month = start.astype("datetime64[M]")
+    day = (start - first_month.astype("datetime64[D]")).astype(int)
+    months = first_month[..., None] + np.arange(n_months + 1)
+    month_days = ((months + 1).astype("datetime64[D]") - months.astype("datetime64[D]")).astype(int)
+    return months.astype("datetime64[D]") + np.minimum(day[..., None], month_days - 1)
+
+
+def period_days(start_date, n_months):
+    # 월별 실제 일수 (..., n_months) - m개월 차 = (m-1)개월 차 날짜 ~ m개월 차 날짜
+    return np.diff(flow_dates(start_date, n_months), axis=-1).astype(float)
+
+
+def year_fractions(dates):
+    # 첫 날짜부터 경과 연수 (경과 일수 / 365)
+    dates = np.asarray(dates, dtype="datetime64[D]")
+    return (dates - dates[..., :1]).astype(float) / DAYS_PER_YEAR
+
+
+def xnpv(rate_annual, cash_flows, dates):
+    # Σ c_i / (1 + 연 할인율)^(경과 일수 / 365) - 시나리오별 할인율 (시나리오 수,) 가능
+    cash_flows = np.asarray(cash_flows, dtype=float)
+    rate = np.asarray(rate_annual, dtype=float)[..., None]
+    return (cash_flows * np.exp(-year_fractions(dates) * np.log1p(rate))).sum(axis=-1)
+
+
+def xirr(cash_flows, dates, guess=None):
+    # 연 XIRR (시나리오 수,) 와 상태 코드. guess 는 이전 해 (연 수익률)
+    dates = np.asarray(dates, dtype="datetime64[D]")
+    months = year_fractions(dates) * 12
+    if guess is not None:
+        guess = np.power(1 + np.asarray(guess, dtype=float), 1 / 12) - 1
+    monthly, status = irr.solve_irr(cash_flows, guess=guess, times=months)
+    return irr.annualize(monthly), status
@@ -0,0 +1,345 @@
+import numpy as np
+
+import engine
+
+# ==========================================
+# 투자 계약 구조(딜) 선언형 정의 → 배열 연산으로 변환
+# ==========================================
+# 딜은 "단계 목록 + 일시 지급 이벤트 + 자금 조달" 을 담은 dict 입니다.
+#   spec = {
+#       "operating": "flat",          # 영업이익 모델 (OPERATING_MODELS 참고)
+#       "phases": [                   # 순서대로 이어지는 단계, 마지막 단계는 months 없이 남은 기간 전체
+#           {"name": "이자", "months": "p1_years", "unit": "years",
+#            "pay": {"rule": "interest", "principal": "investor_amount", "rate": "p1_rate", "rate_unit": "pct"}},
+#           {"name": "배분", "months": "p2_years", "unit": "years",
+#            "pay": {"rule": "share", "pct": "p2_share_pct", "rate_unit": "pct"}},
+#           {"name": "독점"},
+#       ],
+#       "events": [{"rule": "bullet", "amount": "investor_amount", "at_end_of": "이자"}],
+#       "funding": {"raised": "investor_amount", "cost": "project_cost"},   # 초기 잔고 = 조달액 - 사업비
+#       "round": "trunc",             # 월 지급액 원 단위 절사 (생략하면 실수 그대로)
+#   }
+# - 반올림 방식 (round): engine.ROUNDING 의 trunc / floor / ceil / half_up / half_even.
+#   규칙별로 다르게 하려면 "round_rules": {"interest": "half_up", "share": "floor"} 또는 pay 안에 "round".
+#   키는 지급 규칙·이벤트 이름과 "operating"(정수 원 모드의 영업 금액), "funding"(초기 잔고).
+# - 정수 원 모드 ("integer": True, 보통 P5.exact() 로 생성): 모든 금액을 int64 원 단위로 계산합니다.
+#     영업 금액·지급액·일시 지급을 규칙별 방식으로 원 단위로 맞추고, 고정 지급 단계(fixed/interest/level)는
+#     단계 총액을 한 번만 반올림해 (총액 - 월 지급액 × (개월 수 - 1)) 을 단계 마지막 달에 지급합니다.
+#     그래서 단계 총액은 실수 계산의 총액을 반올림한 값과 같고, 매월 차이는 1원 미만 (마지막 달 제외)입니다.
+#     반올림 방식을 정하지 않으면 DEFAULT_INTEGER_ROUNDING.
+# - 값 자리에 문자열을 쓰면 같은 이름의 입력 변수, 숫자를 쓰면 상수입니다.
+#   입력 변수는 스칼라 또는 (시나리오 수, 1) 배열 모두 가능합니다.
+# - 지급 규칙 (pay.rule)
+#     fixed    : 매월 amount
+#     interest : principal × rate / 12
+#     share    : 영업이익이 양수인 달만 영업이익 × pct
+#     level    : principal × (1 + return_pct / 100) 를 단계 기간 동안 균등 지급
+#                (net_of_prior=True 면 앞 단계의 고정 지급 총액을 뺀 나머지)
+#   rate_unit: "fraction"(기본, 0.05) 또는 "pct"(5.0)
+# - 이벤트 (events.rule)
+#     bullet   : amount 를 month(입력 변수) 또는 at_end_of(단계 이름)의 마지막 달에 일시 지급 (0 이하면 없음)
+#
+# 사용 예:
+#   sched = engine.build_schedule(deal.P5.flows, total_months,
+#                                 initial_balance=deal.P5.initial_balance(**params), **params)
+
+# 영업이익 모델: 함수(months, **입력) → {"promo", "op_profit", ...}, 입력 변수 이름, 경계 월 입력
+def flat_operating(months, *, op_promo, op_normal, promo_months):
+    # p5.py / profit.py / profit2.py: 프로모션/정상 월 영업이익 (engine.flat_operating_profit 로 계산한 값)
+    is_promo = months <= promo_months
+    return {"promo": is_promo, "op_profit": np.where(is_promo, op_promo, op_normal)}
+
+
+OPERATING_MODELS = {
+    "p10": (engine.p10_operating, ("promo_months", "promo_price", "normal_price", "daily_kwh", "num_units",
+                                   "kepco_base", "kwh_cost", "monthly_maint", "kwh_cost_monthly", "days_monthly"),
+            "promo_months"),
+    "flat": (flat_operating, ("op_promo", "op_normal", "promo_months"), "promo_months"),
+}
+# 월 축이 있는 입력 (월 수,) 또는 (시나리오, 월 수) - 월별 전력 단가(tou.py), 월별 실제 일수(dated.py)
+MONTHLY_PARAMS = ("kwh_cost_monthly", "days_monthly")
+
+PAY_RULES = ("fixed", "interest", "share", "level")
+EVENT_RULES = ("bullet",)
+FIXED_RULES = ("fixed", "interest", "level")
+DEFAULT_INTEGER_ROUNDING = "trunc"
+
+
+def _value(spec, params):
+    # 문자열 → 입력 변수, 그 외 → 상수
+    return params[spec] if isinstance(spec, str) else spec
+
+
+def _rate(pay, key, params):
+    rate = _value(pay[key], params)
+    return rate / 100 if pay.get("rate_unit", "fraction") == "pct" else rate
+
+
+class Deal:
+    # spec 을 검증해 두고, 월 배열에 대한 지급액/현금흐름 함수를 제공
+    def __init__(self, spec):
+        self.spec = spec
+        self.operating = spec.get("operating", "flat")
+        if self.operating not in OPERATING_MODELS:
+            raise ValueError(f"지원하지 않는 영업이익 모델: {self.operating}")
+        self.phases = list(spec["phases"])
+        self.events = list(spec.get("events", ()))
+        self.rounding = spec.get("round")
+        self.round_rules = dict(spec.get("round_rules", {}))
+        self.integer = bool(spec.get("integer", False))
+        if not self.phases:
+            raise ValueError("단계가 하나 이상 필요합니다.")
+        for policy in [self.rounding, *self.round_rules.values(),
+                       *[phase.get("pay", {}).get("round") for phase in self.phases]]:
+            if policy is not None and policy not in engine.ROUNDING:
+                raise ValueError(f"지원하지 않는 반올림 방식: {policy}")
+
+        names = [phase.get("name", f"{i + 1}단계") for i, phase in enumerate(self.phases)]
+        self.phase_names = names
+        for i, phase in enumerate(self.phases):
+            if "months" not in phase and i != len(self.phases) - 1:
+                raise ValueError(f"기간이 없는 단계는 마지막에만 올 수 있습니다: {names[i]}")
+            pay = phase.get("pay")
+            if pay is not None and pay["rule"] not in PAY_RULES:
+                raise ValueError(f"지원하지 않는 지급 규칙: {pay['rule']}")
+        for event in self.events:
+            if event["rule"] not in EVENT_RULES:
+                raise ValueError(f"지원하지 않는 이벤트: {event['rule']}")
+            if "at_end_of" in event and event["at_end_of"] not in names:
+                raise ValueError(f"없는 단계 이름: {event['at_end_of']}")
+
+    # ------------------------------------------
+    # 단계 경계와 단계별 고정 지급액
+    # ------------------------------------------
+    def phase_ends(self, **params):
+        # 각 단계의 마지막 달 (누적, 마지막 열린 단계는 제외)
+        ends = []
+        end = 0
+        for phase in self.phases:
+            if "months" not in phase:
+                break
+            months = _value(phase["months"], params)
+            end = end + (months * 12 if phase.get("unit", "months") == "years" else months)
+            ends.append(end)
+        return ends
+
+    def _policy(self, rule, spec=None):
+        # 반올림 방식: pay/이벤트의 round → round_rules[규칙] → round → (정수 원 모드 기본값)
+        policy = (spec or {}).get("round") or self.round_rules.get(rule) or self.rounding
+        return policy or (DEFAULT_INTEGER_ROUNDING if self.integer else None)
+
+    def _round(self, values, rule=None, spec=None):
+        policy = self._policy(rule, spec)
+        if self.integer:
+            return engine.settle_won(values, policy)
+        return values if policy is None else engine.ROUNDING[policy](values)
+
+    def exact(self, rounding=None, **rules):
+        # 정수 원 모드 딜 (int64 배열). rounding: 기본 반올림 방식, rules: 규칙별 방식 (interest="half_up" 등)
+        spec = {**self.spec, "integer": True, "round_rules": {**self.round_rules, **rules}}
+        if rounding is not None:
+            spec["round"] = rounding
+        return Deal(spec)
+
+    def _phase_pay(self, **params):
+        # 단계별 (고정 월 지급액, 단계 총액) - share 단계와 지급 없는 단계는 (None, None), 열린 마지막 단계 총액은 None
+        # 정수 원 모드에서는 단계 총액을 따로 반올림 (마지막 달 잔액 정산용)
+        ends = self.phase_ends(**params)
+        result = []
+        paid_before = 0
+        for i, phase in enumerate(self.phases):
+            pay = phase.get("pay")
+            rule = None if pay is None else pay["rule"]
+            length = ends[i] - (ends[i - 1] if i > 0 else 0) if i < len(ends) else None
+            total = None
+            if rule == "fixed":
+                monthly = _value(pay["amount"], params)
+            elif rule == "interest":
+                principal = _value(pay["principal"], params)
+                if pay.get("rate_unit", "fraction") == "pct":
+                    monthly = (principal * (_value(pay["rate"], params) / 100)) / 12
+                else:
+                    monthly = principal * (_value(pay["rate"], params) / 12)
+            elif rule == "level":
+                total = _value(pay["principal"], params) * (1 + _value(pay["return_pct"], params) / 100)
+                if pay.get("net_of_prior"):
+                    total = total - paid_before
+                monthly = np.where(length > 0, total / np.maximum(length, 1), 0)
+            else:
+                result.append((None, None))
+                continue
+            amount = self._round(monthly, rule, pay)
+            if length is not None:
+                if self.integer:
+                    total = np.where(length > 0, self._round(monthly * length if total is None else total, rule, pay), 0)
+                else:
+                    total = amount * length
+                paid_before = paid_before + total
+            result.append((amount, total))
+        return result
+
+    def phase_amounts(self, **params):
+        # 단계별 고정 월 지급액 (영업이익에 따라 달라지는 share 단계와 지급 없는 단계는 None)
+        return [amount for amount, _ in self._phase_pay(**params)]
+
+    def phase_totals(self, **params):
+        # 단계별 고정 지급 총액 (정수 원 모드는 마지막 달 잔액 정산 포함, 열린 마지막 단계는 None)
+        return [total for _, total in self._phase_pay(**params)]
+
+    def initial_balance(self, **params):
+        # 초기 잔고 = 조달액 - 사업비 (funding 이 없으면 0)
+        funding = self.spec.get("funding")
+        if funding is None:
+            return 0
+        balance = _value(funding["raised"], params) - _value(funding["cost"], params)
+        return self._round(balance, "funding") if self.integer else balance
+
+    # ------------------------------------------
+    # 월 배열 연산
+    # ------------------------------------------
+    def payout(self, months, op_profit, **params):
+        # 운영 수익 배분: 단계 코드(1부터) + 월별 투자자 지급액 (일시 지급 제외)
+        ends = self.phase_ends(**params)
+        phase = np.ones(np.broadcast_shapes(np.shape(months), *[np.shape(e) for e in ends]), dtype=np.int8)
+        for end in ends:
+            phase += months > end
+
+        op_investor = np.zeros(np.broadcast_shapes(phase.shape, np.shape(op_profit)),
+                               dtype=np.int64 if self.integer else float)
+        for i, (phase_spec, (amount, total)) in enumerate(zip(self.phases, self._phase_pay(**params))):
+            pay = phase_spec.get("pay")
+            if pay is None:
+                continue
+            if pay["rule"] == "share":
+                value = np.where(op_profit > 0, self._round(op_profit * _rate(pay, "pct", params), "share", pay), 0)
+            elif self.integer and total is not None:
+                # 단계 마지막 달에 잔액 정산
+                length = ends[i] - (ends[i - 1] if i > 0 else 0)
+                value = np.where(months == ends[i], total - amount * (length - 1), amount)
+            else:
+                value = amount
+            op_investor = np.where(phase == i + 1, value, op_investor)
+        return {"phase": phase, "op_investor": op_investor}
+
+    def _event_month(self, event, params):
+        if "at_end_of" in event:
+            return self.phase_ends(**params)[self.phase_names.index(event["at_end_of"])]
+        return _value(event["month"], params)
+
+    def principal(self, months, **params):
+        # 일시 지급 이벤트 합계 (해당 월 0 이하면 지급 없음)
+        total = np.zeros(np.shape(months), dtype=np.int64 if self.integer else float)
+        for event in self.events:
+            month = self._event_month(event, params)
+            amount = _value(event["amount"], params)
+            if self.integer:
+                amount = self._round(amount, event["rule"], event)
+            total = total + np.where((months == month) & (month > 0), amount, 0)
+        return total
+
+    @staticmethod
+    def combine(op_profit, op_investor, principal):
+        # 최종 현금흐름
+        return {
+            "investor": op_investor + principal,
+            "company": (op_profit - op_investor) - principal,
+        }
+
+    def operating_flows(self, months, **params):
+        fn, names, _ = OPERATING_MODELS[self.operating]
+        operating = fn(months, **{k: params[k] for k in names if k in params})
+        if self.integer:
+            # 매출·비용이 있으면 각각 원 단위로 맞추고 영업이익 = 매출 - 비용
+            for key in ("revenue", "opex", "op_profit"):
+                if key in operating:
+                    operating[key] = self._round(operating[key], "operating")
+            if "revenue" in operating and "opex" in operating:
+                operating["op_profit"] = operating["revenue"] - operating["opex"]
+        return operating
+
+    def flows(self, months, **params):
+        # engine.build_schedule 에 넘기는 월별 현금흐름 함수
+        operating = self.operating_flows(months, **params)
+        waterfall = self.payout(months, operating["op_profit"], **params)
+        principal = self.principal(months, **params)
+        return {
+            "phase": waterfall["phase"],
+            **operating,
+            "principal": principal,
+            **self.combine(operating["op_profit"], waterfall["op_investor"], principal),
+        }
+
+    def breakpoints(self, **params):
+        # 월 현금흐름이 바뀔 수 있는 경계 월 (closed_form.py 에서 사용)
+        points = [params[OPERATING_MODELS[self.operating][2]], *self.phase_ends(**params)]
+        for name in MONTHLY_PARAMS:
+            monthly = params.get(name)
+            if monthly is not None:
+                # 월별 값을 쓰면 매월이 경계
+                points.append(np.arange(1, np.shape(monthly)[-1]))
+        if self.integer:
+            # 단계 마지막 달(잔액 정산)은 따로 한 구간
+            points += [end - 1 for end in self.phase_ends(**params)]
+        for event in self.events:
+            month = self._event_month(event, params)
+            points += [month - 1, month]
+        return points
+
+
+# ==========================================
+# 현재 스크립트별 딜
+# ==========================================
+# [p10.py] 이자 → 이익배분 → 회사독점 (+ 선택적 원금 상환, repayment_month = 0 이면 상환 없음)
+P10 = Deal({
+    "operating": "p10",
+    "phases": [
+        {"name": "이자", "months": "p1_years", "unit": "years",
+         "pay": {"rule": "interest", "principal": "investment_amount", "rate": "p1_rate_annual"}},
+        {"name": "배분", "months": "p2_years", "unit": "years",
+         "pay": {"rule": "share", "pct": "p2_share"}},
+        {"name": "독점"},
+    ],
+    "events": [{"rule": "bullet", "amount": "investment_amount", "month": "repayment_month"}],
+})
+
+# [p5.py] 이자 + 1단계 말 원금 일시상환 → 이익배분 → 회사독점 (월 지급액 절사)
+P5 = Deal({
+    "operating": "flat",
+    "phases": [
+        {"name": "이자", "months": "p1_years", "unit": "years",
+         "pay": {"rule": "interest", "principal": "investor_amount", "rate": "p1_rate", "rate_unit": "pct"}},
+        {"name": "배분", "months": "p2_years", "unit": "years",
+         "pay": {"rule": "share", "pct": "p2_share_pct", "rate_unit": "pct"}},
+        {"name": "독점"},
+    ],
+    "events": [{"rule": "bullet", "amount": "investor_amount", "at_end_of": "이자"}],
+    "funding": {"raised": "investor_amount", "cost": "project_cost"},
+    "round": "trunc",
+})
+
+# [profit.py] 거치(이자만) → 목표 총수익률까지 원리금 균등 상환 → 완료
+PROFIT = Deal({
+    "operating": "flat",
+    "phases": [
+        {"name": "이자", "months": "phase1_months",
+         "pay": {"rule": "interest", "principal": "total_principal", "rate": "phase1_rate", "rate_unit": "pct"}},
+        {"name": "상환", "months": "phase2_months",
+         "pay": {"rule": "level", "principal": "total_principal", "return_pct": "target_investor_roi",
+                 "net_of_prior": True}},
+        {"name": "완료"},
+    ],
+})
+
+# [profit2.py] 초과 조달(잉여 자금) + 이자 → 원금·추가수익 균등 상환 → 완료 (월 지급액 절사)
+PROFIT2 = Deal({
+    "operating": "flat",
+    "phases": [
+        {"name": "이자", "months": "phase1_months",
+         "pay": {"rule": "interest", "principal": "investor_amount", "rate": "phase1_rate", "rate_unit": "pct"}},
+        {"name": "상환", "months": "phase2_months",
+         "pay": {"rule": "level", "principal": "investor_amount", "return_pct": "phase2_return_pct"}},
+        {"name": "완료"},
+    ],
+    "funding": {"raised": "investor_amount", "cost": "total_project_cost"},
+    "round": "trunc",
+})
@@ -0,0 +1,187 @@
+import numpy as np
+
+# ==========================================
+# 공용 현금흐름 엔진 (월별 스케줄을 NumPy 배열로 한 번에 계산)
+# ==========================================
+# - 모든 함수는 월 인덱스 배열(months)에 대해 원소 단위로 동작합니다.
+# - 입력 변수에 (시나리오 수, 1) 형태의 배열을 넣으면 결과는 (시나리오 × 월) 2차원 배열이 됩니다.
+# - 누적 잔고/지표는 항상 마지막 축(월 축)을 기준으로 계산합니다.
+
+# 상수
+AVG_DAYS_IN_MONTH = 365 / 12    # p10.py 기준 월 일수
+FLAT_DAYS_IN_MONTH = 30         # p5.py / profit.py / profit2.py 기준 월 일수
+COMM_COST = 3000                # 통신비 (원/1기)
+BASE_ELEC_COST = 2390 * 7       # 한전 기본료 (원/1기)
+
+
+def month_index(total_months):
+    # 1 ~ total_months 까지의 경과 월
+    return np.arange(1, int(total_months) + 1)
+
+
+def flat_operating_profit(daily_avg_charge, fee, elec_rate, monthly_maint, num_chargers):
+    # p5.py / profit.py / profit2.py 공통: 30일 기준 월 영업이익
+    fixed_cost_unit = BASE_ELEC_COST + COMM_COST + monthly_maint
+    margin = daily_avg_charge * (fee - elec_rate) * FLAT_DAYS_IN_MONTH
+    return (margin - fixed_cost_unit) * num_chargers
+
+
+def with_initial(monthly_flow, initial_flow):
+    # 0시점 현금흐름을 월별 현금흐름 앞에 붙임 (IRR/NPV 계산용)
+    monthly_flow = np.asarray(monthly_flow, dtype=float)
+    head = np.broadcast_to(np.asarray(initial_flow, dtype=float), monthly_flow.shape[:-1] + (1,))
+    return np.concatenate([head, monthly_flow], axis=-1)
+
+
+def npv(rate, values):
+    # numpy_financial.npv 와 동일한 규약 (첫 값은 0시점, 할인하지 않음)
+    values = np.asarray(values, dtype=float)
+    t = np.arange(values.shape[-1])
+    return (values / (1 + np.asarray(rate, dtype=float)) ** t).sum(axis=-1)
+
+
+def build_schedule(flows_fn, total_months, initial_balance=0.0, **params):
+    # 월별 현금흐름 + 회사 누적 잔고
+    # total_months 가 시나리오별 배열이면 가장 긴 기간으로 계산하고, 각 시나리오의 기간 이후 현금흐름은 0 으로 둡니다.
+    months = month_index(np.max(total_months))
+    schedule = flows_fn(months, **params)
+    if np.ndim(total_months) > 0:
+        active = months <= total_months
+        for key in ("revenue", "opex", "op_profit", "principal", "investor", "company"):
+            if key in schedule:
+                schedule[key] = np.where(active, schedule[key], 0)
+    schedule["month"] = months
+    # 잔고는 초기 잔고에서 매월 순현금을 차례로 더함 (월별 루프와 같은 덧셈 순서 → 표시용 절사 값도 같음)
+    company = schedule["company"]
+    start = np.broadcast_to(np.asarray(initial_balance, dtype=np.result_type(initial_balance, company)),
+                            company.shape[:-1] + (1,))
+    schedule["balance"] = np.cumsum(np.concatenate([start, company], axis=-1), axis=-1)[..., 1:]
+    return schedule
+
+
+# ==========================================
+# [p10.py] 투자비와 영업이익 (수익 배분 구조는 deal.py)
+# ==========================================
+def p10_initial_outlay(infra_cost, charger_cost, subsidy, num_units, investment_amount):
+    # 회사 초기 투입분 = 순 설치비(보조금 차감) - 투자유치 금액
+    net_capex = (infra_cost + charger_cost) * num_units - subsidy * num_units
+    return net_capex - investment_amount
+
+
+def p10_repayment_month(use_repayment, repayment_year):
+    # 상환 연도의 마지막 달 (상환하지 않으면 0)
+    return np.where(use_repayment, repayment_year * 12, 0)
+
+
+def month_values(values, months):
+    # 월별 값 배열 (..., 월 수) 에서 months 월(1부터)의 값. 배열 길이를 넘는 월은 마지막 값
+    values = np.asarray(values, dtype=float)
+    idx = np.clip(np.asarray(months) - 1, 0, values.shape[-1] - 1)
+    if values.ndim == 1:
+        return values[idx]
+    idx = np.broadcast_to(idx, np.broadcast_shapes(values.shape[:-1] + (1,), idx.shape))
+    return np.take_along_axis(values, idx, axis=-1)
+
+
+def p10_operating(months, *, promo_months, promo_price, normal_price, daily_kwh, num_units,
+                  kepco_base, kwh_cost, monthly_maint, kwh_cost_monthly=None, days_monthly=None):
+    # kwh_cost_monthly: 월별 전력 단가 (월 수,) 또는 (시나리오, 월 수) - 주면 kwh_cost 대신 사용 (tou.py)
+    # days_monthly: 월별 실제 일수 (같은 모양) - 주면 AVG_DAYS_IN_MONTH 대신 사용 (dated.py)
+    # A. 매출
+    is_promo = months <= promo_months
+    price = np.where(is_promo, promo_price, normal_price)
+    days = AVG_DAYS_IN_MONTH if days_monthly is None else month_values(days_monthly, months)
+    monthly_volume = daily_kwh * days * num_units
+    revenue = monthly_volume * price
+
+    # B. 비용
+    base_cost = 7 * kepco_base * num_units
+    if kwh_cost_monthly is not None:
+        kwh_cost = month_values(kwh_cost_monthly, months)
+    var_cost = monthly_volume * kwh_cost
+    maint_cost = monthly_maint * num_units
+    opex = base_cost + var_cost + maint_cost + np.zeros_like(revenue)
+
+    # C. 영업이익
+    return {"promo": is_promo, "revenue": revenue, "opex": opex, "op_profit": revenue - opex}
+
+
+def _within(mask, lengths):
+    # 행별 유효 길이(lengths, (S,) 또는 (S, 1)) 이후 칸은 False
+    if lengths is None:
+        return mask
+    lengths = np.reshape(lengths, np.shape(lengths)[:1] + (1,) * (mask.ndim - 1))
+    return mask & (np.arange(mask.shape[-1]) < lengths)
+
+
+def payback_month(balance, lengths=None):
+    # 누적 잔고가 마지막으로 음수였던 달의 다음 달
+    # (0: 처음부터 흑자, 마지막 달까지 음수면 월 수 + 1 = 기간 내 미회수)
+    # lengths: 시나리오별 기간 (월 수) - 주면 그 이후 달은 보지 않고 미회수도 행별 기간 + 1
+    negative = _within(np.asarray(balance) < 0, lengths)
+    n_months = negative.shape[-1]
+    last_negative = n_months - np.argmax(negative[..., ::-1], axis=-1)
+    return np.where(negative.any(axis=-1), last_negative + 1, 0)
+
+
+def first_month_at_or_above(values, threshold=0.0, first_month=1, lengths=None):
+    # 값이 처음으로 threshold 이상이 되는 달 (values[..., 0] 이 first_month 월)
+    # 끝까지 미만이면 first_month + 월 수 (= 기간 내 미도달)
+    # lengths: 행별 유효 칸 수 - 주면 그 이후 칸은 보지 않고 미도달도 first_month + 행별 칸 수
+    reached = np.asarray(values) >= threshold
+    n_months = reached.shape[-1] if lengths is None else np.reshape(lengths, reached.shape[:-1])
+    reached = _within(reached, lengths)
+    return first_month + np.where(reached.any(axis=-1), np.argmax(reached, axis=-1), n_months)
+
+
+def months_below(values, threshold=0.0, lengths=None):
+    # threshold 미만인 달의 수 (누적 잔고 → 마이너스 기간)
+    # lengths: 행별 유효 칸 수 - 주면 그 이후 칸은 세지 않음
+    return _within(np.asarray(values) < threshold, lengths).sum(axis=-1)
+
+
+def longest_run_below(values, threshold=0.0, lengths=None):
+    # threshold 미만이 연속된 가장 긴 기간 (달 수)
+    # lengths: 행별 유효 칸 수 - 주면 그 이후 칸은 보지 않음
+    below = _within(np.asarray(values) < threshold, lengths)
+    index = np.arange(below.shape[-1])
+    last_above = np.maximum.accumulate(np.where(below, -1, index), axis=-1)
+    return np.where(below, index - last_above, 0).max(axis=-1, initial=0)
+
+
+def month_label(month, n_months):
+    # 표시용: 0 → 처음부터, 월 수 초과 → 기간 내 미도달
+    if month <= 0:
+        return "처음부터"
+    if month > n_months:
+        return "기간 내 미회수"
+    return f"{int(month)}개월 차"
+
+
+def to_won(values):
+    # 표시용 원 단위 정수 (int() 와 같은 0 방향 절사)
+    return np.trunc(values).astype(np.int64)
+
+
+# 원 단위 반올림 방식 (deal.py 정수 원 모드의 규칙별 정책에도 사용)
+ROUNDING = {
+    "trunc": np.trunc,                                             # 0 방향 절사 (int() 와 같음)
+    "floor": np.floor,                                             # 내림
+    "ceil": np.ceil,                                               # 올림
+    "half_up": lambda v: np.sign(v) * np.floor(np.abs(v) + 0.5),   # 사사오입 (0.5 는 0 에서 먼 쪽)
+    "half_even": np.rint,                                          # 오사오입 (0.5 는 짝수 쪽, {:,.0f} 표시와 같음)
+}
+# 반올림 전에 이 자릿수로 정리 (8333.4999999... 같은 부동소수 오차로 경계가 뒤집히지 않도록)
+WON_DECIMALS = 6
+
+
+def round_won(values):
+    # 표시용 원 단위 정수 (반올림, 표의 {:,.0f} 표시와 같음)
+    return np.rint(values).astype(np.int64)
+
+
+def settle_won(values, policy="half_even"):
+    # 정산용 원 단위 정수 (int64) - WON_DECIMALS 자리로 정리한 뒤 policy 로 반올림
+    if policy not in ROUNDING:
+        raise ValueError(f"지원하지 않는 반올림 방식: {policy}")
+    return ROUNDING[policy](np.round(values, WON_DECIMALS)).astype(np.int64)
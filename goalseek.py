@@ -0,0 +1,174 @@
+import numpy as np
+
+import closed_form
+import scenarios
+
+# ==========================================
+# 목표 역산 (최소 유치 금액 / 최단 1단계 기간 / 최대 배분율)
+# ==========================================
+# 사용 예:
+#   result = goalseek.solve("p5", "investor_amount", {"daily_avg_charge": [15, 20, 25]},
+#                           min_balance=0, target_irr=0.06)
+#   result["value"]   # 사이트별 최소 유치 금액 (조건을 만족하는 값이 없으면 NaN, status = SEEK_INFEASIBLE)
+#
+# - 조건: 회사 누적 잔고 최저값 >= min_balance, 투자자 연 IRR >= target_irr (None 이면 해당 조건 없음)
+# - 각 평가는 closed_form.evaluate 로 월별 배열 없이 계산하고, 모든 사이트 × 후보값을 한 번에 평가합니다.
+# - 투자자 현금흐름은 "투입 후 지급" 으로 부호가 한 번만 바뀌므로
+#   IRR >= 목표 ⇔ 목표 수익률로 할인한 투자자 NPV >= 0 (IRR 을 직접 풀지 않음)
+# - 조건 충족 여부가 변수에 대해 단조롭지 않을 수 있으므로 (예: 유치 금액이 늘면 잉여금도 늘지만 이자·상환액도 늘어남)
+#   탐색 범위를 grid 개 점으로 먼저 훑어 방향상 첫 충족 점을 찾고, 그 직전 구간만 이분법으로 좁힙니다.
+#   정수 변수(기간)는 범위 안의 모든 값을 평가합니다.
+# - 유치 금액 + IRR 조건에서 IRR 이 금액과 무관하면 (예: p5 - 이자·배분이 금액에 비례) 0 보다 큰 모든 금액이
+#   충족하고 0 에서만 (IRR 정의 안 됨) 깨지므로 최솟값이 없습니다 → NaN, status = SEEK_NO_MINIMUM
+
+SEEK_OK = 0
+SEEK_INFEASIBLE = 1
+SEEK_NO_MINIMUM = 2
+
+STATUS_LABELS = {
+    SEEK_OK: "정상",
+    SEEK_INFEASIBLE: "조건 충족 불가",
+    SEEK_NO_MINIMUM: "해 없음 (0 보다 큰 모든 금액이 충족)",
+}
+
+DEFAULT_GRID = 33
+
+# 역산 변수: 방향(min = 가장 작은 값, max = 가장 큰 값), 정수 여부, 결과 단위, 기본 탐색 범위
+VARIABLES = {
+    "investor_amount": {"direction": "min", "integer": False, "step": 10000, "bounds": "funding"},
+    "investment_amount": {"direction": "min", "integer": False, "step": 10000, "bounds": "funding"},
+    "p1_years": {"direction": "min", "integer": True, "bounds": (1, 10)},
+    "phase1_months": {"direction": "min", "integer": True, "bounds": (0, 120)},
+    "p2_share_pct": {"direction": "max", "integer": False, "step": 0.1, "bounds": (0, 100)},
+    "p2_share": {"direction": "max", "integer": False, "step": 0.001, "bounds": (0, 1)},
+}
+
+MODEL_DEFAULTS = {
+    "p10": scenarios.P10_DEFAULTS,
+    "p5": scenarios.P5_DEFAULTS,
+    "profit2": scenarios.PROFIT2_DEFAULTS,
+}
+
+
+def check(model, params, min_balance=0.0, target_irr=None):
+    # 조건 충족 여부 (시나리오별 bool) + 최저 잔고
+    deal, col, total_months, flow_params, initial_balance, investor_outlay = scenarios.model_inputs(model, params)
+    rate = 0.0 if target_irr is None else (1 + target_irr) ** (1 / 12) - 1
+    result = closed_form.evaluate(deal, total_months, rate=rate, initial_balance=initial_balance,
+                                  first_period=1, **flow_params)
+    ok = np.ones(result["min_balance"].shape, dtype=bool)
+    if min_balance is not None:
+        ok &= result["min_balance"] >= min_balance
+    if target_irr is not None:
+        # 투입액이 0 이면 IRR 이 정의되지 않으므로 불충족
+        ok &= (investor_outlay[:, 0] > 0) & (result["npv"]["investor"] - investor_outlay[:, 0] >= 0)
+    return ok, result["min_balance"]
+
+
+def _default_bounds(model, variable, base, size):
+    bounds = VARIABLES[variable]["bounds"]
+    if bounds != "funding":
+        return bounds
+    # 유치 금액: 0 ~ 사업비의 3배 (사업비 = 투자자 투입액 - 회사 초기 잔고)
+    _, _, _, _, initial_balance, investor_outlay = scenarios.model_inputs(model, base)
+    cost = np.broadcast_to((investor_outlay - initial_balance)[:, 0], (size,))
+    return 0, np.maximum(3 * cost, 1e6)
+
+
+def _check_rows(model, base, rows, variable, values, min_balance, target_irr):
+    # base 의 rows 번째 사이트들에 variable = values 를 넣어 평가
+    params = {k: v[rows] for k, v in base.items()}
+    params[variable] = values
+    return check(model, params, min_balance, target_irr)[0]
+
+
+def solve(model, variable, params=None, *, min_balance=0.0, target_irr=None, bounds=None, step=None,
+          grid=DEFAULT_GRID):
+    # params: {변수명: 스칼라 또는 (사이트 수,) 배열}, 누락된 변수는 모델 기본값
+    # 반환: {"value", "status", "min_balance"} (사이트별 배열)
+    if model not in MODEL_DEFAULTS:
+        raise ValueError(f"지원하지 않는 모델: {model}")
+    if variable not in VARIABLES or variable not in MODEL_DEFAULTS[model]:
+        raise ValueError(f"{model} 모델에서 역산할 수 없는 변수: {variable}")
+    if min_balance is None and target_irr is None:
+        raise ValueError("min_balance 또는 target_irr 중 하나 이상의 조건이 필요합니다.")
+
+    spec = VARIABLES[variable]
+    params = {k: v for k, v in (params or {}).items() if k != variable}
+    size = max((np.size(v) for v in params.values()), default=1)
+    base = {k: np.broadcast_to(np.asarray(v), (size,)) for k, v in params.items()}
+    lo, hi = bounds if bounds is not None else _default_bounds(model, variable, base, size)
+    lo = np.broadcast_to(np.asarray(lo, dtype=float), (size,))
+    hi = np.broadcast_to(np.asarray(hi, dtype=float), (size,))
+
+    # 1. 탐색 범위 훑기 (사이트 × 후보값을 한 번에 평가)
+    if spec["integer"]:
+        lo, hi = np.ceil(lo), np.floor(hi)
+        offsets = np.arange(int((hi - lo).max()) + 1)
+        candidates = np.minimum(lo[:, None] + offsets[None, :], hi[:, None])
+    else:
+        candidates = lo[:, None] + (hi - lo)[:, None] * np.linspace(0, 1, grid)[None, :]
+    n_points = candidates.shape[1]
+    rows = np.repeat(np.arange(size), n_points)
+    feasible = _check_rows(model, base, rows, variable, candidates.ravel(), min_balance, target_irr)
+    feasible = feasible.reshape(size, n_points)
+
+    found = feasible.any(axis=1)
+    if spec["direction"] == "min":
+        pick = np.argmax(feasible, axis=1)
+        neighbour = pick - 1
+    else:
+        pick = n_points - 1 - np.argmax(feasible[:, ::-1], axis=1)
+        neighbour = pick + 1
+    sites = np.arange(size)
+    value = candidates[sites, pick]
+
+    # 2. 첫 충족 점과 바로 옆 불충족 점 사이를 이분법으로 좁힘 (실수 변수)
+    if not spec["integer"]:
+        step = spec["step"] if step is None else step
+        inner = found & (neighbour >= 0) & (neighbour < n_points)
+        idx = np.flatnonzero(inner)
+        good = value[idx]
+        bad = candidates[idx, neighbour[idx]]
+        while idx.size and np.abs(good - bad).max() > step:
+            mid = 0.5 * (good + bad)
+            ok = _check_rows(model, base, idx, variable, mid, min_balance, target_irr)
+            good = np.where(ok, mid, good)
+            bad = np.where(ok, bad, mid)
+        value[idx] = good
+
+        # step 단위로 맞추되 (min 은 올림, max 는 내림) 맞춘 값이 조건을 벗어나면 그대로 둠
+        snap_fn = np.ceil if spec["direction"] == "min" else np.floor
+        snapped = np.clip(snap_fn(value / step) * step, lo, hi)
+        ok = _check_rows(model, base, sites, variable, snapped, min_balance, target_irr)
+        value = np.where(ok, snapped, value)
+        # 이분법 결과는 경계에서 최대 step 만큼 떨어져 있으므로 한 칸 안쪽 값도 확인
+        closer = np.clip(snapped + (-step if spec["direction"] == "min" else step), lo, hi)
+        ok &= _check_rows(model, base, sites, variable, closer, min_balance, target_irr)
+        value = np.where(ok, closer, value)
+
+    status = np.where(found, SEEK_OK, SEEK_INFEASIBLE).astype(np.int8)
+    if spec["bounds"] == "funding" and target_irr is not None and spec["direction"] == "min":
+        # 0 바로 위까지 충족하고 0 에서는 잔고 조건만 보면 충족 → IRR 이 정의되지 않아 깨질 뿐이므로 최솟값 없음
+        near_zero = found & (lo <= 0) & (value <= lo + step)
+        balance_ok = check(model, {**base, variable: np.zeros(size)}, min_balance, None)[0]
+        status[near_zero & balance_ok] = SEEK_NO_MINIMUM
+        found &= status != SEEK_NO_MINIMUM
+
+    value = np.where(found, value, np.nan)
+    final = {k: v for k, v in base.items()}
+    final[variable] = np.where(found, value, candidates[:, 0])
+    _, balance = check(model, final, min_balance, target_irr)
+    return {"value": value, "status": status, "min_balance": np.where(found, balance, np.nan)}
+
+
+def solve_rows(table, model, variable, **kwargs):
+    # 사이트 표(행 = 사이트)를 그대로 역산 → 입력 열 + value/status/min_balance 열
+    defaults = MODEL_DEFAULTS.get(model, {})
+    params = {c: table[c].to_numpy() for c in table.columns if c in defaults}
+    result = solve(model, variable, params, **kwargs)
+    out = table.reset_index(drop=True).copy()
+    out[f"{variable}_required"] = result["value"]
+    out["seek_status"] = result["status"]
+    out["seek_min_balance"] = result["min_balance"]
+    return out
@@ -0,0 +1,224 @@
+import numpy as np
+
+# ==========================================
+# 일괄 IRR 계산 (격자 탐색으로 근 구간 확보 → 안전장치 뉴턴/이분법)
+# ==========================================
+# - cash_flows: (시나리오 수, 기간) 배열, 첫 열이 0시점 현금흐름
+# - 반환: (월 IRR, 상태 코드) - 해가 없으면 IRR 은 NaN
+# - 찾은 구간을 모두 풀고 numpy_financial.irr 과 같이 0 에 가장 가까운 근을 돌려줌. 근이 여럿이면 IRR_MULTIPLE
+#   (같은 격자 칸 안의 근 쌍도 |NPV| 극소점에서 나눠 찾음)
+# - 기본 격자 끝에서 부호가 정리되지 않으면 (+100% 초과 / -95% 미만에 근) 그 바깥까지 훑고,
+#   거기서도 못 찾으면 IRR_OUT_OF_RANGE
+# - guess(이전 해)는 그 값을 포함하는 구간의 뉴턴 시작점으로만 사용 (warm start) - 어느 근을 고를지는 바뀌지 않음
+# - times: 각 현금흐름의 시점 (기간 단위, 소수 가능, 오름차순, (기간,) 또는 (시나리오 수, 기간)). 생략하면 0, 1, 2, ...
+#   날짜 기준 XIRR 은 dated.py 참고
+
+IRR_OK = 0
+IRR_NO_ROOT = 1
+IRR_MULTIPLE = 2
+IRR_NOT_CONVERGED = 3
+IRR_OUT_OF_RANGE = 4
+
+STATUS_LABELS = {
+    IRR_OK: "정상",
+    IRR_NO_ROOT: "해 없음",
+    IRR_MULTIPLE: "복수 해",
+    IRR_NOT_CONVERGED: "수렴 실패",
+    IRR_OUT_OF_RANGE: "범위 밖",
+}
+
+# 탐색 범위: 월 -95% ~ +100% (log(1+r) 기준 등간격, 0 포함)
+_GRID = np.unique(np.concatenate([np.expm1(np.linspace(np.log(0.05), np.log(2.0), 160)), [0.0]]))
+# 끝에서 부호가 정리되지 않은 행만 추가로 훑는 범위: 월 +100% ~ 1+r = 1e4, -95% ~ 1+r = 1e-6 (기본 격자 끝점 포함)
+_UPPER_GRID = np.expm1(np.linspace(np.log(2.0), np.log(1e4), 160))
+_LOWER_GRID = np.expm1(np.linspace(np.log(1e-6), np.log(0.05), 160))
+_EXTREMUM_STEPS = 60
+
+
+def _scaled_npv_matrix(cash_flows, rates, times):
+    # 격자 위 NPV 부호 계산. r < 0 은 (1+r)^(마지막 시점) 을 곱해 넘침 없이 계산 (양수 배율이라 부호 불변)
+    log_base = np.log1p(rates)
+    if times.ndim == 1:
+        shift = np.where(rates < 0, times[-1], 0)[None, :]
+        weights = np.exp((shift - times[:, None]) * log_base[None, :])
+        return cash_flows @ weights
+    # 시나리오별 시점이 다르면 격자점마다 계산 (시나리오 × 기간 × 격자 배열을 만들지 않음)
+    values = np.empty((cash_flows.shape[0], len(rates)))
+    for g, rate in enumerate(rates):
+        shift = times[:, -1:] if rate < 0 else 0
+        values[:, g] = (cash_flows * np.exp((shift - times) * log_base[g])).sum(axis=-1)
+    return values
+
+
+def _sign_changes(cash_flows):
+    # 데카르트 부호 규칙: 0 이 아닌 현금흐름의 부호 변화 횟수 = 가능한 양의 근 수의 상한
+    signs = np.sign(cash_flows)
+    # 0 인 칸은 직전의 0 이 아닌 부호로 채움
+    idx = np.where(signs != 0, np.arange(signs.shape[1]), 0)
+    np.maximum.accumulate(idx, axis=1, out=idx)
+    filled = np.take_along_axis(signs, idx, axis=1)
+    return ((filled[:, 1:] != filled[:, :-1]) & (filled[:, :-1] != 0)).sum(axis=1)
+
+
+def _limit_signs(cash_flows):
+    # r → ∞ 이면 첫 (0 이 아닌) 현금흐름, r → -1 이면 마지막 현금흐름이 NPV 부호를 정함
+    nonzero = cash_flows != 0
+    first = nonzero.argmax(axis=1)
+    last = cash_flows.shape[1] - 1 - nonzero[:, ::-1].argmax(axis=1)
+    rows = np.arange(cash_flows.shape[0])
+    return np.sign(cash_flows[rows, first]), np.sign(cash_flows[rows, last])
+
+
+def _npv_and_derivative(cash_flows, rate, shift, times):
+    # h(r) = Σ c_t (1+r)^(shift - t), h'(r) = Σ c_t (shift - t) (1+r)^(shift - t - 1)
+    power = shift[:, None] - times
+    term = cash_flows * np.exp(power * np.log1p(rate)[:, None])
+    value = term.sum(axis=-1)
+    deriv = (term * power).sum(axis=-1) / (1 + rate)
+    return value, deriv
+
+
+def _shift(times, hi):
+    # 구간 전체가 음수이면 (1+r)^(마지막 시점) 배율 사용
+    return np.where(hi <= 0, np.broadcast_to(times[..., -1], hi.shape), 0)
+
+
+def _grid_roots(values, grid, row_idx):
+    # 격자에서 부호가 바뀌는 칸 (행, 하한, 상한) 과 정확히 0 인 격자점 (행, 근)
+    exact = values == 0
+    change = np.signbit(values[:, :-1]) != np.signbit(values[:, 1:])
+    change &= ~exact[:, :-1] & ~exact[:, 1:]
+    r, g = np.nonzero(change)
+    er, eg = np.nonzero(exact)
+    return (row_idx[r], grid[g], grid[g + 1]), (row_idx[er], grid[eg])
+
+
+def _hidden_pairs(cash_flows, times, values, grid, row_idx):
+    # 한 칸 안에 근이 두 개면 양 끝 부호가 같아 보이지 않음 → 양 끝 부호가 같은데 |NPV| 가 왼쪽 끝에서 줄고
+    # 오른쪽 끝에서 늘면 칸 안에 극소가 있으므로, 극값(h' = 0)을 이분법으로 찾아 그 점의 부호가 반대면 두 구간으로 나눔
+    # (배율 (1+r)^shift 는 양수라 h, h' 부호는 Σ c_t·(1+r)^(shift-t), Σ -t·c_t·(1+r)^(shift-t) 부호와 같음)
+    cf = cash_flows[row_idx]
+    t = times if times.ndim == 1 else times[row_idx]
+    slopes = _scaled_npv_matrix(-t * cf, grid, t)
+    side = np.sign(values[:, :-1])
+    dip = (side != 0) & (np.sign(values[:, 1:]) == side)
+    dip &= (side * np.sign(slopes[:, :-1]) < 0) & (side * np.sign(slopes[:, 1:]) > 0)
+    r, g = np.nonzero(dip)
+    empty = np.empty(0, dtype=np.int64), np.empty(0)
+    if len(r) == 0:
+        return (*empty, np.empty(0)), empty
+
+    cf = cf[r]
+    t = t if t.ndim == 1 else t[r]
+    a, b = grid[g], grid[g + 1]
+    shift = _shift(t, b)
+    side = side[r, g]
+    lo, hi = a, b
+    for _ in range(_EXTREMUM_STEPS):
+        x = 0.5 * (lo + hi)
+        slope, _ = _npv_and_derivative(-t * cf, x, shift, t)
+        rising = side * slope > 0          # |h| 가 커지는 중 → 극소는 왼쪽
+        lo = np.where(rising, lo, x)
+        hi = np.where(rising, x, hi)
+    x = 0.5 * (lo + hi)
+    f, _ = _npv_and_derivative(cf, x, shift, t)
+    rows = row_idx[r]
+    zero = f == 0
+    cross = (np.sign(f) == -side) & ~zero
+    brackets = (np.concatenate([rows[cross], rows[cross]]),
+                np.concatenate([a[cross], x[cross]]),
+                np.concatenate([x[cross], b[cross]]))
+    return brackets, (rows[zero], x[zero])
+
+
+def _refine(cash_flows, times, lo, hi, x, tol, max_iter):
+    # 구간을 유지하며 뉴턴 스텝, 구간을 벗어나면 이분법
+    shift = _shift(times, hi)
+    f_lo, _ = _npv_and_derivative(cash_flows, lo, shift, times)
+    converged = np.zeros(len(x), dtype=bool)
+    for _ in range(max_iter):
+        f, df = _npv_and_derivative(cash_flows, x, shift, times)
+        same_as_lo = np.signbit(f) == np.signbit(f_lo)
+        lo = np.where(same_as_lo, x, lo)
+        hi = np.where(same_as_lo, hi, x)
+        f_lo = np.where(same_as_lo, f, f_lo)
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            step = x - f / df
+        bisect = ~np.isfinite(step) | (step <= lo) | (step >= hi)
+        x_new = np.where(bisect, 0.5 * (lo + hi), step)
+        converged = (np.abs(x_new - x) <= tol * (1 + np.abs(x))) | (f == 0)
+        x = np.where(f == 0, x, x_new)
+        if converged.all():
+            break
+    return x, converged
+
+
+def solve_irr(cash_flows, guess=None, tol=1e-12, max_iter=100, times=None):
+    cash_flows = np.atleast_2d(np.asarray(cash_flows, dtype=float))
+    rows = cash_flows.shape[0]
+    times = np.arange(cash_flows.shape[-1], dtype=float) if times is None else np.asarray(times, dtype=float)
+    rate = np.full(rows, np.nan)
+    status = np.full(rows, IRR_NO_ROOT, dtype=np.int8)
+    all_rows = np.arange(rows)
+    may_repeat = _sign_changes(cash_flows) >= 2
+    # 현금흐름이 모두 0 이면 NPV 가 항상 0 → 해 없음
+    blank = ~cash_flows.any(axis=1)
+
+    # 1. 격자에서 부호가 바뀌는 구간 + 같은 칸 안의 근 쌍 (부호 변화가 2번 이상인 행만)
+    brackets, exact = [], []
+
+    def scan(grid, idx, values):
+        found, zeros = _grid_roots(values, grid, idx)
+        pairs, pair_zeros = _hidden_pairs(cash_flows, times, values[may_repeat[idx]], grid, idx[may_repeat[idx]])
+        brackets.extend([found, pairs])
+        exact.extend([zeros, pair_zeros])
+
+    values = _scaled_npv_matrix(cash_flows, _GRID, times)
+    values[blank] = 1.0
+    scan(_GRID, all_rows, values)
+
+    # 2. 기본 격자 끝의 부호가 극한(r → ∞ / r → -1)과 다르면 그 바깥에 근 → 해당 행만 바깥 격자 탐색
+    first_sign, last_sign = _limit_signs(cash_flows)
+    out_of_range = np.zeros(rows, dtype=bool)
+    for grid, end, limit in ((_UPPER_GRID, -1, first_sign), (_LOWER_GRID, 0, last_sign)):
+        open_end = (np.sign(values[:, end]) != limit) & (values[:, end] != 0) & (limit != 0)
+        if not open_end.any():
+            continue
+        idx = all_rows[open_end]
+        outer = _scaled_npv_matrix(cash_flows[idx], grid, times if times.ndim == 1 else times[idx])
+        scan(grid, idx, outer)
+        out_of_range[idx] = (np.sign(outer[:, end]) != limit[idx]) & (outer[:, end] != 0)
+
+    b_row, b_lo, b_hi = (np.concatenate(part) for part in zip(*brackets))
+    e_row, e_root = (np.concatenate(part) for part in zip(*exact))
+    n_roots = np.bincount(b_row, minlength=rows) + np.bincount(e_row, minlength=rows)
+
+    # 3. 모든 구간을 풀고 행마다 0 에 가장 가까운 근 선택 (guess 는 구간 안에 있을 때만 시작점)
+    found_row, found_rate = [e_row], [e_root]
+    if len(b_row):
+        start = 0.5 * (b_lo + b_hi)
+        if guess is not None:
+            g = np.broadcast_to(np.asarray(guess, dtype=float), (rows,))[b_row]
+            start = np.where((g > b_lo) & (g < b_hi), g, start)
+        t = times if times.ndim == 1 else times[b_row]
+        x, converged = _refine(cash_flows[b_row], t, b_lo, b_hi, start, tol, max_iter)
+        found_row.append(b_row[converged])
+        found_rate.append(x[converged])
+    found_row = np.concatenate(found_row)
+    found_rate = np.concatenate(found_rate)
+    order = np.lexsort((np.abs(found_rate), found_row))
+    picked_rows, first = np.unique(found_row[order], return_index=True)
+    rate[picked_rows] = found_rate[order][first]
+
+    status[out_of_range] = IRR_OUT_OF_RANGE
+    has_root = n_roots > 0
+    # 부호 변화가 한 번뿐이면 근은 유일 (격자 해상도 밖의 근접한 근 쌍 오판 방지)
+    status[has_root] = np.where((n_roots[has_root] > 1) & may_repeat[has_root], IRR_MULTIPLE, IRR_OK)
+    status[has_root & np.isnan(rate)] = IRR_NOT_CONVERGED
+    return rate, status
+
+
+def annualize(monthly_rate):
+    # 월 IRR → 연환산
+    return (1 + monthly_rate) ** 12 - 1
@@ -0,0 +1,136 @@
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import resultcache
+
+# ==========================================
+# 백그라운드 작업 실행기 - Streamlit 재실행과 무관하게 긴 계산을 돌리고 진행률/중간 결과를 보여줌
+# ==========================================
+# 사용 예:
+#   runner = jobs.JobRunner()                       # Streamlit 에서는 st.cache_resource 로 하나만 생성
+#   job = runner.submit("p10_montecarlo", key_params, mc_job, p, dists)   # 같은 입력이면 기존 작업을 돌려줌
+#   job.snapshot()   # {"status", "progress", "partial", "result", "error", "message", "elapsed"}
+#   job.cancel()
+#
+#   def mc_job(job, p, dists):                       # 작업 함수는 첫 인자로 Job 을 받음
+#       return montecarlo.run(dists, base=p, progress=lambda done, total, part: job.report(done / total, part))[0]
+#
+# - 작업은 스레드 풀에서 돌아가므로 스크립트 재실행(위젯 조작)이 작업을 멈추거나 다시 시작하지 않습니다.
+#   (몬테카를로처럼 작업 안에서 다시 프로세스 풀을 쓰는 계산은 그대로 여러 코어를 씁니다)
+# - 작업 키 = (종류, 입력값) 의 정규화 해시 (resultcache.cache_key). 같은 키로 다시 제출하면
+#   상태와 관계없이 기존 작업을 돌려주므로 세션·사용자 간에 같은 계산을 중복 실행하지 않습니다.
+#   실패/취소된 작업을 다시 돌리려면 restart=True.
+# - 취소: job.cancel() 후 작업 함수가 다음에 job.report() 를 부를 때 JobCancelled 로 중단됩니다.
+# - 끝난 작업은 max_jobs 개까지 보관하고, 넘으면 오래된 것부터 지웁니다.
+
+QUEUED, RUNNING, DONE, FAILED, CANCELLED = "queued", "running", "done", "failed", "cancelled"
+STATUS_LABELS = {QUEUED: "대기 중", RUNNING: "계산 중", DONE: "완료", FAILED: "실패", CANCELLED: "취소됨"}
+FINISHED = (DONE, FAILED, CANCELLED)
+
+DEFAULT_WORKERS = 2
+DEFAULT_MAX_JOBS = 64
+
+
+class JobCancelled(Exception):
+    pass
+
+
+class Job:
+    def __init__(self, key, kind):
+        self.key = key
+        self.kind = kind
+        self.status = QUEUED
+        self.progress = 0.0
+        self.partial = None
+        self.result = None
+        self.error = None
+        self.message = None
+        self.submitted = time.time()
+        self.started = None
+        self.finished_at = None
+        self._cancel = threading.Event()
+        self._lock = threading.Lock()
+
+    @property
+    def finished(self):
+        return self.status in FINISHED
+
+    def report(self, progress, partial=None, message=None):
+        # 작업 함수에서 호출: 진행률(0~1)과 중간 결과 갱신, 취소 요청이 있으면 JobCancelled
+        if self._cancel.is_set():
+            raise JobCancelled()
+        with self._lock:
+            self.progress = min(max(float(progress), 0.0), 1.0)
+            if partial is not None:
+                self.partial = partial
+            if message is not None:
+                self.message = message
+
+    def cancel(self):
+        self._cancel.set()
+
+    def snapshot(self):
+        with self._lock:
+            end = self.finished_at or time.time()
+            return {
+                "status": self.status,
+                "progress": self.progress,
+                "partial": self.partial,
+                "result": self.result,
+                "error": self.error,
+                "message": self.message,
+                "elapsed": end - (self.started or end),
+            }
+
+    def _set(self, **fields):
+        with self._lock:
+            for name, value in fields.items():
+                setattr(self, name, value)
+
+
+class JobRunner:
+    def __init__(self, max_workers=DEFAULT_WORKERS, max_jobs=DEFAULT_MAX_JOBS):
+        self.max_jobs = max_jobs
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="job")
+        self._jobs = OrderedDict()
+        self._lock = threading.Lock()
+
+    def submit(self, kind, params, fn, *args, restart=False, **kwargs):
+        # fn(job, *args, **kwargs) 를 백그라운드로 실행 → Job (같은 키가 있으면 기존 Job)
+        key = resultcache.cache_key(kind, params)
+        with self._lock:
+            job = self._jobs.get(key)
+            if job is not None and not (restart and job.status in (FAILED, CANCELLED)):
+                self._jobs.move_to_end(key)
+                return job
+            job = Job(key, kind)
+            self._jobs[key] = job
+            self._prune()
+        self._executor.submit(self._run, job, fn, args, kwargs)
+        return job
+
+    def get(self, kind, params):
+        with self._lock:
+            return self._jobs.get(resultcache.cache_key(kind, params))
+
+    def _run(self, job, fn, args, kwargs):
+        if job._cancel.is_set():
+            job._set(status=CANCELLED, finished_at=time.time())
+            return
+        job._set(status=RUNNING, started=time.time())
+        try:
+            result = fn(job, *args, **kwargs)
+        except JobCancelled:
+            job._set(status=CANCELLED, finished_at=time.time())
+        except Exception as exc:
+            job._set(status=FAILED, error=f"{type(exc).__name__}: {exc}", finished_at=time.time())
+        else:
+            job._set(status=DONE, result=result, progress=1.0, finished_at=time.time())
+
+    def _prune(self):
+        # 끝난 작업이 max_jobs 를 넘으면 오래된 것부터 제거 (진행 중인 작업은 유지)
+        finished = [key for key, job in self._jobs.items() if job.finished]
+        for key in finished[:max(len(self._jobs) - self.max_jobs, 0)]:
+            del self._jobs[key]
@@ -0,0 +1,211 @@
+import copy
+import math
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import numpy as np
+
+import aggregate
+import deal
+import engine
+import irr
+import scenarios
+
+# ==========================================
+# 몬테카를로 시뮬레이션 (수요·요금·원가 불확실성)
+# ==========================================
+# 사용 예:
+#   dists = {
+#       "daily_kwh": {"dist": "lognormal", "mean": 20, "sd": 5, "rho": 0.7},
+#       "normal_price": {"dist": "triangular", "low": 250, "mode": 288, "high": 320},
+#       "kwh_cost": {"dist": "normal", "mean": 150, "sd": 15, "rho": 0.9},
+#   }
+#   result = montecarlo.run(dists, n_paths=100_000, seed=42)
+#
+# - 각 변수는 경로(path) × 월 배열로 매월 새로 뽑습니다. rho 를 주면 AR(1) 자기상관 (가우시안 코풀라).
+# - 경로는 chunk_size 단위로 나눠 프로세스 풀에서 계산하며, chunk 마다 SeedSequence 로
+#   독립 난수 스트림을 배정하므로 작업자 수와 무관하게 같은 seed 면 같은 결과가 나옵니다.
+# - 월별 잔고는 작업자 안에서 바로 히스토그램(aggregate.py)으로 집계하고 개수만 돌려받으므로
+#   경로 수와 무관하게 메모리 사용량이 일정합니다. keep_paths=True 면 경로별 스칼라 지표도 반환.
+
+# 몬테카를로로 뽑을 수 있는 p10 변수
+STOCHASTIC_PARAMS = ("daily_kwh", "normal_price", "promo_price", "kwh_cost")
+
+PERCENTILES = (5, 50, 95)
+SUMMARY_METRICS = ("com_npv", "inv_npv", "inv_irr", "min_balance", "final_balance")
+DEFAULT_CHUNK_SIZE = 5000
+# 이보다 적은 경로는 프로세스 풀 없이 현재 프로세스에서 계산 (작업자에 일을 넘기는 비용이 더 큼)
+INLINE_MAX_PATHS = 20000
+
+# 작업자 수별 프로세스 풀 - 한 번 띄운 작업자를 다음 호출에서도 재사용 (spawn 시작 비용을 매번 내지 않음)
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def _norm_cdf(z):
+    return 0.5 * (1 + _erf(z / math.sqrt(2)))
+
+
+def _erf(x):
+    # Abramowitz & Stegun 7.1.26 (최대 오차 1.5e-7)
+    sign = np.sign(x)
+    x = np.abs(x)
+    t = 1 / (1 + 0.3275911 * x)
+    poly = t * (0.254829592 + t * (-0.284496736 + t * (1.421413741 + t * (-1.453152027 + t * 1.061405429))))
+    return sign * (1 - poly * np.exp(-x * x))
+
+
+def _latent_normals(rng, n_paths, n_months, rho):
+    # 표준정규 AR(1): z_t = rho * z_{t-1} + sqrt(1 - rho^2) * e_t (주변분포는 N(0, 1) 유지)
+    eps = rng.standard_normal((n_paths, n_months))
+    if not rho:
+        return eps
+    scale = math.sqrt(1 - rho * rho)
+    z = np.empty_like(eps)
+    z[:, 0] = eps[:, 0]
+    for m in range(1, n_months):
+        z[:, m] = rho * z[:, m - 1] + scale * eps[:, m]
+    return z
+
+
+def sample(spec, rng, n_paths, n_months):
+    # spec 한 개 → (경로 수, 월 수) 표본 배열
+    dist = spec.get("dist", "normal")
+    if dist == "fixed":
+        return np.full((n_paths, n_months), float(spec["value"]))
+
+    z = _latent_normals(rng, n_paths, n_months, spec.get("rho", 0.0))
+    if dist == "normal":
+        values = spec["mean"] + spec["sd"] * z
+    elif dist == "lognormal" and spec["mean"] <= 0:
+        values = np.zeros((n_paths, n_months))
+    elif dist == "lognormal":
+        # 입력한 평균/표준편차를 갖도록 로그 공간 모수 변환
+        sigma2 = math.log(1 + (spec["sd"] / spec["mean"]) ** 2)
+        mu = math.log(spec["mean"]) - sigma2 / 2
+        values = np.exp(mu + math.sqrt(sigma2) * z)
+    elif dist == "uniform":
+        values = spec["low"] + (spec["high"] - spec["low"]) * _norm_cdf(z)
+    elif dist == "triangular":
+        low, mode, high = spec["low"], spec["mode"], spec["high"]
+        u = _norm_cdf(z)
+        cut = (mode - low) / (high - low)
+        values = np.where(
+            u < cut,
+            low + np.sqrt(u * (high - low) * (mode - low)),
+            high - np.sqrt((1 - u) * (high - low) * (high - mode)),
+        )
+    else:
+        raise ValueError(f"지원하지 않는 분포: {dist}")
+
+    if "min" in spec or "max" in spec:
+        values = np.clip(values, spec.get("min", -np.inf), spec.get("max", np.inf))
+    return values
+
+
+def simulate_paths(dists, base, n_paths, seed_seq, guess=None):
+    # 경로 n_paths 개를 한 번에 계산 → (경로별 지표, 월별 잔고 배열)
+    rng = np.random.default_rng(seed_seq)
+    col, total_months, outlay, flow_params = scenarios.p10_inputs(base)
+    n_months = int(total_months.max())
+
+    for name in STOCHASTIC_PARAMS:
+        if name in dists:
+            flow_params[name] = sample(dists[name], rng, n_paths, n_months)
+    # 뽑지 않은 변수만 있는 경우에도 경로 축을 갖도록 맞춤
+    flow_params["daily_kwh"] = np.broadcast_to(flow_params["daily_kwh"], (n_paths, n_months))
+
+    sched = engine.build_schedule(deal.P10.flows, total_months, initial_balance=-outlay, **flow_params)
+    investor_cf = engine.with_initial(sched["investor"], -col["investment_amount"])
+    company_cf = engine.with_initial(sched["company"], -outlay)
+    monthly_rate = col["discount_rate_annual"] / 12
+
+    inv_irr, inv_status = irr.solve_irr(investor_cf, guess=guess)
+    metrics = {
+        "com_npv": engine.npv(monthly_rate, company_cf),
+        "inv_npv": engine.npv(monthly_rate, investor_cf),
+        "inv_irr": irr.annualize(inv_irr),
+        "inv_irr_status": inv_status,
+        "min_balance": sched["balance"].min(axis=-1),
+        "final_balance": sched["balance"][:, -1],
+    }
+    return metrics, sched["balance"]
+
+
+def _run_chunk(args):
+    # 작업자: 경로 계산 후 바로 집계 (월별 잔고 배열은 반환하지 않음)
+    dists, base, n_paths, seed_seq, guess, agg, keep_paths = args
+    metrics, balance = simulate_paths(dists, base, n_paths, seed_seq, guess)
+    aggregate.risk_update(agg, metrics, balance)
+    return agg, (metrics if keep_paths else None)
+
+
+def _pool(workers):
+    # spawn: jobs.py 처럼 다른 스레드가 잠금을 쥔 채로 fork 되면 자식이 멈출 수 있어 새 인터프리터로 시작
+    with _pools_lock:
+        if workers not in _pools:
+            _pools[workers] = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+        return _pools[workers]
+
+
+def run(dists, base=None, n_paths=10000, seed=None, chunk_size=DEFAULT_CHUNK_SIZE, workers=None,
+        keep_paths=False, progress=None):
+    # workers: None 이면 CPU 수, 1 이면 현재 프로세스에서 순차 실행 (INLINE_MAX_PATHS 이하도 순차 실행)
+    # progress(완료 경로 수, 전체 경로 수, 중간 요약): chunk 가 끝날 때마다 호출 (예외를 던지면 남은 chunk 취소)
+    # 반환: (요약, 경로별 지표 또는 None)
+    if n_paths < 1 or chunk_size < 1:
+        raise ValueError(f"경로 수와 chunk 크기는 1 이상이어야 합니다: n_paths={n_paths}, chunk_size={chunk_size}")
+    base = dict(base or {})
+    sizes = [min(chunk_size, n_paths - start) for start in range(0, n_paths, chunk_size)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+
+    # 기준(점 추정) 시나리오의 IRR 을 뉴턴 시작점으로 사용 (warm start) - 근 선택에는 영향 없음
+    guess = (1 + scenarios.p10_evaluate(base)["inv_irr"][0]) ** (1 / 12) - 1
+
+    # 첫 chunk 로 히스토그램 구간 경계를 정한 뒤, 나머지 chunk 는 같은 경계로 집계
+    pilot_metrics, pilot_balance = simulate_paths(dists, base, sizes[0], seeds[0], guess)
+    template = aggregate.risk_aggregator_from_pilot(
+        {k: pilot_metrics[k] for k in SUMMARY_METRICS}, pilot_balance)
+    agg = aggregate.risk_update(copy.deepcopy(template), pilot_metrics, pilot_balance)
+    kept = [pilot_metrics] if keep_paths else []
+    del pilot_balance
+    done = sizes[0]
+    if progress is not None:
+        progress(done, n_paths, aggregate.risk_summary(agg, PERCENTILES))
+
+    jobs = [(dists, base, size, seq, guess, copy.deepcopy(template), keep_paths)
+            for size, seq in zip(sizes[1:], seeds[1:])]
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(jobs) <= 1 or n_paths <= INLINE_MAX_PATHS:
+        results = map(_run_chunk, jobs)
+        futures = []
+    else:
+        futures = [_pool(workers).submit(_run_chunk, job) for job in jobs]
+        results = (future.result() for future in futures)
+    try:
+        for (part, metrics), size in zip(results, sizes[1:]):
+            agg = aggregate.risk_merge(agg, part)
+            if keep_paths:
+                kept.append(metrics)
+            done += size
+            if progress is not None:
+                progress(done, n_paths, aggregate.risk_summary(agg, PERCENTILES))
+    except BrokenProcessPool:
+        # 작업자가 죽은 풀은 버리고 다음 호출에서 새로 만듦
+        with _pools_lock:
+            _pools.pop(workers, None)
+        raise
+    finally:
+        # 풀은 그대로 두고 아직 시작하지 않은 chunk 만 취소
+        for future in futures:
+            future.cancel()
+
+    summary = aggregate.risk_summary(agg, PERCENTILES)
+    paths = None
+    if keep_paths:
+        paths = {k: np.concatenate([m[k] for m in kept]) for k in kept[0]}
+        summary["irr_no_root_share"] = float(np.mean(paths["inv_irr_status"] == irr.IRR_NO_ROOT))
+    return summary, paths
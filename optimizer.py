@@ -0,0 +1,122 @@
+import numpy as np
+import pandas as pd
+
+import closed_form
+import deal
+import irr
+import scenarios
+
+# ==========================================
+# 계약 조건(Term sheet) 최적화 - p10.py 모델
+# ==========================================
+# 사용 예:
+#   result = optimizer.optimize({"daily_kwh": 25}, min_inv_irr=0.06, min_balance=0)
+#   result["best"]    # 회사 NPV 최대 조건 (dict, 충족 조건이 없으면 None)
+#   result["front"]   # 투자자 IRR ↔ 회사 NPV 파레토 프론트 (DataFrame, 회사 NPV 내림차순)
+#
+# - 후보 = axes 의 모든 조합. chunk 단위로 closed_form 평가 (월별 배열 없음)
+# - 가지치기
+#   1) 결과가 같은 후보 제거: 2단계 기간 0 이면 배분율 무관, 상환 연도는 시뮬레이션 기간 이내만
+#   2) 조건 선별: 최저 잔고 >= min_balance, 투자자 IRR >= min_inv_irr
+#      (투자자 현금흐름은 부호가 한 번만 바뀌므로 목표 수익률로 할인한 투자자 NPV >= 0 으로 판정)
+#   3) 남은 후보만 투자자 IRR 계산 (closed_form.irr_monthly, 구간 합 이분법)
+# - 파레토 프론트: 회사 NPV 와 투자자 IRR 어느 쪽도 더 나은 후보가 없는 조건들
+
+# 기본 탐색 범위
+DEFAULT_AXES = {
+    "p1_rate_annual": np.round(np.arange(0.02, 0.1201, 0.005), 4),
+    "p1_years": np.arange(1, 6),
+    "p2_years": np.arange(0, 6),
+    "p2_share": np.round(np.arange(0, 1.0001, 0.05), 2),
+    "repayment_year": np.arange(1, 11),
+}
+
+DEFAULT_CHUNK_SIZE = 65536
+RESULT_COLUMNS = ("com_npv", "inv_irr", "inv_npv", "com_roi", "min_balance", "final_balance")
+
+
+def candidates(axes=None, base=None):
+    # 후보 조합 생성 + 결과가 같은 조합 제거
+    axes = {**DEFAULT_AXES, **(axes or {})}
+    grid = scenarios.product_grid(**axes)
+    p = {**scenarios.P10_DEFAULTS, **(base or {})}
+    keep = np.ones(len(next(iter(grid.values()))), dtype=bool)
+    if "p2_years" in grid and "p2_share" in grid:
+        first_share = np.min(axes["p2_share"])
+        keep &= (grid["p2_years"] > 0) | (grid["p2_share"] == first_share)
+    if "repayment_year" in grid:
+        keep &= grid["repayment_year"] <= p["simulation_years"]
+    return {k: v[keep] for k, v in grid.items()}
+
+
+def score(params, min_inv_irr=None, min_balance=None):
+    # 후보 chunk 평가 → (조건 충족 여부, 지표 dict)
+    col, total_months, outlay, flow_params = scenarios.p10_inputs(params)
+    rate = col["discount_rate_annual"] / 12
+    result = closed_form.evaluate(deal.P10, total_months, rate=rate, initial_balance=-outlay,
+                                  first_period=1, **flow_params)
+    investment = col["investment_amount"][:, 0]
+    ok = np.ones(result["min_balance"].shape, dtype=bool)
+    if min_balance is not None:
+        ok &= result["min_balance"] >= min_balance
+    if min_inv_irr is not None:
+        target_rate = (1 + min_inv_irr) ** (1 / 12) - 1
+        at_target = closed_form.evaluate(deal.P10, total_months, rate=target_rate, first_period=1, **flow_params)
+        ok &= (investment > 0) & (at_target["npv"]["investor"] - investment >= 0)
+
+    metrics = {
+        "com_npv": result["npv"]["company"] - outlay[:, 0],
+        "inv_npv": result["npv"]["investor"] - investment,
+        "com_roi": closed_form.roi(result["total"]["company"] - outlay[:, 0], outlay[:, 0]),
+        "min_balance": result["min_balance"],
+        "final_balance": result["final_balance"],
+    }
+    return ok, metrics
+
+
+def pareto_front(com_npv, inv_irr):
+    # 회사 NPV 내림차순으로 훑으며 투자자 IRR 이 지금까지의 최댓값보다 커지는 점만 남김 → 인덱스
+    # (IRR 이 NaN 인 점은 앞에서 빠지고 뒤 점들의 비교에도 끼지 않음)
+    order = np.lexsort((-inv_irr, -com_npv))
+    best_irr = np.fmax.accumulate(np.concatenate([[-np.inf], inv_irr[order][:-1]]))
+    return order[inv_irr[order] > best_irr]
+
+
+def optimize(base=None, axes=None, *, min_inv_irr=0.0, min_balance=0.0, chunk_size=DEFAULT_CHUNK_SIZE,
+             progress=None):
+    # base: 고정 입력값 (스칼라), axes: 탐색 변수별 후보값 (DEFAULT_AXES 덮어쓰기)
+    # progress(평가한 후보 수, 전체 후보 수, {"evaluated", "feasible"}): chunk 마다 호출
+    # 반환: {"best", "front", "evaluated", "feasible"}
+    base = dict(base or {})
+    grid = candidates(axes, base)
+    names = list(grid)
+    size = len(grid[names[0]])
+
+    kept_params, kept_metrics = [], []
+    for start in range(0, size, chunk_size):
+        chunk = {k: v[start:start + chunk_size] for k, v in grid.items()}
+        ok, metrics = score({**base, **chunk}, min_inv_irr, min_balance)
+        if ok.any():
+            kept_params.append({k: v[ok] for k, v in chunk.items()})
+            kept_metrics.append({k: v[ok] for k, v in metrics.items()})
+        if progress is not None:
+            done = min(start + chunk_size, size)
+            progress(done, size, {"evaluated": done, "feasible": sum(len(m["com_npv"]) for m in kept_metrics)})
+
+    if not kept_params:
+        return {"best": None, "front": pd.DataFrame(columns=names + list(RESULT_COLUMNS)),
+                "evaluated": size, "feasible": 0}
+
+    feasible = {k: np.concatenate([p[k] for p in kept_params]) for k in names}
+    metrics = {k: np.concatenate([m[k] for m in kept_metrics]) for k in kept_metrics[0]}
+
+    # 조건을 통과한 후보만 투자자 IRR 계산
+    col, total_months, _, flow_params = scenarios.p10_inputs({**base, **feasible})
+    monthly_irr, _ = closed_form.irr_monthly(deal.P10, total_months, col["investment_amount"], **flow_params)
+    metrics["inv_irr"] = irr.annualize(monthly_irr)
+
+    table = pd.DataFrame({**feasible, **{k: metrics[k] for k in RESULT_COLUMNS}})
+    front = table.iloc[pareto_front(metrics["com_npv"], np.nan_to_num(metrics["inv_irr"], nan=-np.inf))]
+    front = front.reset_index(drop=True)
+    best = table.iloc[int(np.argmax(metrics["com_npv"]))].to_dict()
+    return {"best": best, "front": front, "evaluated": size, "feasible": len(table)}
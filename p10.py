@@ -1,8 +1,25 @@
+import datetime
+import os
+
 import streamlit as st
 import pandas as pd
-import numpy_financial as npf
+import numpy as np
 import altair as alt
 
+import chartdata
+import cube
+import dated
+import engine
+import irr
+import jobs
+import montecarlo
+import optimizer
+import pipeline
+import resultcache
+import rollout
+import sensitivity
+import tou
+
 # 페이지 기본 설정
 st.set_page_config(page_title="태성콘텍 충전인프라 월별 수익성 분석", layout="wide")
 
@@ -38,6 +55,14 @@ with st.sidebar.expander("0. 기간 및 상환(Exit) 설정", expanded=True):
         repayment_year = None
         repayment_month_idx = None
 
+    st.markdown("---")
+    st.write("📅 **달력 기준**")
+    use_calendar = st.checkbox("실제 날짜 기준 계산", value=False,
+                               help="월 충전량에 평균 일수(365/12일) 대신 각 달의 실제 일수를 쓰고, "
+                                    "실제 날짜 기준 XNPV/XIRR 을 함께 보여줍니다. (윤년·월 중간 시작 반영)")
+    start_date = st.date_input("사업 시작일", value=datetime.date(2025, 1, 1),
+                               help="실제 날짜 기준 계산과 시간대별 요금(TOU) 달력에 함께 쓰입니다.")
+
 # 1. 자금조달 및 비용
 with st.sidebar.expander("1. 자금조달 및 투자비용", expanded=False):
     infra_cost = st.number_input("충전인프라 투자비(원/1기)", value=2700000, step=100000)
@@ -72,131 +97,197 @@ with st.sidebar.expander("3. 매출 및 운영 변수", expanded=False):
     st.write("**비용 설정**")
     kepco_base = st.number_input("한전 기본료(원/kW)", value=2390)
     kwh_cost = st.number_input("전력 매입단가(원/kWh)", value=150)
+    use_tou = st.checkbox("시간대별 요금(TOU) 적용", value=False,
+                          help="계절·시간대별 전력량 요금을 시간별 충전 프로필에 곱해 월별 단가로 환산합니다. "
+                               "적용하면 위의 전력 매입단가 대신 사용합니다.")
     monthly_maint = st.number_input("월 관리비(원/기)", value=10000)
     
     discount_rate_annual = st.slider("연 할인율(%) - NPV/IRR용", 1.0, 15.0, 5.0) / 100.0
 
+# 4. 불확실성 분석 (몬테카를로)
+with st.sidebar.expander("4. 불확실성 분석 (몬테카를로)", expanded=False):
+    use_mc = st.checkbox("몬테카를로 분석 실행", value=False)
+    mc_paths = st.select_slider("시뮬레이션 경로 수", options=[1000, 10000, 50000, 100000], value=10000)
+    mc_kwh_sd = st.slider("일평균 충전량 변동성(표준편차 %)", 0, 100, 25)
+    mc_price_sd = st.slider("정상 요금 변동성(표준편차 %)", 0, 50, 5)
+    mc_cost_sd = st.slider("전력 매입단가 변동성(표준편차 %)", 0, 50, 10)
+    mc_rho = st.slider("월간 자기상관(ρ)", 0.0, 0.99, 0.7)
+    mc_seed = st.number_input("난수 시드", value=42, step=1)
+
+# 5. 계약 조건 최적화
+with st.sidebar.expander("5. 계약 조건 최적화 (Term sheet)", expanded=False):
+    use_opt = st.checkbox("조건 최적화 실행", value=False,
+                          help="1단계 이자율/기간, 2단계 기간/배분율, 상환 연도 조합 중 회사 NPV 가 가장 큰 조건을 찾습니다.")
+    opt_min_irr = st.slider("투자자 최소 연 IRR(%)", 0.0, 20.0, 6.0) / 100.0
+    opt_min_balance = st.number_input("회사 최저 잔고 하한(원)", value=0, step=100000)
+
+# 6. 민감도 분석
+with st.sidebar.expander("6. 민감도 분석 (토네이도)", expanded=False):
+    use_sens = st.checkbox("민감도 분석 실행", value=False)
+    sens_pct = st.slider("변동 폭(±%)", 1, 50, 10)
+
+# 7. 단계적 설치 (롤아웃)
+with st.sidebar.expander("7. 단계적 설치 (롤아웃)", expanded=False):
+    use_rollout = st.checkbox("롤아웃 현금흐름 보기", value=False,
+                              help="현재 입력값을 1기당 조건(투자유치 금액 포함)으로 보고, 설치 월별로 코호트를 나눠 합산합니다.")
+    rollout_text = st.text_input("월별 설치 대수 (0월부터, 쉼표 구분)", value="1, 0, 0, 2, 2, 2, 0, 0, 3")
+
+# 8. 사전 계산 큐브
+with st.sidebar.expander("8. 사전 계산 큐브 (빠른 조회)", expanded=False):
+    use_cube = st.checkbox("큐브 조회 보기", value=False,
+                           help="python cube.py -o cube 로 미리 계산한 격자에서 보간합니다. "
+                                "격자 밖이거나 고정 변수가 다르면 엔진으로 계산합니다.")
+    cube_path = st.text_input("큐브 폴더", value="cube", disabled=not use_cube)
+
+# 모델 입력값 (일괄 계산 모듈 공용 형식)
+model_params = {
+    "simulation_years": simulation_years,
+    "use_repayment": use_repayment,
+    "repayment_year": repayment_year or 0,
+    "infra_cost": infra_cost,
+    "charger_cost": charger_cost,
+    "subsidy": subsidy,
+    "num_units": num_units,
+    "investment_amount": investment_amount,
+    "p1_years": p1_years,
+    "p1_rate_annual": p1_rate_annual,
+    "p2_years": p2_years,
+    "p2_share": p2_share,
+    "promo_months": promo_months,
+    "promo_price": promo_price,
+    "normal_price": normal_price,
+    "daily_kwh": daily_kwh,
+    "kepco_base": kepco_base,
+    "kwh_cost": kwh_cost,
+    "monthly_maint": monthly_maint,
+    "discount_rate_annual": discount_rate_annual,
+}
+
 # ==========================================
-# [계산 로직: 월별(Monthly)]
+# [계산 로직: 월별(Monthly)] - 증분 재계산 + 입력값 기준 캐시
 # ==========================================
-
-# 초기 투자비 계산
-total_setup = (infra_cost + charger_cost) * num_units
-total_subsidy = subsidy * num_units
-net_capex = total_setup - total_subsidy
-company_initial_outlay = net_capex - investment_amount
-
-# 현금흐름 배열 초기화 (0시점 = 투자시점)
-schedule = []
-investor_cf = [-investment_amount] 
-company_cf = [-company_initial_outlay]
-
-# 상수 계산
-avg_days_in_month = 365 / 12  
-p1_end_month = p1_years * 12
-p2_end_month = (p1_years + p2_years) * 12
-
-# 월별 시뮬레이션 루프
-for month_idx in range(1, total_months + 1):
-    current_year = (month_idx - 1) // 12 + 1
-    current_month_in_year = (month_idx - 1) % 12 + 1
-    
-    # A. 매출 계산
-    is_promo = month_idx <= promo_months
-    current_price = promo_price if is_promo else normal_price
-    
-    monthly_volume = daily_kwh * avg_days_in_month * num_units
-    revenue = monthly_volume * current_price
-        
-    # B. 비용 계산
-    base_cost = 7 * kepco_base * num_units 
-    var_cost = monthly_volume * kwh_cost
-    maint_cost = monthly_maint * num_units
-    total_opex = base_cost + var_cost + maint_cost
-    
-    # C. 영업이익
-    op_profit = revenue - total_opex
-    
-    # D. 운영 수익 배분
-    op_investor_share = 0
-    op_company_share = 0
-    phase_label = ""
-    
-    if month_idx <= p1_end_month:
-        phase_label = "1단계(이자)"
-        op_investor_share = investment_amount * (p1_rate_annual / 12)
-        op_company_share = op_profit - op_investor_share
-    elif month_idx <= p2_end_month:
-        phase_label = "2단계(배분)"
-        if op_profit > 0:
-            op_investor_share = op_profit * p2_share
-            op_company_share = op_profit - op_investor_share
+# 위젯을 바꿀 때마다 스크립트 전체가 다시 실행되므로,
+# - 숫자 계산은 세션별 파이프라인(pipeline.py)이 바뀐 단계만 다시 계산합니다.
+#   (할인율 → NPV 만, 프로모션 기간 → 바뀐 달만, 상환 시점 → 해당 월만)
+# - 표/차트/CSV 는 할인율을 제외한 입력값으로 캐시합니다 (최대 CACHE_MAX_ENTRIES 개, 오래된 항목부터 제거).
+CACHE_MAX_ENTRIES = 64
+
+# 무거운 분석(몬테카를로/최적화/민감도/롤아웃)은 디스크 공유 캐시(resultcache.py)에도 저장해
+# 다른 사용자 세션, 작업자 프로세스, 서버 재시작 후에도 같은 입력이면 다시 계산하지 않습니다.
+RESULT_CACHE_PATH = os.environ.get("TSCT_RESULT_CACHE", resultcache.DEFAULT_PATH)
+
+@st.cache_resource(show_spinner=False)
+def shared_cache(path):
+    return resultcache.ResultCache(path)
+
+# 몬테카를로/최적화는 백그라운드 작업(jobs.py)으로 돌려 계산 중에도 위젯 조작이 막히지 않게 합니다.
+# 작업 실행기는 서버 전체에서 하나라 같은 입력의 작업은 세션이 달라도 한 번만 실행됩니다.
+JOB_POLL_SECONDS = 1.0
+
+@st.cache_resource(show_spinner=False)
+def job_runner():
+    return jobs.JobRunner()
+
+def show_job(job, label, render):
+    # 진행 중이면 이 부분만 JOB_POLL_SECONDS 마다 다시 그리고, 끝나면 앱 전체를 한 번 다시 실행
+    polling = not job.finished
+
+    @st.fragment(run_every=JOB_POLL_SECONDS if polling else None)
+    def panel():
+        state = job.snapshot()
+        if polling and state["status"] in jobs.FINISHED:
+            st.rerun()
+        if state["status"] == jobs.DONE:
+            render(state["result"], None)
+        elif state["status"] in (jobs.QUEUED, jobs.RUNNING):
+            st.progress(state["progress"], text=f"{label} {jobs.STATUS_LABELS[state['status']]} "
+                                                f"({state['progress'] * 100:.0f}%, {state['elapsed']:.0f}초)")
+            if st.button("⏹ 계산 취소", key=f"cancel_{job.key}"):
+                job.cancel()
+            if state["partial"] is not None:
+                render(state["partial"], state["progress"])
         else:
-            op_investor_share = 0
-            op_company_share = op_profit
-    else:
-        phase_label = "3단계(독점)"
-        op_investor_share = 0
-        op_company_share = op_profit
-    
-    # E. 원금 상환 로직
-    principal_flow = 0
-    if use_repayment and month_idx == repayment_month_idx:
-        principal_flow = investment_amount
-        phase_label += " (💰원금상환)"
-    
-    # 최종 현금흐름
-    final_investor_flow = op_investor_share + principal_flow
-    final_company_flow = op_company_share - principal_flow
-        
-    # 데이터 저장
-    schedule.append({
-        "누적월": month_idx,
-        "년차": current_year,
-        "월": current_month_in_year,
+            if state["status"] == jobs.FAILED:
+                st.error(f"{label} 실패: {state['error']}")
+            else:
+                st.warning(f"{label}이(가) 취소되었습니다.")
+            if st.button("🔁 다시 실행", key=f"restart_{job.key}"):
+                st.session_state[f"restart_{job.kind}"] = True
+                st.rerun()
+
+    panel()
+
+def submit_job(kind, key, fn, *args):
+    # 같은 입력의 작업이 있으면 그대로 쓰고, '다시 실행'을 누른 경우에만 실패/취소 작업을 새로 시작
+    restart = st.session_state.pop(f"restart_{kind}", False)
+    return job_runner().submit(kind, key, fn, *args, restart=restart)
+
+@st.cache_data(max_entries=CACHE_MAX_ENTRIES, show_spinner=False)
+def run_tou(daily_kwh, n_months, start):
+    # 시간 단위 TOU 계산 → 월별 실효 전력 단가 (월 수,)
+    return tou.monthly_rollup(daily_kwh=[daily_kwh], n_months=n_months, start=start)["kwh_cost"][0]
+
+model_params["kwh_cost_monthly"] = None
+if use_tou:
+    # TOU 달력은 사업 시작일이 속한 달부터
+    model_params["kwh_cost_monthly"] = run_tou(daily_kwh, total_months, f"{start_date:%Y-%m}")
+    st.sidebar.caption(f"💡 TOU 평균 전력 단가: {model_params['kwh_cost_monthly'].mean():,.1f} 원/kWh")
+
+# 달력 기준: 월별 실제 일수 (시작일 다음 달 같은 날까지)
+model_params["days_monthly"] = dated.period_days(start_date.isoformat(), total_months) if use_calendar else None
+
+# 할인율은 NPV 에만 쓰이므로 표/차트 캐시 키에서 제외
+schedule_params = {k: v for k, v in model_params.items() if k != "discount_rate_annual"}
+
+if "p10_pipeline" not in st.session_state:
+    st.session_state["p10_pipeline"] = pipeline.p10_pipeline()
+results = st.session_state["p10_pipeline"].update(**model_params)
+
+company_initial_outlay = results["capex"]["company_initial_outlay"]
+
+PHASE_LABELS = ["", "1단계(이자)", "2단계(배분)", "3단계(독점)"]
+
+@st.cache_data(max_entries=CACHE_MAX_ENTRIES, show_spinner=False)
+def compute_schedule(p, _results):
+    # _results 는 캐시 키에서 제외 (p 로 결정되는 값)
+    operating = _results["operating"]
+    principal = _results["principal"]["principal"]
+
+    # 세션·캐시마다 보관되는 표라 작은 타입으로 저장
+    # - 단계 라벨: 문자열 대신 코드(int8) + 라벨 목록 (Categorical, 표시·CSV 때만 문자열)
+    # - 금액: 원 단위 정수(int64, 반올림 - 표의 {:,.0f} 표시와 같음). 지표는 파이프라인의 실수 결과로 계산
+    phase_codes = _results["waterfall"]["phase"] + np.where(principal != 0, len(PHASE_LABELS), 0)
+    phase_label = pd.Categorical.from_codes(phase_codes.astype(np.int8),
+                                            PHASE_LABELS + [f"{label} (💰원금상환)" for label in PHASE_LABELS])
+
+    # DataFrame 생성 (열 단위)
+    months = engine.month_index(len(principal)).astype(np.int16)
+    return pd.DataFrame({
+        "누적월": months,
+        "년차": (months - 1) // 12 + 1,
+        "월": (months - 1) % 12 + 1,
         "구분": phase_label,
-        "매출": revenue,
-        "비용(OPEX)": total_opex,
-        "영업이익": op_profit,
-        "투자자수익": final_investor_flow,
-        "회사수익": final_company_flow
+        "매출": engine.round_won(operating["revenue"]),
+        "비용(OPEX)": engine.round_won(operating["opex"]),
+        "영업이익": engine.round_won(operating["op_profit"]),
+        "투자자수익": engine.round_won(_results["flows"]["investor"]),
+        "회사수익": engine.round_won(_results["flows"]["company"]),
+        "회사_누적현금": engine.round_won(_results["balance"]["balance"]),
     })
-    
-    investor_cf.append(final_investor_flow)
-    company_cf.append(final_company_flow)
-
-# DataFrame 생성
-df = pd.DataFrame(schedule)
 
-# 누적 현금흐름(잔고) 계산
-df["회사_누적현금"] = df["회사수익"].cumsum() - company_initial_outlay
-df["Zero"] = 0 
-
-# ==========================================
-# [지표 계산 함수]
-# ==========================================
-def calculate_financials_monthly(monthly_cf, initial_investment, annual_discount_rate):
-    monthly_rate = annual_discount_rate / 12
-    npv = npf.npv(monthly_rate, monthly_cf)
-    try:
-        monthly_irr = npf.irr(monthly_cf)
-        if pd.isna(monthly_irr): 
-            annual_irr = 0
-        else:
-            annual_irr = (1 + monthly_irr) ** 12 - 1
-    except:
-        annual_irr = 0
-        
-    total_net_profit = sum(monthly_cf) 
-    if initial_investment > 0:
-        roi = (total_net_profit / initial_investment) * 100 
-    else:
-        roi = 0 
-    return npv, annual_irr, roi
+def format_irr(annual_irr, irr_status):
+    if irr_status == irr.IRR_OK:
+        return f"{annual_irr*100:.2f} %"
+    if irr_status == irr.IRR_MULTIPLE:
+        return f"{annual_irr*100:.2f} % ({irr.STATUS_LABELS[irr_status]})"
+    return f"N/A ({irr.STATUS_LABELS[irr_status]})"
 
 # 지표 계산
-inv_npv, inv_irr, inv_roi = calculate_financials_monthly(investor_cf, investment_amount, discount_rate_annual)
-com_npv, com_irr, com_roi = calculate_financials_monthly(company_cf, company_initial_outlay, discount_rate_annual)
+df = compute_schedule(schedule_params, results)
+returns = results["returns"]
+inv_irr, inv_irr_status, inv_roi = returns["inv_irr"], returns["inv_irr_status"], returns["inv_roi"]
+com_irr, com_irr_status, com_roi = returns["com_irr"], returns["com_irr_status"], returns["com_roi"]
+inv_npv, com_npv = results["npv"]["inv_npv"], results["npv"]["com_npv"]
 
 # ==========================================
 # [메인 화면 출력]
@@ -218,7 +309,7 @@ with col_inv:
     st.markdown(f"""
     <div style="background-color: #f0f2f6; padding: 15px; border-radius: 10px; border: 1px solid #d1d5db;">
         <h2 style="margin:0; color: #0068c9;">ROI: {inv_roi:.1f} %</h2>
-        <p style="margin:0;">연 IRR: {inv_irr*100:.2f} % | NPV: {inv_npv:,.0f} 원</p>
+        <p style="margin:0;">연 IRR: {format_irr(inv_irr, inv_irr_status)} | NPV: {inv_npv:,.0f} 원</p>
     </div>
     """, unsafe_allow_html=True)
 
@@ -229,47 +320,91 @@ with col_com:
     st.markdown(f"""
     <div style="background-color: #f0f2f6; padding: 15px; border-radius: 10px; border: 1px solid #d1d5db;">
         <h2 style="margin:0; color: #2e7d32;">ROI: {com_roi_str}</h2>
-        <p style="margin:0;">연 IRR: {com_irr*100:.2f} % | NPV: {com_npv:,.0f} 원</p>
+        <p style="margin:0;">연 IRR: {format_irr(com_irr, com_irr_status)} | NPV: {com_npv:,.0f} 원</p>
     </div>
     """, unsafe_allow_html=True)
 
+# 회수 시점 (누적 배열의 첫 교차 지점)
+balance = results["balance"]["balance"]
+company_cumulative = np.cumsum(engine.with_initial(results["flows"]["company"], -company_initial_outlay))
+investor_cumulative = np.cumsum(engine.with_initial(results["flows"]["investor"], -investment_amount))
+m1, m2, m3, m4 = st.columns(4)
+m1.metric("📅 회사 손익분기 (첫 흑자 전환)",
+          engine.month_label(engine.first_month_at_or_above(company_cumulative, first_month=0), total_months),
+          help="회사 누적 잔고가 처음으로 0 이상이 되는 달")
+m2.metric("🏁 회사 회수 완료", engine.month_label(engine.payback_month(balance), total_months),
+          help="이후 누적 잔고가 다시 마이너스가 되지 않는 달")
+m3.metric("🧑‍💼 투자자 원금 회수",
+          engine.month_label(engine.first_month_at_or_above(investor_cumulative, first_month=0), total_months))
+m4.metric("🌊 잔고 마이너스 기간", f"{engine.months_below(balance)} 개월",
+          help=f"최장 연속 {engine.longest_run_below(balance)}개월")
+
+if use_calendar:
+    # 실제 날짜 기준 수익률 (경과 일수 / 365 로 할인)
+    flow_dates = dated.flow_dates(start_date.isoformat(), total_months)
+    investor_cf = engine.with_initial(results["flows"]["investor"], -investment_amount)
+    company_cf = engine.with_initial(results["flows"]["company"], -company_initial_outlay)
+    inv_xirr, inv_xirr_status = dated.xirr(investor_cf, flow_dates)
+    com_xirr, com_xirr_status = dated.xirr(company_cf, flow_dates)
+    inv_xnpv = dated.xnpv(discount_rate_annual, investor_cf, flow_dates)
+    com_xnpv = dated.xnpv(discount_rate_annual, company_cf, flow_dates)
+    st.caption(f"📅 {start_date:%Y-%m-%d} 시작 ~ {flow_dates[-1]} · 실제 날짜 기준 "
+               f"투자자 XIRR {format_irr(inv_xirr[0], inv_xirr_status[0])} | XNPV {inv_xnpv:,.0f} 원 · "
+               f"회사 XIRR {format_irr(com_xirr[0], com_xirr_status[0])} | XNPV {com_xnpv:,.0f} 원")
+
 st.markdown("---")
 
 # 2. 시각화 (Altair 그래프)
 st.subheader("📈 태성콘텍 현금흐름 분석 (Cash Flow & Balance)")
 
-base = alt.Chart(df).encode(x=alt.X('누적월:Q', title='경과 월 (Month)'))
-
-# [레이어 1] 누적 잔고 (좌측 Y축)
-balance_line = base.mark_line(color='#2e7d32', strokeWidth=3).encode(
-    y=alt.Y('회사_누적현금:Q', axis=alt.Axis(title='누적 현금 잔고 (원)', titleColor='#2e7d32')),
-    tooltip=[alt.Tooltip('누적월'), alt.Tooltip('회사_누적현금', format=',.0f')]
-)
-
-balance_area = base.mark_area(opacity=0.1, color='#2e7d32').encode(
-    y='회사_누적현금:Q'
-)
-
-# 0원 기준선
-zero_rule = base.mark_rule(color='red', strokeDash=[5, 5]).encode(y='Zero:Q')
-
-# [레이어 2] 월별 순수익 (우측 Y축)
-monthly_bar = base.mark_bar(opacity=0.3, color='#1f77b4').encode(
-    y=alt.Y('회사수익:Q', axis=alt.Axis(title='월별 순수익 (원)', titleColor='#1f77b4')),
-    tooltip=[alt.Tooltip('누적월'), alt.Tooltip('회사수익', format=',.0f', title='월 순수익')]
-)
-
-# 차트 결합
-chart = alt.layer(
-    balance_area + balance_line + zero_rule, 
-    monthly_bar                              
-).resolve_scale(
-    y='independent' 
-).properties(
-    height=400,
-    title="월별 수익(막대) 및 누적 현금잔고(선) 복합 차트"
-)
+@st.cache_resource(max_entries=CACHE_MAX_ENTRIES, show_spinner=False)
+def build_chart(p, _results):
+    df = compute_schedule(p, _results)
+
+    # 브라우저로는 그리는 열만, 점 수를 제한해서 보냄 (chartdata.py)
+    # - 잔고 선: chartdata.MAX_POINTS 점 이하 (LTTB)
+    # - 순수익 막대: chartdata.MAX_MONTHLY_BARS 개월을 넘으면 연 단위 합계 (그 해 마지막 월 위치)
+    line_df = chartdata.downsample(df, '누적월', ['회사_누적현금'])
+    if len(df) > chartdata.MAX_MONTHLY_BARS:
+        bar_df, bar_unit, bar_label = chartdata.yearly_rollup(df, '누적월', sums=['회사수익']), '연', '연간'
+    else:
+        bar_df, bar_unit, bar_label = df[['누적월', '회사수익']], '월', '월별'
+
+    base = alt.Chart(line_df).encode(x=alt.X('누적월:Q', title='경과 월 (Month)'))
 
+    # [레이어 1] 누적 잔고 (좌측 Y축)
+    balance_line = base.mark_line(color='#2e7d32', strokeWidth=3).encode(
+        y=alt.Y('회사_누적현금:Q', axis=alt.Axis(title='누적 현금 잔고 (원)', titleColor='#2e7d32')),
+        tooltip=[alt.Tooltip('누적월'), alt.Tooltip('회사_누적현금', format=',.0f')]
+    )
+
+    balance_area = base.mark_area(opacity=0.1, color='#2e7d32').encode(
+        y='회사_누적현금:Q'
+    )
+
+    # 0원 기준선 (행마다 0 열을 두지 않고 한 점짜리 데이터로)
+    zero_rule = alt.Chart(pd.DataFrame({"y": [0]})).mark_rule(color='red', strokeDash=[5, 5]).encode(y='y:Q')
+
+    # [레이어 2] 월별 순수익 (우측 Y축)
+    monthly_bar = alt.Chart(bar_df).mark_bar(opacity=0.3, color='#1f77b4').encode(
+        x='누적월:Q',
+        y=alt.Y('회사수익:Q', axis=alt.Axis(title=f'{bar_label} 순수익 (원)', titleColor='#1f77b4')),
+        tooltip=[alt.Tooltip('누적월'), alt.Tooltip('회사수익', format=',.0f', title=f'{bar_unit} 순수익')]
+    )
+
+    # 차트 결합
+    chart = alt.layer(
+        balance_area + balance_line + zero_rule, 
+        monthly_bar                              
+    ).resolve_scale(
+        y='independent' 
+    ).properties(
+        height=400,
+        title=f"{bar_label} 수익(막대) 및 누적 현금잔고(선) 복합 차트"
+    )
+    return chart
+
+chart = build_chart(schedule_params, results)
 st.altair_chart(chart, use_container_width=True)
 
 st.caption("""
@@ -279,6 +414,189 @@ st.caption("""
 """)
 
 
+# 2-1. 몬테카를로 결과
+def monte_carlo_job(job, cache, key, p, dists, n_paths, seed):
+    def progress(done, total, partial):
+        job.report(done / total, partial, f"{done:,}/{total:,} 경로")
+
+    return cache.get_or_compute(
+        "p10_montecarlo", key,
+        lambda: montecarlo.run(dists, base=p, n_paths=n_paths, seed=seed, progress=progress)[0])
+
+def render_monte_carlo(mc_summary, partial_progress):
+    if partial_progress is not None:
+        st.caption(f"중간 결과 (경로 {partial_progress * 100:.0f}% 계산 기준)")
+    mc_table = pd.DataFrame({
+        "회사 NPV (원)": [f"{mc_summary['com_npv'][p]:,.0f}" for p in montecarlo.PERCENTILES],
+        "투자자 연 IRR": [f"{mc_summary['inv_irr'][p]*100:.2f} %" for p in montecarlo.PERCENTILES],
+        "최저 잔고 (원)": [f"{mc_summary['min_balance'][p]:,.0f}" for p in montecarlo.PERCENTILES],
+    }, index=[f"P{p}" for p in montecarlo.PERCENTILES])
+    st.table(mc_table)
+    st.metric("⚠️ 잔고 마이너스 발생 확률", f"{mc_summary['prob_negative_balance']*100:.1f} %")
+
+    # 분위수 밴드는 경로를 모으면서 서버에서 계산된 값 (aggregate.py) → 점 수만 줄여 팬 차트로
+    bands = mc_summary["balance_bands"]
+    low, mid, high = (f"P{p}" for p in montecarlo.PERCENTILES)
+    band_df = pd.DataFrame({f"P{p}": bands[p] for p in montecarlo.PERCENTILES})
+    band_df.insert(0, "누적월", np.arange(1, len(band_df) + 1))
+    band_df = chartdata.downsample(band_df, "누적월", [low, mid, high])
+    band_base = alt.Chart(band_df).encode(x=alt.X("누적월:Q", title="경과 월 (Month)"))
+    fan = band_base.mark_area(opacity=0.25, color="#2e7d32").encode(
+        y=alt.Y(f"{low}:Q", title="누적 현금 잔고 (원)"), y2=f"{high}:Q",
+    ) + band_base.mark_line(color="#2e7d32").encode(
+        y=f"{mid}:Q",
+        tooltip=["누적월"] + [alt.Tooltip(c, format=",.0f") for c in (low, mid, high)],
+    )
+    st.altair_chart(fan.properties(height=300), use_container_width=True)
+    st.caption(f"회사 누적 현금 잔고의 월별 분위수 밴드 (음영 {low}~{high}, 선 {mid})")
+
+if use_mc:
+    st.subheader("🎲 불확실성 분석 (몬테카를로)")
+    mc_dists = {
+        "daily_kwh": {"dist": "lognormal", "mean": daily_kwh, "sd": daily_kwh * mc_kwh_sd / 100, "rho": mc_rho},
+        "normal_price": {"dist": "normal", "mean": normal_price, "sd": normal_price * mc_price_sd / 100, "rho": mc_rho, "min": 0},
+        "kwh_cost": {"dist": "normal", "mean": kwh_cost, "sd": kwh_cost * mc_cost_sd / 100, "rho": mc_rho, "min": 0},
+    }
+    mc_key = {"params": model_params, "dists": mc_dists, "n_paths": mc_paths, "seed": int(mc_seed)}
+    mc_job = submit_job("p10_montecarlo", mc_key, monte_carlo_job, shared_cache(RESULT_CACHE_PATH), mc_key,
+                        model_params, mc_dists, mc_paths, int(mc_seed))
+    show_job(mc_job, "몬테카를로", render_monte_carlo)
+
+# 2-2. 계약 조건 최적화 결과
+def optimizer_job(job, cache, key, p, min_inv_irr, min_balance):
+    axes = None if p["use_repayment"] else {"repayment_year": [1]}
+    base = {k: v for k, v in p.items() if k not in optimizer.DEFAULT_AXES}
+
+    def progress(done, total, partial):
+        job.report(done / total, partial)
+
+    return cache.get_or_compute(
+        "p10_optimizer", key,
+        lambda: optimizer.optimize(base, axes, min_inv_irr=min_inv_irr, min_balance=min_balance, progress=progress))
+
+def render_optimizer(opt, partial_progress):
+    st.caption(f"평가 조합 {opt['evaluated']:,}개 중 조건 충족 {opt['feasible']:,}개")
+    if partial_progress is not None:
+        return
+
+    if opt["best"] is None:
+        st.warning("조건을 만족하는 계약 조건이 없습니다. 투자자 최소 IRR 또는 최저 잔고 하한을 낮춰 보세요.")
+    else:
+        best = opt["best"]
+        best_table = pd.DataFrame({
+            "항목": ["1단계 연이자율", "1단계 기간", "2단계 기간", "2단계 배분율", "원금 상환 시점",
+                   "회사 NPV", "투자자 연 IRR", "회사 최저 잔고"],
+            "최적 조건": [
+                f"{best['p1_rate_annual']*100:.1f} %", f"{int(best['p1_years'])} 년", f"{int(best['p2_years'])} 년",
+                f"{best['p2_share']*100:.0f} %",
+                f"{int(best['repayment_year'])} 년차" if use_repayment else "상환 없음",
+                f"{best['com_npv']:,.0f} 원", f"{best['inv_irr']*100:.2f} %", f"{best['min_balance']:,.0f} 원",
+            ],
+        })
+        st.table(best_table)
+
+        front = opt["front"].assign(투자자_IRR=lambda f: f["inv_irr"] * 100, 회사_NPV=lambda f: f["com_npv"])
+        st.scatter_chart(front, x="투자자_IRR", y="회사_NPV")
+        st.caption("투자자 IRR(%) ↔ 회사 NPV(원) 파레토 프론트: 한쪽을 높이려면 다른 쪽을 양보해야 하는 조건들")
+
+if use_opt:
+    st.subheader("🧮 계약 조건 최적화 (회사 NPV 최대화)")
+    opt_key = {"params": model_params, "min_inv_irr": opt_min_irr, "min_balance": opt_min_balance}
+    opt_job = submit_job("p10_optimizer", opt_key, optimizer_job, shared_cache(RESULT_CACHE_PATH), opt_key,
+                         model_params, opt_min_irr, opt_min_balance)
+    show_job(opt_job, "조건 최적화", render_optimizer)
+
+# 2-3. 민감도 분석 (토네이도 차트)
+@st.cache_data(max_entries=CACHE_MAX_ENTRIES, show_spinner=False)
+def run_sensitivity(p, pct):
+    return shared_cache(RESULT_CACHE_PATH).get_or_compute(
+        "p10_sensitivity", {"params": p, "pct": pct}, lambda: sensitivity.tornado(p, pct=pct))
+
+SENS_METRICS = {
+    "회사 NPV (원)": "com_npv",
+    "투자자 연 IRR (%)": "inv_irr",
+    "회사 잔고 회수 월": "payback_month",
+}
+
+if use_sens:
+    st.subheader(f"🌪️ 민감도 분석 (입력값 ±{sens_pct}%)")
+    sens = run_sensitivity(model_params, sens_pct)
+    sens_label = st.radio("지표", list(SENS_METRICS), horizontal=True)
+    metric = SENS_METRICS[sens_label]
+    scale = 100 if metric == "inv_irr" else 1
+
+    base_value = sens[f"{metric}_base"].iloc[0] * scale
+    order = sens.sort_values(f"{metric}_swing", ascending=False)["label"].tolist()
+    bars = pd.concat([
+        pd.DataFrame({"변수": sens["label"], "구분": f"-{sens_pct}%", "기준": base_value, "값": sens[f"{metric}_low"] * scale}),
+        pd.DataFrame({"변수": sens["label"], "구분": f"+{sens_pct}%", "기준": base_value, "값": sens[f"{metric}_high"] * scale}),
+    ])
+    tornado_chart = alt.Chart(bars).mark_bar(opacity=0.8).encode(
+        y=alt.Y("변수:N", sort=order, title=None),
+        x=alt.X("기준:Q", title=sens_label),
+        x2="값:Q",
+        color=alt.Color("구분:N", scale=alt.Scale(domain=[f"-{sens_pct}%", f"+{sens_pct}%"], range=["#1f77b4", "#ff7f0e"])),
+        tooltip=["변수", "구분", alt.Tooltip("값:Q", format=",.2f")],
+    ) + alt.Chart(pd.DataFrame({"기준": [base_value]})).mark_rule(color="black").encode(x="기준:Q")
+    st.altair_chart(tornado_chart.properties(height=40 * len(order) + 40), use_container_width=True)
+    st.caption("막대 길이 = 해당 입력값만 ±변동했을 때 지표의 변화 폭 (위에서부터 영향이 큰 순서). "
+               "회수 월 0 은 처음부터 잔고가 플러스, 기간 개월 수 + 1 은 기간 내 미회수를 뜻합니다.")
+
+# 2-4. 단계적 설치 (롤아웃)
+@st.cache_data(max_entries=CACHE_MAX_ENTRIES, show_spinner=False)
+def run_rollout(p, installs):
+    def compute():
+        fleet = rollout.fleet_flows(p, list(installs))
+        return pd.DataFrame({
+            "경과 월": fleet["month"],
+            "누적 설치 대수": fleet["installed"][0],
+            "운영 대수": fleet["active_units"][0],
+            "회사 월 현금흐름": fleet["company"][0],
+            "회사 누적 잔고": fleet["balance"][0],
+        })
+    return shared_cache(RESULT_CACHE_PATH).get_or_compute("p10_rollout", {"params": p, "installs": installs}, compute)
+
+if use_rollout:
+    st.subheader("🏗️ 단계적 설치 (롤아웃) 현금흐름")
+    # 입력 형식 오류만 안내하고, 계산 중 오류는 그대로 드러나게 함
+    try:
+        installs = tuple(float(x) for x in rollout_text.replace(" ", "").split(",") if x)
+    except ValueError:
+        installs = None
+    if not installs or min(installs) < 0:
+        st.error("월별 설치 대수는 0 이상의 숫자를 쉼표로 구분해 입력하세요. (예: 1, 0, 2)")
+    else:
+        fleet_df = run_rollout(model_params, installs)
+        r1, r2, r3 = st.columns(3)
+        r1.metric("총 설치 대수", f"{fleet_df['누적 설치 대수'].iloc[-1]:,.0f} 기")
+        r2.metric("최저 누적 잔고", f"{fleet_df['회사 누적 잔고'].min():,.0f} 원")
+        r3.metric("최종 누적 잔고", f"{fleet_df['회사 누적 잔고'].iloc[-1]:,.0f} 원")
+        st.line_chart(chartdata.downsample(fleet_df, "경과 월", ["회사 누적 잔고"]), x="경과 월", y="회사 누적 잔고")
+        st.caption("코호트(설치 월)마다 프로모션·이자·배분·상환 단계가 설치 월부터 따로 시작합니다. "
+                   "설치비와 투자유치 금액은 설치 월에 반영됩니다.")
+
+# 2-5. 사전 계산 큐브 조회
+@st.cache_resource(max_entries=CACHE_MAX_ENTRIES, show_spinner=False)
+def load_cube(path):
+    # 메모리 맵으로 열어 두고 조회할 때 필요한 꼭짓점만 읽음
+    return cube.open_cube(path)
+
+if use_cube:
+    st.subheader("⚡ 사전 계산 큐브 조회")
+    try:
+        scenario_cube = load_cube(cube_path)
+    except (OSError, ValueError):
+        scenario_cube = None
+        st.warning(f"큐브를 열 수 없습니다: {cube_path} (python cube.py -o {cube_path} 로 먼저 생성하세요)")
+    cube_metrics, interpolated = cube.evaluate(scenario_cube, model_params)
+    k1, k2, k3, k4 = st.columns(4)
+    k1.metric("투자자 NPV", f"{cube_metrics['inv_npv']:,.0f} 원")
+    k2.metric("투자자 연 IRR", "N/A" if np.isnan(cube_metrics["inv_irr"]) else f"{cube_metrics['inv_irr'] * 100:.2f} %")
+    k3.metric("회사 NPV", f"{cube_metrics['com_npv']:,.0f} 원")
+    k4.metric("회사 최저 잔고", f"{cube_metrics['min_balance']:,.0f} 원")
+    st.caption("큐브 격자 보간값입니다." if interpolated else
+               "격자 밖이거나 고정 변수가 큐브와 달라 엔진으로 계산했습니다.")
+
 # 3. 상세 데이터 테이블
 with st.expander("🗓️ 월별 상세 현금흐름표 (전체 보기)", expanded=False):
     cols_to_format = ["매출", "비용(OPEX)", "영업이익", "투자자수익", "회사수익", "회사_누적현금"]
@@ -289,5 +607,10 @@ with st.expander("🗓️ 월별 상세 현금흐름표 (전체 보기)", expand
     )
 
 # CSV 다운로드
-csv = df.to_csv(index=False).encode('utf-8-sig')
+@st.cache_data(max_entries=CACHE_MAX_ENTRIES, show_spinner=False)
+def build_csv(p, _results):
+    df = compute_schedule(p, _results)
+    return df.to_csv(index=False).encode('utf-8-sig')
+
+csv = build_csv(schedule_params, results)
 st.download_button("📥 월별 데이터 CSV 다운로드", csv, "ev_charging_monthly_roi.csv", "text/csv")
\ No newline at end of file
@@ -1,7 +1,12 @@
 import streamlit as st
-import numpy_financial as npf
+import numpy as np
 import pandas as pd
 
+import chartdata
+import deal
+import engine
+import goalseek
+
 def main():
     # --------------------------------------------------------------------------------
     # 1. 페이지 설정
@@ -78,98 +83,55 @@ def main():
     elec_rate = st.sidebar.number_input("전력 원가", value=150.0)
     monthly_maint = st.sidebar.number_input("월 관리비 (1기당)", value=10000)
     discount_rate = st.sidebar.slider("할인율 (%)", 0.0, 15.0, 5.0)
-
-    # 상수
-    COMM_COST = 3000
-    BASE_ELEC_COST = 2390 * 7
+    use_exact = st.sidebar.checkbox("정수 원 정산 (끝전 마지막 달 정산)", value=False,
+                                    help="매월 금액을 원 단위 정수로 계산하고, 고정 지급 단계의 끝전은 단계 마지막 달에 정산합니다.")
 
     # --------------------------------------------------------------------------------
     # 3. 계산 로직
     # --------------------------------------------------------------------------------
 
-    fixed_cost_unit = BASE_ELEC_COST + COMM_COST + monthly_maint
-    
     # 월별 영업이익 계산
-    op_promo = ((daily_avg_charge * (promo_fee - elec_rate) * 30) - fixed_cost_unit) * num_chargers
-    op_normal = ((daily_avg_charge * (normal_fee - elec_rate) * 30) - fixed_cost_unit) * num_chargers
-
-    # 시뮬레이션
-    cash_flow_log = []
-    company_flows = []
-    cumulative_cash = initial_surplus
-    total_investor_paid = 0
+    op_promo = engine.flat_operating_profit(daily_avg_charge, promo_fee, elec_rate, monthly_maint, num_chargers)
+    op_normal = engine.flat_operating_profit(daily_avg_charge, normal_fee, elec_rate, monthly_maint, num_chargers)
 
     # Phase 구분용 월수 계산
     p1_months = p1_years * 12
     p2_months = p2_years * 12
-    # p3_months = p3_years * 12 (루프에서 자동 처리)
 
     end_p1 = p1_months
     end_p2 = p1_months + p2_months
 
-    for m in range(1, total_months + 1):
-        # 1. 영업이익 산출
-        if use_promo and m <= promo_months:
-            op = op_promo
-            op_str = "프로모션"
-        else:
-            op = op_normal
-            op_str = "정상"
-
-        # 2. 투자자 지급액 산출
-        payout = 0
-        phase_str = ""
-        note = ""
-
-        # [Phase 1]
-        if m <= end_p1:
-            # 이자 지급
-            interest = int((investor_amount * (p1_rate / 100)) / 12)
-            payout += interest
-            phase_str = "1단계 (이자)"
-            
-            # 마지막 달 원금 상환 (Event)
-            if m == end_p1:
-                payout += investor_amount
-                note = "💰 원금 상환"
-                phase_str = "1단계 (상환)"
-
-        # [Phase 2]
-        elif m <= end_p2:
-            # 수익 배분
-            if op > 0:
-                share = int(op * (p2_share_pct / 100))
-                payout += share
-            else:
-                payout = 0
-            phase_str = f"2단계 ({p2_share_pct}%)"
-
-        # [Phase 3]
-        else:
-            # 회사 독점
-            payout = 0
-            phase_str = "3단계 (독점)"
-            
-            # Phase 3 시작 첫 달에 메시지 표시
-            if m == end_p2 + 1:
-                note = "🚀 독점 시작"
-
-        # 3. 현금흐름 집계
-        total_investor_paid += payout
-        net_flow = op - payout
-        cumulative_cash += net_flow
-        company_flows.append(net_flow)
-
-        cash_flow_log.append({
-            "Month": m,
-            "영업": op_str,
-            "단계": phase_str,
-            "영업이익": int(op),
-            "투자자지급": int(-payout),
-            "회사순수익": int(net_flow),
-            "회사누적잔고": int(cumulative_cash),
-            "비고": note
-        })
+    # 시뮬레이션 (엔진에서 전체 기간을 배열로 한 번에 계산)
+    deal_params = dict(
+        op_promo=op_promo, op_normal=op_normal, promo_months=promo_months,
+        investor_amount=investor_amount, project_cost=project_cost, p1_years=p1_years, p1_rate=p1_rate,
+        p2_years=p2_years, p2_share_pct=p2_share_pct,
+    )
+    p5_deal = deal.P5.exact() if use_exact else deal.P5
+    sched = engine.build_schedule(
+        p5_deal.flows, total_months,
+        initial_balance=p5_deal.initial_balance(**deal_params), **deal_params,
+    )
+    months = sched["month"]
+    company_flows = sched["company"]
+    total_investor_paid = sched["investor"].sum()
+    cumulative_cash = sched["balance"][-1]
+
+    # 표시용 라벨 (행마다 문자열을 두지 않고 int8 코드 + 라벨 목록)
+    phase_labels = ["", "1단계 (이자)", f"2단계 ({p2_share_pct}%)", "3단계 (독점)", "1단계 (상환)"]
+    phase_code = np.where(months == end_p1, 4, sched["phase"]).astype(np.int8)
+    note_code = np.select([months == end_p1, months == end_p2 + 1], [1, 2], 0).astype(np.int8)
+
+    cash_flow_log = {
+        "Month": months,
+        "영업": pd.Categorical.from_codes(sched["promo"].astype(np.int8), ["정상", "프로모션"]),
+        "단계": pd.Categorical.from_codes(phase_code, phase_labels),
+        "영업이익": engine.to_won(sched["op_profit"]),
+        "투자자지급": engine.to_won(-sched["investor"]),
+        "회사순수익": engine.to_won(company_flows),
+        "회사누적잔고": engine.to_won(sched["balance"]),
+        "비고": pd.Categorical.from_codes(note_code, ["", "💰 원금 상환", "🚀 독점 시작"]),
+    }
 
     # 결과 지표
     if investor_amount > 0:
@@ -178,7 +140,7 @@ def main():
         roi = 0
 
     monthly_discount = (discount_rate / 100) / 12
-    npv = initial_surplus + npf.npv(monthly_discount, company_flows)
+    npv = initial_surplus + engine.npv(monthly_discount, company_flows)
 
     # --------------------------------------------------------------------------------
     # 4. 결과 시각화
@@ -194,6 +156,11 @@ def main():
         st.metric(f"🏦 3. 최종 회사 잔고 ({total_years}년)", f"{int(cumulative_cash):,} 원")
     with c4:
         st.metric("💎 4. NPV", f"{int(npv):,} 원")
+    investor_payback = engine.first_month_at_or_above(np.cumsum(sched["investor"]), investor_amount)
+    st.caption(f"📅 회사 잔고 회수: {engine.month_label(engine.payback_month(sched['balance']), total_months)} | "
+               f"잔고 마이너스 기간: {engine.months_below(sched['balance'])}개월 "
+               f"(최장 연속 {engine.longest_run_below(sched['balance'])}개월) | "
+               f"투자자 원금 회수: {engine.month_label(investor_payback if investor_amount > 0 else 0, total_months)}")
 
     st.divider()
 
@@ -217,12 +184,26 @@ def main():
         min_bal = df['회사누적잔고'].min()
         if min_bal < 0:
             st.error(f"🚨 **자금 경고:** 원금 상환 시점에 잔고가 {int(min_bal):,}원 부족합니다. 초기 투자금을 늘리거나 1단계 기간을 늘리세요.")
+
+            # 잔고 0 이상을 유지하는 조건 역산 (다른 입력값은 그대로)
+            seek_params = dict(
+                infra_cost=infra_cost, charger_cost=charger_cost, subsidy=subsidy, num_chargers=num_chargers,
+                investor_amount=investor_amount, p1_years=p1_years, p1_rate=p1_rate,
+                p2_years=p2_years, p2_share_pct=p2_share_pct, p3_years=p3_years,
+                use_promo=use_promo, promo_months=promo_months, promo_fee=promo_fee,
+                daily_avg_charge=daily_avg_charge, normal_fee=normal_fee, elec_rate=elec_rate, monthly_maint=monthly_maint,
+            )
+            need_amount = goalseek.solve("p5", "investor_amount", seek_params)["value"][0]
+            need_p1 = goalseek.solve("p5", "p1_years", seek_params)["value"][0]
+            amount_str = f"{int(need_amount):,} 원" if np.isfinite(need_amount) else "범위 내 없음"
+            p1_str = f"{int(need_p1)} 년" if np.isfinite(need_p1) else "범위 내 없음"
+            st.info(f"💡 **잔고 0 이상 유지 조건 (역산):** 최소 유치 금액 {amount_str} / 최단 1단계 기간 {p1_str}")
         else:
             st.success(f"✅ **안정적:** 최저 잔고가 {int(min_bal):,}원으로, 원금 상환 위기를 잘 넘겼습니다.")
 
     with right:
         st.subheader("📉 기간별 회사 누적 수익 추이")
-        st.line_chart(df, x="Month", y="회사누적잔고", color="#2980B9")
+        st.line_chart(chartdata.downsample(df, "Month", ["회사누적잔고"]), x="Month", y="회사누적잔고", color="#2980B9")
         st.caption("그래프가 급락(원금상환) 후 다시 상승하는지 확인하세요. Phase 3에서 기울기가 가장 가파릅니다.")
 
     with st.expander("📑 상세 데이터 (Excel 다운로드)"):
@@ -0,0 +1,235 @@
+import numpy as np
+
+import deal
+import engine
+import irr
+
+# ==========================================
+# 증분 재계산 파이프라인 (단계별 DAG)
+# ==========================================
+# 투자비 → 영업이익 → 수익 배분 → 원금 상환 → 현금흐름 → 누적 잔고 → 지표
+# - 각 단계는 마지막 결과를 보관하고, 입력이 바뀐 단계와 그 하위 단계만 다시 계산합니다.
+# - 월 단위 단계는 "바뀐 월 구간(window)"만 다시 계산할 수 있습니다.
+#   예) 프로모션 기간 6 → 8개월: 7~8월만 영업이익/배분/현금흐름을 다시 계산하고,
+#       누적 잔고는 7월부터 이어서 다시 누적합니다.
+# - 할인율만 바뀌면 NPV 단계만 다시 계산합니다.
+#
+# 사용 예:
+#   pipe = pipeline.p10_pipeline()
+#   result = pipe.update(**params)   # 첫 호출은 전체 계산
+#   result = pipe.update(**params2)  # 이후에는 바뀐 단계만 계산 (pipe.last_run 으로 확인)
+
+
+class Node:
+    # fn(inputs, prev, window) → (결과, 출력 window)
+    #   inputs: 자신의 입력 변수 + 상위 단계 결과 (단계 이름으로 접근)
+    #   prev: 직전 결과 (처음이면 None), window: 다시 계산할 월 구간 (시작, 끝) 0 기준, None 이면 전체
+    # param_windows: {변수명: f(이전 값, 새 값) → 월 구간} - 이 변수만 바뀐 경우 구간 재계산 가능
+    def __init__(self, name, fn, params=(), deps=(), param_windows=None):
+        self.name = name
+        self.fn = fn
+        self.params = tuple(params)
+        self.deps = tuple(deps)
+        self.param_windows = dict(param_windows or {})
+
+
+def _union(a, b):
+    # 월 구간 합치기 (None = 전체, 시작 >= 끝 이면 빈 구간)
+    if a is None or b is None:
+        return None
+    if a[0] >= a[1]:
+        return b
+    if b[0] >= b[1]:
+        return a
+    return (min(a[0], b[0]), max(a[1], b[1]))
+
+
+class Pipeline:
+    def __init__(self, nodes):
+        self.nodes = list(nodes)  # 위상 정렬된 순서로 전달
+        self.params = {}
+        self.results = {}
+        self.last_run = {}
+
+    def update(self, **params):
+        changed = {k for k, v in params.items() if k not in self.params or not _same(self.params[k], v)}
+        old = self.params
+        self.params = {**self.params, **params}
+
+        windows = {}
+        self.last_run = {}
+        for node in self.nodes:
+            own = changed.intersection(node.params)
+            dirty_deps = [d for d in node.deps if d in windows]
+            if node.name in self.results and not own and not dirty_deps:
+                self.last_run[node.name] = "cached"
+                continue
+
+            # 재계산 구간: 상위 단계의 변경 구간 + 자기 입력 변수의 변경 구간
+            window = ()
+            for d in dirty_deps:
+                window = windows[d] if window == () else _union(window, windows[d])
+            for k in own:
+                if node.name not in self.results or k not in node.param_windows:
+                    window = None
+                    break
+                w = node.param_windows[k](old[k], self.params[k])
+                window = w if window == () else _union(window, w)
+            if window == () or node.name not in self.results:
+                window = None
+
+            inputs = {k: self.params[k] for k in node.params}
+            inputs.update({d: self.results[d] for d in node.deps})
+            result, out_window = node.fn(inputs, self.results.get(node.name), window)
+            self.results[node.name] = result
+            windows[node.name] = out_window
+            self.last_run[node.name] = "full" if window is None else f"months {window[0] + 1}-{window[1]}"
+
+        return self.results
+
+
+def _same(a, b):
+    try:
+        return bool(np.all(a == b))
+    except Exception:
+        return a is b
+
+
+def _windowed(fn, inputs, prev, window, n_months):
+    # 전체 또는 구간만 계산해 직전 결과에 덮어씀 (원소 단위 단계 전용)
+    months = engine.month_index(n_months)
+    if window is None or prev is None:
+        return fn(months, inputs), None
+    a, b = window
+    part = fn(months[a:b], inputs)
+    result = {k: v.copy() for k, v in prev.items()}
+    for k, v in part.items():
+        result[k][a:b] = v
+    return result, window
+
+
+# ==========================================
+# [p10.py] 단계 정의
+# ==========================================
+P10_OPERATING_PARAMS = ("simulation_years", "promo_months", "promo_price", "normal_price", "daily_kwh",
+                        "num_units", "kepco_base", "kwh_cost", "monthly_maint", "kwh_cost_monthly",
+                        "days_monthly")
+P10_WATERFALL_PARAMS = ("investment_amount", "p1_years", "p1_rate_annual", "p2_years", "p2_share")
+
+
+def _capex(inputs, prev, window):
+    outlay = engine.p10_initial_outlay(inputs["infra_cost"], inputs["charger_cost"], inputs["subsidy"],
+                                       inputs["num_units"], inputs["investment_amount"])
+    return {"company_initial_outlay": outlay, "investment_amount": inputs["investment_amount"]}, None
+
+
+def _operating(inputs, prev, window):
+    n_months = inputs["simulation_years"] * 12
+    params = {k: inputs[k] for k in P10_OPERATING_PARAMS if k != "simulation_years"}
+    return _windowed(lambda m, _: engine.p10_operating(m, **params), inputs, prev, window, n_months)
+
+
+def _waterfall(inputs, prev, window):
+    operating = inputs["operating"]
+    n_months = len(operating["op_profit"])
+    params = {k: inputs[k] for k in P10_WATERFALL_PARAMS}
+
+    def compute(months, _):
+        op_profit = operating["op_profit"][months - 1]
+        return deal.P10.payout(months, op_profit, **params)
+
+    return _windowed(compute, inputs, prev, window, n_months)
+
+
+def _repayment_month(use_repayment, repayment_year, simulation_years):
+    return int(min(repayment_year, simulation_years) * 12) if use_repayment else 0
+
+
+def _principal(inputs, prev, window):
+    n_months = inputs["simulation_years"] * 12
+    month = _repayment_month(inputs["use_repayment"], inputs["repayment_year"], inputs["simulation_years"])
+    principal = deal.P10.principal(engine.month_index(n_months),
+                                   investment_amount=inputs["investment_amount"], repayment_month=month)
+    result = {"principal": principal, "repayment_month": month}
+
+    # 직전 상환월과 새 상환월만 바뀌므로 두 달을 포함하는 구간만 하위로 전달
+    if prev is not None and len(prev["principal"]) == n_months:
+        touched = [m for m in (prev["repayment_month"], month) if m > 0]
+        if not touched:
+            return result, (0, 0)
+        if prev["repayment_month"] == month and np.array_equal(prev["principal"], principal):
+            return result, (0, 0)
+        return result, (min(touched) - 1, max(touched))
+    return result, None
+
+
+def _flows(inputs, prev, window):
+    op_profit = inputs["operating"]["op_profit"]
+    op_investor = inputs["waterfall"]["op_investor"]
+    principal = inputs["principal"]["principal"]
+    if window is None or prev is None:
+        return deal.P10.combine(op_profit, op_investor, principal), None
+    a, b = window
+    part = deal.P10.combine(op_profit[a:b], op_investor[a:b], principal[a:b])
+    result = {k: v.copy() for k, v in prev.items()}
+    for k, v in part.items():
+        result[k][a:b] = v
+    return result, window
+
+
+def _balance(inputs, prev, window):
+    # 누적 잔고: 구간 시작 월부터만 다시 누적
+    company = inputs["flows"]["company"]
+    start = -inputs["capex"]["company_initial_outlay"]
+    if window is None or prev is None or len(prev["balance"]) != len(company):
+        return {"balance": start + np.cumsum(company)}, None
+    a = window[0]
+    if a >= len(company):
+        return prev, (a, a)
+    balance = prev["balance"].copy()
+    carry = balance[a - 1] if a > 0 else start
+    balance[a:] = carry + np.cumsum(company[a:])
+    return {"balance": balance}, (a, len(company))
+
+
+def _returns(inputs, prev, window):
+    # IRR / ROI (할인율과 무관)
+    out = {}
+    for who, flow, initial in (
+        ("inv", inputs["flows"]["investor"], inputs["capex"]["investment_amount"]),
+        ("com", inputs["flows"]["company"], inputs["capex"]["company_initial_outlay"]),
+    ):
+        cf = engine.with_initial(flow, -initial)
+        # 직전 IRR 은 뉴턴 시작점으로만 쓰임 - 근 선택은 처음 계산과 같아 입력 순서와 무관
+        monthly_irr, status = irr.solve_irr(cf, guess=None if prev is None else prev[f"{who}_monthly_irr"])
+        out[f"{who}_monthly_irr"] = monthly_irr[0]
+        out[f"{who}_irr"] = irr.annualize(monthly_irr[0])
+        out[f"{who}_irr_status"] = status[0]
+        out[f"{who}_roi"] = (cf.sum() / initial * 100) if initial > 0 else 0
+    return out, None
+
+
+def _npv(inputs, prev, window):
+    monthly_rate = inputs["discount_rate_annual"] / 12
+    capex = inputs["capex"]
+    return {
+        "inv_npv": engine.npv(monthly_rate, engine.with_initial(inputs["flows"]["investor"], -capex["investment_amount"])),
+        "com_npv": engine.npv(monthly_rate, engine.with_initial(inputs["flows"]["company"], -capex["company_initial_outlay"])),
+    }, None
+
+
+def _promo_window(old, new):
+    return (min(old, new), max(old, new))
+
+
+def p10_pipeline():
+    return Pipeline([
+        Node("capex", _capex, params=("infra_cost", "charger_cost", "subsidy", "num_units", "investment_amount")),
+        Node("operating", _operating, params=P10_OPERATING_PARAMS, param_windows={"promo_months": _promo_window}),
+        Node("waterfall", _waterfall, params=P10_WATERFALL_PARAMS, deps=("operating",)),
+        Node("principal", _principal, params=("simulation_years", "use_repayment", "repayment_year", "investment_amount")),
+        Node("flows", _flows, deps=("operating", "waterfall", "principal")),
+        Node("balance", _balance, deps=("flows", "capex")),
+        Node("returns", _returns, deps=("flows", "capex")),
+        Node("npv", _npv, params=("discount_rate_annual",), deps=("flows", "capex")),
+    ])
@@ -0,0 +1,114 @@
+import numpy as np
+import pandas as pd
+
+import engine
+import irr
+import scenarios
+
+# ==========================================
+# 다중 사이트 포트폴리오 (사이트별 입력값 + 설치 시점)
+# ==========================================
+# 사용 예:
+#   sites = pd.DataFrame({"daily_kwh": [12, 25, 18], "normal_price": [288, 310, 295],
+#                         "subsidy": [1800000, 1500000, 0], "install_date": ["2025-01", "2025-04", "2026-01"]})
+#   result = portfolio.evaluate(sites)
+#   result["monthly"]   # 포트폴리오 월별 투자자/회사 현금흐름, 누적 잔고, 운영 사이트 수
+#   result["metrics"]   # 포트폴리오 NPV / IRR / 최저 잔고 / 최대 자금 소요
+#
+# - 사이트 표의 각 행 = 사이트 1곳. p10.py 변수 이름과 같은 열을 사이트별 입력값으로 쓰고, 없는 변수는 기본값.
+# - 설치 시점: install_month 열(포트폴리오 시작 기준 경과 월, 0 부터) 또는 install_date 열(연-월, 가장 이른 날이 0).
+#   둘 다 없으면 모든 사이트가 0월에 설치된 것으로 봅니다.
+# - 사이트별 (사이트 × 월) 스케줄을 chunk 단위로 계산하고, 설치 시점만큼 밀어 포트폴리오 달력에 합산합니다.
+#   사이트의 초기 투입(투자유치 금액 / 회사 초기 투입분)은 설치 월(t = 설치 시점)에, m 개월 차 현금흐름은 t = 설치 시점 + m 에 놓입니다.
+
+DEFAULT_CHUNK_SIZE = scenarios.DEFAULT_CHUNK_SIZE
+
+
+def install_offsets(sites):
+    # 사이트별 설치 시점 (포트폴리오 시작 기준 경과 월)
+    if "install_month" in sites.columns:
+        offsets = sites["install_month"].to_numpy()
+    elif "install_date" in sites.columns:
+        periods = pd.PeriodIndex(pd.to_datetime(sites["install_date"]), freq="M")
+        first = periods.min()
+        offsets = np.array([(p - first).n for p in periods])
+    else:
+        offsets = np.zeros(len(sites))
+    offsets = np.asarray(offsets, dtype=np.int64)
+    if (offsets < 0).any():
+        raise ValueError("설치 시점(install_month)은 0 이상이어야 합니다.")
+    return offsets
+
+
+def evaluate(sites, discount_rate_annual=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    # 반환: {"monthly": 포트폴리오 월별 DataFrame, "metrics": 포트폴리오 지표 dict}
+    if len(sites) == 0:
+        raise ValueError("사이트가 없습니다.")
+    params = {c: sites[c].to_numpy() for c in sites.columns if c in scenarios.P10_DEFAULTS}
+    offsets = install_offsets(sites)
+    years = params.get("simulation_years", np.full(len(sites), scenarios.P10_DEFAULTS["simulation_years"]))
+    n_periods = int((offsets + np.asarray(years) * 12).max()) + 1
+
+    investor = np.zeros(n_periods)
+    company = np.zeros(n_periods)
+    active_sites = np.zeros(n_periods, dtype=np.int64)
+    for start in range(0, len(sites), chunk_size):
+        chunk = {k: v[start:start + chunk_size] for k, v in params.items()}
+        offset = offsets[start:start + chunk_size]
+        # 사이트별 입력 열이 하나도 없어도 chunk 의 사이트 수만큼 계산되도록 기간 열을 채움
+        chunk.setdefault("simulation_years", np.full(len(offset), scenarios.P10_DEFAULTS["simulation_years"]))
+        col, sched, outlay = scenarios.p10_schedule(chunk)
+
+        # 사이트 m 개월 차 → 포트폴리오 t = 설치 시점 + m (각 사이트의 기간까지만)
+        months = sched["month"]
+        t = offset[:, None] + months[None, :]
+        active = months[None, :] <= col["simulation_years"] * 12
+        t_active = t[active]
+        investor += np.bincount(t_active, weights=sched["investor"][active], minlength=n_periods)
+        company += np.bincount(t_active, weights=sched["company"][active], minlength=n_periods)
+        active_sites += np.bincount(t_active, minlength=n_periods)
+
+        # 초기 투입은 설치 월
+        investor -= np.bincount(offset, weights=col["investment_amount"][:, 0], minlength=n_periods)
+        company -= np.bincount(offset, weights=outlay[:, 0], minlength=n_periods)
+
+    balance = np.cumsum(company)
+    if discount_rate_annual is None:
+        discount_rate_annual = scenarios.P10_DEFAULTS["discount_rate_annual"]
+    monthly_rate = discount_rate_annual / 12
+    flows = np.vstack([investor, company])
+    monthly_irr, status = irr.solve_irr(flows)
+    annual_irr = irr.annualize(monthly_irr)
+
+    # engine.payback_month 는 1월부터 센 위치를 돌려주므로 0월부터 시작하는 포트폴리오 달력에 맞춤
+    payback = int(engine.payback_month(balance))
+    payback = payback - 1 if payback > 0 else 0
+
+    monthly = pd.DataFrame({
+        "month": np.arange(n_periods),
+        "investor": investor,
+        "company": company,
+        "balance": balance,
+        "active_sites": active_sites,
+    })
+    metrics = {
+        "sites": len(sites),
+        "inv_npv": float(engine.npv(monthly_rate, investor)),
+        "inv_irr": float(annual_irr[0]),
+        "inv_irr_status": int(status[0]),
+        "com_npv": float(engine.npv(monthly_rate, company)),
+        "com_irr": float(annual_irr[1]),
+        "com_irr_status": int(status[1]),
+        "min_balance": float(balance.min()),
+        "final_balance": float(balance[-1]),
+        # 누적 잔고가 가장 깊이 내려간 만큼 외부 자금이 필요
+        "peak_funding": float(max(-balance.min(), 0.0)),
+        "payback_month": payback,
+        # 포트폴리오 달력(0월부터) 기준
+        "break_even_month": int(engine.first_month_at_or_above(balance, first_month=0)),
+        "inv_payback_month": int(engine.first_month_at_or_above(np.cumsum(investor), first_month=0)),
+        # 마이너스 기간은 p10 과 같이 첫 달(1월)부터 셈 (0월 = 첫 사이트의 초기 투입 시점)
+        "months_under_water": int(engine.months_below(balance[1:])),
+        "longest_under_water": int(engine.longest_run_below(balance[1:])),
+    }
+    return {"monthly": monthly, "metrics": metrics}
@@ -1,7 +1,11 @@
 import streamlit as st
-import numpy_financial as npf
+import numpy as np
 import pandas as pd
 
+import chartdata
+import deal
+import engine
+
 def main():
     # --------------------------------------------------------------------------------
     # 1. 페이지 설정
@@ -76,10 +80,6 @@ def main():
     elec_rate = st.sidebar.number_input("전력량 요금 (원/kWh, 원가)", value=150.0, step=10.0)
     monthly_maint = st.sidebar.number_input("월 관리비 (원/1기)", value=10000, step=1000)
 
-    # 상수
-    COMM_COST = 3000
-    BASE_ELEC_COST = 2390 * 7
-
     # --------------------------------------------------------------------------------
     # 3. 계산 로직
     # --------------------------------------------------------------------------------
@@ -89,79 +89,40 @@ def main():
     total_principal = net_investment_per_unit * num_chargers
 
     # [Step 2] 영업이익(Operating Profit) 계산 (금융비용 제외)
-    monthly_fixed_op_cost_unit = BASE_ELEC_COST + COMM_COST + monthly_maint
-    
-    # 프로모션 마진
-    margin_promo = daily_avg_charge * (promo_fee - elec_rate) * 30
-    op_profit_promo = (margin_promo - monthly_fixed_op_cost_unit) * num_chargers
-
-    # 정상 마진
-    margin_normal = daily_avg_charge * (normal_fee - elec_rate) * 30
-    op_profit_normal = (margin_normal - monthly_fixed_op_cost_unit) * num_chargers
-
-    # [Step 3] 투자자 상환액 산출
-    # 총 상환 목표액
+    op_profit_promo = engine.flat_operating_profit(daily_avg_charge, promo_fee, elec_rate, monthly_maint, num_chargers)
+    op_profit_normal = engine.flat_operating_profit(daily_avg_charge, normal_fee, elec_rate, monthly_maint, num_chargers)
+
+    # [Step 3] 투자자 상환액 산출 (1단계 이자 / 2단계 목표 총수익률까지 원리금 균등, deal.PROFIT)
+    deal_params = dict(
+        op_promo=op_profit_promo, op_normal=op_profit_normal, promo_months=promo_months,
+        total_principal=total_principal, target_investor_roi=target_investor_roi, phase1_rate=phase1_rate,
+        phase1_months=phase1_months, phase2_months=phase2_months,
+    )
+    monthly_payout_phase1, monthly_payout_phase2, _ = deal.PROFIT.phase_amounts(**deal_params)
     total_target_payout = total_principal * (1 + target_investor_roi / 100)
-    
-    # Phase 1: 이자 지급
-    monthly_payout_phase1 = (total_principal * (phase1_rate / 100)) / 12
-    total_paid_phase1 = monthly_payout_phase1 * phase1_months
-    
-    # Phase 2: 원리금 상환
-    remaining_payout = total_target_payout - total_paid_phase1
-    if phase2_months > 0:
-        monthly_payout_phase2 = remaining_payout / phase2_months
-    else:
-        monthly_payout_phase2 = 0 # 2단계가 0개월인 경우
 
-    # [Step 4] 월별 현금흐름 (Waterfall)
-    cash_flow_log = []
-    company_cash_flows = []
-    cumulative_company_cash = 0
-    
-    # 실제 상환된 총액 추적 (운영기간이 상환기간보다 짧을 경우 대비)
-    actual_paid_to_investor = 0 
-
-    for m in range(1, total_op_months + 1):
-        # (A) 매출/영업이익 계산
-        if use_promo and m <= promo_months:
-            current_op_profit = op_profit_promo
-            period_type = "프로모션"
-        else:
-            current_op_profit = op_profit_normal
-            period_type = "정상운영"
-            
-        # (B) 투자자 지급액 계산 (기간별 분기)
-        if m <= phase1_months:
-            current_investor_pay = monthly_payout_phase1
-            pay_phase = "1단계(이자)"
-        elif m <= (phase1_months + phase2_months):
-            current_investor_pay = monthly_payout_phase2
-            pay_phase = "2단계(상환)"
-        else:
-            current_investor_pay = 0
-            pay_phase = "3단계(완료)"
-            
-        actual_paid_to_investor += current_investor_pay
-
-        # (C) 회사 순수익
-        company_net_profit = current_op_profit - current_investor_pay
-        
-        cumulative_company_cash += company_net_profit
-        company_cash_flows.append(company_net_profit)
-        
-        cash_flow_log.append({
-            "Month": m,
-            "운영구분": period_type,
-            "상환구분": pay_phase,
-            "영업이익": int(current_op_profit),
-            "투자자지급": int(-current_investor_pay),
-            "회사순수익": int(company_net_profit),
-            "회사누적수익": int(cumulative_company_cash)
-        })
+    # [Step 4] 월별 현금흐름 (Waterfall) - 엔진에서 전체 기간을 배열로 한 번에 계산
+    sched = engine.build_schedule(deal.PROFIT.flows, total_op_months, **deal_params)
+    company_cash_flows = sched["company"]
+
+    # 실제 상환된 총액 (운영기간이 상환기간보다 짧을 경우 목표액 미달)
+    # 합계는 월 순서대로 누적 (np.sum 의 짝지어 더하기와 끝자리가 달라 표시용 절사 값이 1원 어긋날 수 있음)
+    actual_paid_to_investor = np.cumsum(sched["investor"])[-1]
+
+    # 표시용 라벨 (행마다 문자열을 두지 않고 int8 코드 + 라벨 목록)
+    pay_labels = ["", "1단계(이자)", "2단계(상환)", "3단계(완료)"]
+    cash_flow_log = {
+        "Month": sched["month"],
+        "운영구분": pd.Categorical.from_codes(sched["promo"].astype(np.int8), ["정상운영", "프로모션"]),
+        "상환구분": pd.Categorical.from_codes(sched["phase"].astype(np.int8), pay_labels),
+        "영업이익": engine.to_won(sched["op_profit"]),
+        "투자자지급": engine.to_won(-sched["investor"]),
+        "회사순수익": engine.to_won(company_cash_flows),
+        "회사누적수익": engine.to_won(sched["balance"]),
+    }
 
     # [Step 5] 지표 종합
-    total_company_profit = sum(company_cash_flows)
+    total_company_profit = sched["balance"][-1]
     
     if total_principal > 0:
         company_roi = (total_company_profit / total_principal) * 100
@@ -169,8 +130,8 @@ def main():
         company_roi = 0
 
     monthly_discount_rate = (discount_rate / 100) / 12
-    npv_stream = [0] + company_cash_flows 
-    company_npv = npf.npv(monthly_discount_rate, npv_stream)
+    npv_stream = engine.with_initial(company_cash_flows, 0)
+    company_npv = engine.npv(monthly_discount_rate, npv_stream)
 
     # --------------------------------------------------------------------------------
     # 4. 결과 시각화
@@ -187,6 +148,10 @@ def main():
         st.metric("📈 회사 ROI (원금대비)", f"{company_roi:.1f} %")
     with col4:
         st.metric("💎 NPV (순현재가치)", f"{int(company_npv):,} 원", help=f"할인율 {discount_rate}% 적용")
+    investor_payback = engine.first_month_at_or_above(np.cumsum(sched["investor"]), total_principal)
+    st.caption(f"📅 투자자 원금 회수: "
+               f"{engine.month_label(investor_payback if total_principal > 0 else 0, total_op_months)} | "
+               f"회사 누적수익 마이너스 기간: {engine.months_below(sched['balance'])}개월")
         
     st.divider()
 
@@ -225,7 +190,7 @@ def main():
         df_chart = pd.DataFrame(cash_flow_log)
         
         # 차트 커스텀: 상환 완료 시점 표시
-        st.line_chart(df_chart, x="Month", y="회사누적수익", color="#2E86C1")
+        st.line_chart(chartdata.downsample(df_chart, "Month", ["회사누적수익"]), x="Month", y="회사누적수익", color="#2E86C1")
         
         if debt_free_months > 0:
             payback_finish_month = total_repay_months
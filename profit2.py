@@ -1,7 +1,12 @@
 import streamlit as st
-import numpy_financial as npf
+import numpy as np
 import pandas as pd
 
+import chartdata
+import deal
+import engine
+import goalseek
+
 def main():
     # --------------------------------------------------------------------------------
     # 1. 페이지 설정
@@ -86,35 +91,31 @@ def main():
     elec_rate = st.sidebar.number_input("전력량 요금 (원/kWh, 원가)", value=150.0, step=10.0)
     monthly_maint = st.sidebar.number_input("월 관리비 (원/1기)", value=10000, step=1000)
     discount_rate = st.sidebar.slider("NPV 할인율 (%)", 0.0, 15.0, 5.0)
-
-    # 상수
-    COMM_COST = 3000
-    BASE_ELEC_COST = 2390 * 7
+    use_exact = st.sidebar.checkbox("정수 원 정산 (끝전 마지막 달 정산)", value=False,
+                                    help="매월 금액을 원 단위 정수로 계산하고, 고정 지급 단계의 끝전은 단계 마지막 달에 정산합니다.")
 
     # --------------------------------------------------------------------------------
     # 3. 계산 로직
     # --------------------------------------------------------------------------------
 
     # [A] 월간 영업이익 계산
-    monthly_fixed_cost_unit = BASE_ELEC_COST + COMM_COST + monthly_maint
-    
-    margin_promo = daily_avg_charge * (promo_fee - elec_rate) * 30
-    op_profit_promo = (margin_promo - monthly_fixed_cost_unit) * num_chargers
-
-    margin_normal = daily_avg_charge * (normal_fee - elec_rate) * 30
-    op_profit_normal = (margin_normal - monthly_fixed_cost_unit) * num_chargers
-
-    # [B] 투자자 상환액 계산 (기준: investor_amount)
-    
-    # 1. Phase 1 (이자)
-    monthly_pay_phase1 = int((investor_amount * (phase1_rate / 100)) / 12)
-    total_pay_phase1 = monthly_pay_phase1 * phase1_months
-    
-    # 2. Phase 2 (원금 + 추가수익)
-    # 총 2단계 상환 목표액 = 유치금액 * (1 + 추가수익률)
-    total_target_phase2 = investor_amount * (1 + phase2_return_pct / 100)
-    monthly_pay_phase2 = int(total_target_phase2 / phase2_months) if phase2_months > 0 else 0
-    total_pay_phase2 = monthly_pay_phase2 * phase2_months
+    op_profit_promo = engine.flat_operating_profit(daily_avg_charge, promo_fee, elec_rate, monthly_maint, num_chargers)
+    op_profit_normal = engine.flat_operating_profit(daily_avg_charge, normal_fee, elec_rate, monthly_maint, num_chargers)
+
+    # [B] 투자자 상환액 계산 (기준: investor_amount, 월 지급액은 원 단위 절사)
+    deal_params = dict(
+        op_promo=op_profit_promo, op_normal=op_profit_normal, promo_months=promo_months,
+        investor_amount=investor_amount, total_project_cost=total_project_cost, phase1_rate=phase1_rate,
+        phase2_return_pct=phase2_return_pct, phase1_months=phase1_months, phase2_months=phase2_months,
+    )
+    profit2_deal = deal.PROFIT2.exact() if use_exact else deal.PROFIT2
+    pay_phase1, pay_phase2, _ = profit2_deal.phase_amounts(**deal_params)
+    monthly_pay_phase1 = int(pay_phase1)
+    monthly_pay_phase2 = int(pay_phase2)
+    # 단계 총액 (정수 원 정산이면 마지막 달 끝전 포함)
+    total_phase1, total_phase2, _ = profit2_deal.phase_totals(**deal_params)
+    total_pay_phase1 = int(total_phase1)
+    total_pay_phase2 = int(total_phase2)
 
     # 3. 총 회수금
     grand_total_payout = total_pay_phase1 + total_pay_phase2
@@ -125,56 +126,26 @@ def main():
     else:
         final_investor_roi = 0
 
-    # [C] 현금흐름 시뮬레이션
-    cash_flow_log = []
-    company_cash_flows = [] 
-    
-    # ★핵심 수정: 회사의 시작 현금은 0원이 아니라 '잉여 자금'에서 시작함
-    cumulative_company_cash = initial_surplus_cash 
-    
-    actual_investor_received = 0
-
-    for m in range(1, total_op_months + 1):
-        # 1. 영업 수익
-        if use_promo and m <= promo_months:
-            current_op = op_profit_promo
-            op_status = "프로모션"
-        else:
-            current_op = op_profit_normal
-            op_status = "정상운영"
-            
-        # 2. 투자자 지급
-        if m <= phase1_months:
-            current_payout = monthly_pay_phase1
-            pay_status = "1단계(이자)"
-        elif m <= total_repay_months:
-            current_payout = monthly_pay_phase2
-            pay_status = "2단계(상환)"
-        else:
-            current_payout = 0
-            pay_status = "3단계(완료)"
-            
-        actual_investor_received += current_payout
-
-        # 3. 회사 순현금흐름 (Net Cash Flow)
-        # 이번 달 번 돈 - 이번 달 나간 돈
-        net_flow = current_op - current_payout
-        
-        # 4. 누적 현금 (Cumulative Cash)
-        # 전월 잔고 + 이번 달 순현금흐름
-        cumulative_company_cash += net_flow
-        
-        company_cash_flows.append(net_flow)
-        
-        cash_flow_log.append({
-            "Month": m,
-            "영업상태": op_status,
-            "상환상태": pay_status,
-            "영업이익": int(current_op),
-            "투자자지급": int(-current_payout),
-            "월순현금": int(net_flow),
-            "회사누적잔고": int(cumulative_company_cash)
-        })
+    # [C] 현금흐름 시뮬레이션 (엔진에서 전체 기간을 배열로 한 번에 계산)
+    # ★핵심: 회사의 시작 현금은 0원이 아니라 '잉여 자금'에서 시작함
+    sched = engine.build_schedule(
+        profit2_deal.flows, total_op_months,
+        initial_balance=profit2_deal.initial_balance(**deal_params), **deal_params,
+    )
+    company_cash_flows = sched["company"]
+    cumulative_company_cash = sched["balance"][-1]
+
+    # 표시용 라벨 (행마다 문자열을 두지 않고 int8 코드 + 라벨 목록)
+    pay_labels = ["", "1단계(이자)", "2단계(상환)", "3단계(완료)"]
+    cash_flow_log = {
+        "Month": sched["month"],
+        "영업상태": pd.Categorical.from_codes(sched["promo"].astype(np.int8), ["정상운영", "프로모션"]),
+        "상환상태": pd.Categorical.from_codes(sched["phase"].astype(np.int8), pay_labels),
+        "영업이익": engine.to_won(sched["op_profit"]),
+        "투자자지급": engine.to_won(-sched["investor"]),
+        "월순현금": engine.to_won(company_cash_flows),
+        "회사누적잔고": engine.to_won(sched["balance"]),
+    }
 
     # [D] 지표 종합
     # 회사 총 수익 (운영 종료 후 잔고 - 초기 잉여금 = 순수 벌어들인 돈? 아니면 최종 잔고?)
@@ -185,7 +156,7 @@ def main():
     monthly_discount = (discount_rate / 100) / 12
     # 초기 잉여금은 현재 시점(0)의 현금이므로 할인하지 않고 더함
     npv_stream = company_cash_flows
-    op_npv = npf.npv(monthly_discount, npv_stream)
+    op_npv = engine.npv(monthly_discount, npv_stream)
     total_npv = initial_surplus_cash + op_npv
 
     # --------------------------------------------------------------------------------
@@ -205,6 +176,11 @@ def main():
                   delta=f"수익률 {final_investor_roi:.1f}%")
     with col4:
         st.metric("💎 4. 프로젝트 NPV", f"{int(total_npv):,} 원")
+    investor_payback = engine.first_month_at_or_above(np.cumsum(sched["investor"]), investor_amount)
+    st.caption(f"📅 회사 잔고 회수: {engine.month_label(engine.payback_month(sched['balance']), total_op_months)} | "
+               f"잔고 마이너스 기간: {engine.months_below(sched['balance'])}개월 "
+               f"(최장 연속 {engine.longest_run_below(sched['balance'])}개월) | "
+               f"투자자 원금 회수: {engine.month_label(investor_payback if investor_amount > 0 else 0, total_op_months)}")
     
     st.divider()
 
@@ -236,12 +212,24 @@ def main():
         df_chart = pd.DataFrame(cash_flow_log)
         
         # 그래프 설명
-        st.line_chart(df_chart, x="Month", y="회사누적잔고", color="#27AE60")
+        st.line_chart(chartdata.downsample(df_chart, "Month", ["회사누적잔고"]), x="Month", y="회사누적잔고", color="#27AE60")
         
         # 잔고 분석
         min_balance = df_chart['회사누적잔고'].min()
         if min_balance < 0:
             st.error(f"⚠️ 경고: 운영 도중 잔고가 마이너스({int(min_balance):,}원)로 떨어지는 구간이 발생합니다! (흑자 도산 위험)")
+
+            # 잔고 0 이상을 유지하는 조건 역산 (다른 입력값은 그대로)
+            seek_params = dict(
+                infra_cost=infra_cost, charger_cost=charger_cost, subsidy=subsidy, num_chargers=num_chargers,
+                investor_amount=investor_amount, phase1_months=phase1_months, phase1_rate=phase1_rate,
+                phase2_months=phase2_months, phase2_return_pct=phase2_return_pct, operation_years=operation_years,
+                use_promo=use_promo, promo_months=promo_months, promo_fee=promo_fee,
+                daily_avg_charge=daily_avg_charge, normal_fee=normal_fee, elec_rate=elec_rate, monthly_maint=monthly_maint,
+            )
+            need_amount = goalseek.solve("profit2", "investor_amount", seek_params)["value"][0]
+            amount_str = f"{int(need_amount):,} 원" if np.isfinite(need_amount) else "범위 내 없음"
+            st.info(f"💡 **잔고 0 이상 유지 조건 (역산):** 최소 유치 금액 {amount_str}")
         else:
             st.success("✅ 운영 전 구간에서 현금 잔고가 플러스(+)를 유지합니다. 안정적인 현금 흐름입니다.")
 
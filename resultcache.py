@@ -0,0 +1,141 @@
+import contextlib
+import hashlib
+import json
+import os
+import pickle
+import sqlite3
+import time
+import zlib
+
+import numpy as np
+
+# ==========================================
+# 공유 결과 캐시 (SQLite) - 세션·작업자 프로세스·서버 재시작 간 공유
+# ==========================================
+# 사용 예:
+#   cache = resultcache.ResultCache(".cache/results.sqlite", max_bytes=256 * 2**20)
+#   summary = cache.get_or_compute("montecarlo", {"params": p, "n_paths": 10000}, lambda: montecarlo.run(...))
+#
+# - 키 = (종류, 입력값 전체의 정규화 JSON, MODEL_VERSION) 의 해시. 입력값은 키 순서·numpy 타입과 무관하게
+#   같은 값이면 같은 키가 됩니다. MODEL_VERSION 은 계산 모듈 소스의 해시라 코드가 바뀌면 예전 결과를 쓰지 않습니다.
+# - 값은 pickle + zlib 압축으로 저장합니다 (지표 dict, 월별 스케줄 DataFrame 등).
+# - 전체 크기가 max_bytes 를 넘으면 가장 오래 안 쓴 항목부터 지웁니다 (LRU).
+# - 호출마다 연결을 새로 열고 WAL 모드를 쓰므로 여러 프로세스/스레드에서 같은 파일을 함께 써도 됩니다.
+#   같은 키를 동시에 계산하면 둘 다 계산하고 나중 값이 남습니다 (결과는 같음).
+
+DEFAULT_PATH = os.path.join(".cache", "results.sqlite")
+DEFAULT_MAX_BYTES = 256 * 2**20
+BUSY_TIMEOUT = 30.0
+# 결과에 영향을 주는 모듈 - 소스가 바뀌면 캐시 키가 바뀜
+# (p10.py 는 캐시에 넣는 계산 함수(optimizer_job, run_rollout 의 compute 등)가 정의된 곳이라 포함)
+MODEL_MODULES = ("engine.py", "deal.py", "scenarios.py", "closed_form.py", "irr.py", "montecarlo.py",
+                 "aggregate.py", "optimizer.py", "sensitivity.py", "rollout.py", "tou.py", "dated.py",
+                 "pipeline.py", "p10.py")
+
+
+def _model_version():
+    digest = hashlib.blake2b(digest_size=8)
+    here = os.path.dirname(os.path.abspath(__file__))
+    for name in MODEL_MODULES:
+        path = os.path.join(here, name)
+        if os.path.exists(path):
+            with open(path, "rb") as f:
+                digest.update(name.encode() + b"\0" + f.read())
+    return digest.hexdigest()
+
+
+MODEL_VERSION = _model_version()
+
+
+def _canonical(value):
+    # JSON 으로 바꿀 수 있는 정규형 (dict 키 정렬, numpy 값 → 파이썬 값, 튜플 → 리스트)
+    if isinstance(value, dict):
+        return {str(k): _canonical(v) for k, v in sorted(value.items(), key=lambda kv: str(kv[0]))}
+    if isinstance(value, (list, tuple)):
+        return [_canonical(v) for v in value]
+    if isinstance(value, np.ndarray):
+        return {"__array__": _canonical(value.tolist()), "shape": list(value.shape)}
+    if isinstance(value, np.generic):
+        return _canonical(value.item())
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    return value
+
+
+def cache_key(kind, params, version=MODEL_VERSION):
+    text = json.dumps([kind, version, _canonical(params)], ensure_ascii=False, separators=(",", ":"))
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=20).hexdigest()
+
+
+class ResultCache:
+    def __init__(self, path=DEFAULT_PATH, max_bytes=DEFAULT_MAX_BYTES):
+        self.path = path
+        self.max_bytes = max_bytes
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS results ("
+                " key TEXT PRIMARY KEY, kind TEXT NOT NULL, value BLOB NOT NULL,"
+                " size INTEGER NOT NULL, created REAL NOT NULL, last_used REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS results_last_used ON results (last_used)")
+
+    def _connect(self):
+        # 자동 커밋 모드, with 블록이 끝나면 연결을 닫음
+        return contextlib.closing(sqlite3.connect(self.path, timeout=BUSY_TIMEOUT, isolation_level=None))
+
+    def get(self, kind, params, default=None):
+        key = cache_key(kind, params)
+        with self._connect() as conn:
+            row = conn.execute("SELECT value FROM results WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return default
+            conn.execute("UPDATE results SET last_used = ? WHERE key = ?", (time.time(), key))
+        return pickle.loads(zlib.decompress(row[0]))
+
+    def put(self, kind, params, value):
+        blob = zlib.compress(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+        if len(blob) > self.max_bytes:
+            return
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.execute("INSERT OR REPLACE INTO results (key, kind, value, size, created, last_used)"
+                         " VALUES (?, ?, ?, ?, ?, ?)", (cache_key(kind, params), kind, blob, len(blob), now, now))
+            self._evict(conn)
+            conn.execute("COMMIT")
+
+    def _evict(self, conn):
+        # 전체 크기가 한도를 넘으면 오래 안 쓴 항목부터 삭제
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM results").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        excess = total - self.max_bytes
+        victims = []
+        for key, size in conn.execute("SELECT key, size FROM results ORDER BY last_used"):
+            victims.append((key,))
+            excess -= size
+            if excess <= 0:
+                break
+        conn.executemany("DELETE FROM results WHERE key = ?", victims)
+
+    def get_or_compute(self, kind, params, compute):
+        # 캐시에 있으면 그대로, 없으면 compute() 결과를 저장 후 반환
+        missing = object()
+        value = self.get(kind, params, missing)
+        if value is missing:
+            value = compute()
+            self.put(kind, params, value)
+        return value
+
+    def stats(self):
+        with self._connect() as conn:
+            count, size = conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM results").fetchone()
+        return {"entries": count, "bytes": size, "max_bytes": self.max_bytes}
+
+    def clear(self):
+        with self._connect() as conn:
+            conn.execute("DELETE FROM results")
@@ -0,0 +1,92 @@
+import numpy as np
+
+import scenarios
+
+# ==========================================
+# 단계적 설치(롤아웃) - 월별 설치 대수 × 1기당 스케줄의 합성곱
+# ==========================================
+# 사용 예:
+#   installs = [2, 0, 0, 5, 5, 5]            # 포트폴리오 0~5월에 설치하는 대수
+#   fleet = rollout.fleet_flows({"daily_kwh": 18}, installs)
+#   fleet["company"], fleet["balance"]      # (시나리오 × 월) 전체 운영 현금흐름
+#
+# - 1기당 스케줄은 p10 모델(num_units=1)로 한 번만 계산합니다. 코호트(같은 달 설치분)마다 설치 월 기준으로
+#   프로모션/이자/배분/상환 단계가 따로 시작하고, 투자비·투자유치 금액(1기당)은 설치 월에 발생합니다.
+# - 전체 현금흐름 = 설치 벡터와 1기당 스케줄의 합성곱. 코호트를 하나씩 시뮬레이션하지 않습니다.
+#   method="cumsum": 1기당 스케줄은 구간별 상수라 1차 차분이 몇 개 월에서만 0 이 아니므로,
+#                    차분을 설치 벡터에 그만큼만 밀어 더한 뒤 누적합 (정확, O(설치 기간 × 경계 수))
+#   method="fft":    임의의 스케줄에 쓸 수 있는 FFT 합성곱 (부동소수 오차 수준의 차이)
+#   method="auto":   차분이 0 이 아닌 월이 CUMSUM_MAX_BREAKS 개 이하면 cumsum, 아니면 fft
+
+FLOW_KEYS = ("revenue", "opex", "op_profit", "principal", "investor", "company")
+CUMSUM_MAX_BREAKS = 64
+
+
+def _cumsum_convolve(installs, unit_flow):
+    # 구간별 상수 스케줄: f = cumsum(d) 이므로 u * f = cumsum(u * d), d 는 몇 개 월에서만 0 이 아님
+    n_installs, n_unit = installs.shape[-1], unit_flow.shape[-1]
+    diff = np.diff(unit_flow, prepend=0, append=0, axis=-1)
+    shape = np.broadcast_shapes(installs.shape[:-1], unit_flow.shape[:-1]) + (n_installs + n_unit,)
+    out = np.zeros(shape)
+    for k in np.flatnonzero(np.any(diff != 0, axis=tuple(range(diff.ndim - 1)))):
+        out[..., k:k + n_installs] += diff[..., k:k + 1] * installs
+    return np.cumsum(out, axis=-1)[..., :-1]
+
+
+def _fft_convolve(installs, unit_flow):
+    n = installs.shape[-1] + unit_flow.shape[-1] - 1
+    n_fft = 1 << (n - 1).bit_length()
+    spectrum = np.fft.rfft(installs, n_fft, axis=-1) * np.fft.rfft(unit_flow, n_fft, axis=-1)
+    return np.fft.irfft(spectrum, n_fft, axis=-1)[..., :n]
+
+
+def convolve(installs, unit_flow, method="auto"):
+    # installs: (..., 설치 기간), unit_flow: (..., 1기당 기간) → (..., 설치 기간 + 1기당 기간 - 1)
+    installs = np.asarray(installs, dtype=float)
+    unit_flow = np.asarray(unit_flow, dtype=float)
+    if method == "auto":
+        breaks = np.any(np.diff(unit_flow, prepend=0, append=0, axis=-1) != 0,
+                        axis=tuple(range(unit_flow.ndim - 1))).sum()
+        method = "cumsum" if breaks <= CUMSUM_MAX_BREAKS else "fft"
+    if method == "cumsum":
+        return _cumsum_convolve(installs, unit_flow)
+    if method == "fft":
+        return _fft_convolve(installs, unit_flow)
+    raise ValueError(f"지원하지 않는 합성곱 방식: {method}")
+
+
+def unit_flows(params):
+    # 1기당 스케줄 (0번째 = 설치 월의 초기 투입, 1.. = 설치 후 경과 월) → {항목: (시나리오, 1 + 월 수)}
+    col, sched, outlay = scenarios.p10_schedule({**params, "num_units": 1})
+    size = col["num_units"].shape[0]
+    n_months = len(sched["month"])
+    initial = {"investor": -col["investment_amount"][:, 0], "company": -outlay[:, 0]}
+    flows = {}
+    for key in FLOW_KEYS:
+        head = initial.get(key, np.zeros(size))
+        flows[key] = np.concatenate([head[:, None], np.broadcast_to(sched[key], (size, n_months))], axis=-1)
+    # 설치 후 운영 중인 기간 (기간이 지나면 0)
+    active = sched["month"][None, :] <= col["simulation_years"] * 12
+    flows["active"] = np.concatenate([np.zeros((size, 1)), np.broadcast_to(active, (size, n_months))], axis=-1)
+    return flows
+
+
+def fleet_flows(params, installs, method="auto"):
+    # params: p10 입력값 (1기당 기준, 투자유치 금액도 1기당), installs: 월별 설치 대수 (0월부터)
+    # 반환: {항목: (시나리오, 월)} + installed(누적 설치 대수), active_units(운영 중 대수), balance(회사 누적 잔고)
+    installs = np.asarray(installs, dtype=float)
+    if installs.ndim == 0 or installs.shape[-1] == 0:
+        raise ValueError("월별 설치 대수가 필요합니다.")
+    if (installs < 0).any():
+        raise ValueError("설치 대수는 0 이상이어야 합니다.")
+
+    unit = unit_flows(params)
+    fleet = {key: convolve(installs, unit[key], method) for key in FLOW_KEYS}
+    fleet["active_units"] = convolve(installs, unit["active"], method)
+    n_periods = fleet["company"].shape[-1]
+    padded = np.zeros(installs.shape[:-1] + (n_periods,))
+    padded[..., :installs.shape[-1]] = installs
+    fleet["installed"] = np.broadcast_to(np.cumsum(padded, axis=-1), fleet["company"].shape)
+    fleet["month"] = np.arange(n_periods)
+    fleet["balance"] = np.cumsum(fleet["company"], axis=-1)
+    return fleet
@@ -0,0 +1,321 @@
+import numpy as np
+import pandas as pd
+
+import closed_form
+import dated
+import deal
+import engine
+import irr
+
+# ==========================================
+# 시나리오 그리드 일괄 평가 (시나리오 × 월 2차원 배열)
+# ==========================================
+# 사용 예:
+#   axes = {"daily_kwh": [10, 20, 30], "normal_price": [250, 288, 320], "p2_share": [0.3, 0.5]}
+#   result = scenarios.evaluate_grid(axes)   # 18개 시나리오를 한 번에 평가한 DataFrame
+#   result = scenarios.evaluate_grid(axes, method="closed_form")   # 월별 배열 없이 구간 합으로 (큰 그리드용)
+#
+# - 처리 속도 (1코어 기준): method="monthly" 는 초당 약 1만 개 (시나리오마다 월별 배열 + IRR, 시간 대부분이 IRR).
+#   10^5 ~ 10^6 개 그리드를 몇 초 안에 보려면 method="closed_form" (초당 수십만 개 이상, IRR·회수 월 등은 제외).
+
+# p10.py 사이드바 기본값
+P10_DEFAULTS = {
+    "simulation_years": 7,
+    "use_repayment": True,
+    "repayment_year": 5,
+    "infra_cost": 2700000,
+    "charger_cost": 600000,
+    "subsidy": 1800000,
+    "num_units": 1,
+    "investment_amount": 2000000,
+    "p1_years": 3,
+    "p1_rate_annual": 0.05,
+    "p2_years": 2,
+    "p2_share": 0.5,
+    "promo_months": 6,
+    "promo_price": 168,
+    "normal_price": 288,
+    "daily_kwh": 20.0,
+    "kepco_base": 2390,
+    "kwh_cost": 150,
+    "monthly_maint": 10000,
+    "discount_rate_annual": 0.05,
+}
+
+# p5.py 사이드바 기본값 (투자자 유치 금액 기본값은 사업비의 120%)
+P5_DEFAULTS = {
+    "infra_cost": 2100000,
+    "charger_cost": 600000,
+    "subsidy": 1800000,
+    "num_chargers": 1,
+    "investor_amount": 1080000,
+    "p1_years": 2,
+    "p1_rate": 5.0,
+    "p2_years": 3,
+    "p2_share_pct": 50,
+    "p3_years": 5,
+    "use_promo": True,
+    "promo_months": 6,
+    "promo_fee": 200.0,
+    "daily_avg_charge": 20.0,
+    "normal_fee": 300.0,
+    "elec_rate": 150.0,
+    "monthly_maint": 10000,
+    "discount_rate": 5.0,
+}
+
+# profit2.py 사이드바 기본값 (투자자 유치 금액 기본값은 사업비의 110%)
+PROFIT2_DEFAULTS = {
+    "infra_cost": 2100000,
+    "charger_cost": 600000,
+    "subsidy": 1800000,
+    "num_chargers": 1,
+    "investor_amount": 990000,
+    "phase1_months": 24,
+    "phase1_rate": 5.0,
+    "phase2_months": 36,
+    "phase2_return_pct": 10.0,
+    "operation_years": 6,
+    "use_promo": True,
+    "promo_months": 6,
+    "promo_fee": 200.0,
+    "daily_avg_charge": 15.0,
+    "normal_fee": 300.0,
+    "elec_rate": 150.0,
+    "monthly_maint": 10000,
+    "discount_rate": 5.0,
+}
+
+# 한 번에 메모리에 올리는 시나리오 수 (시나리오 × 월 배열 크기 제한)
+DEFAULT_CHUNK_SIZE = 4096
+
+
+def product_grid(**axes):
+    # 각 축 값의 모든 조합 → {변수명: 1차원 배열}
+    names = list(axes)
+    values = [np.atleast_1d(np.asarray(axes[name])) for name in names]
+    mesh = np.meshgrid(*values, indexing="ij")
+    return {name: m.ravel() for name, m in zip(names, mesh)}
+
+
+def _as_column(value):
+    # 시나리오 축 배열은 (S, 1) 로 바꿔 월 축과 브로드캐스팅되도록 함
+    value = np.asarray(value)
+    return value[:, None] if value.ndim == 1 else value
+
+
+def _annual_irr_rows(cash_flows):
+    # 시나리오별 월 IRR → 연환산 (해가 없으면 NaN, 상태 코드는 irr.STATUS_LABELS 참고)
+    monthly_irr, status = irr.solve_irr(cash_flows)
+    return irr.annualize(monthly_irr), status
+
+
+def p10_inputs(params):
+    # 기본값 병합 → (S, 1) 열 벡터, 엔진 입력 변수 구성
+    # kwh_cost_monthly (월별 전력 단가, tou.py), days_monthly (월별 실제 일수) 는 월 축이 있어
+    # 열 벡터로 바꾸지 않고 그대로 넘김. start_date (사업 시작일) 를 주면 days_monthly 를 달력으로 계산 (dated.py)
+    params = dict(params)
+    monthly = {name: params.pop(name, None) for name in deal.MONTHLY_PARAMS}
+    start_date = params.pop("start_date", None)
+    col = _columns(P10_DEFAULTS, params)
+
+    total_months = col["simulation_years"] * 12
+    if start_date is not None and monthly["days_monthly"] is None:
+        monthly["days_monthly"] = dated.period_days(start_date, int(total_months.max()))
+    outlay = engine.p10_initial_outlay(col["infra_cost"], col["charger_cost"], col["subsidy"],
+                                       col["num_units"], col["investment_amount"])
+    repayment_month = engine.p10_repayment_month(col["use_repayment"],
+                                                 np.minimum(col["repayment_year"], col["simulation_years"]))
+    flow_params = dict(
+        promo_months=col["promo_months"], promo_price=col["promo_price"], normal_price=col["normal_price"],
+        daily_kwh=col["daily_kwh"], num_units=col["num_units"],
+        kepco_base=col["kepco_base"], kwh_cost=col["kwh_cost"], monthly_maint=col["monthly_maint"],
+        **monthly,
+        investment_amount=col["investment_amount"],
+        p1_years=col["p1_years"], p1_rate_annual=col["p1_rate_annual"],
+        p2_years=col["p2_years"], p2_share=col["p2_share"],
+        repayment_month=repayment_month,
+    )
+    return col, total_months, outlay, flow_params
+
+
+def _columns(defaults, params):
+    p = {**defaults, **params}
+    size = max((np.size(v) for v in p.values()), default=1)
+    return {k: _as_column(np.broadcast_to(v, (size,))) for k, v in p.items()}
+
+
+def _flat_operating(col):
+    # p5.py / profit2.py: 프로모션 미적용이면 프로모션 기간 0
+    promo_months = np.where(col["use_promo"], col["promo_months"], 0)
+    promo_fee = np.where(col["use_promo"], col["promo_fee"], 0.0)
+    args = (col["elec_rate"], col["monthly_maint"], col["num_chargers"])
+    return dict(
+        op_promo=engine.flat_operating_profit(col["daily_avg_charge"], promo_fee, *args),
+        op_normal=engine.flat_operating_profit(col["daily_avg_charge"], col["normal_fee"], *args),
+        promo_months=promo_months,
+    )
+
+
+def p5_inputs(params):
+    # → (열 벡터, 월 수, 딜 입력 변수). 총 기간 = 1·2·3단계 합
+    col = _columns(P5_DEFAULTS, params)
+    total_months = (col["p1_years"] + col["p2_years"] + col["p3_years"]) * 12
+    flow_params = dict(
+        **_flat_operating(col),
+        investor_amount=col["investor_amount"],
+        project_cost=(col["infra_cost"] + col["charger_cost"] - col["subsidy"]) * col["num_chargers"],
+        p1_years=col["p1_years"], p1_rate=col["p1_rate"],
+        p2_years=col["p2_years"], p2_share_pct=col["p2_share_pct"],
+    )
+    return col, total_months, flow_params
+
+
+def profit2_inputs(params):
+    col = _columns(PROFIT2_DEFAULTS, params)
+    total_months = col["operation_years"] * 12
+    flow_params = dict(
+        **_flat_operating(col),
+        investor_amount=col["investor_amount"],
+        total_project_cost=(col["infra_cost"] + col["charger_cost"] - col["subsidy"]) * col["num_chargers"],
+        phase1_months=col["phase1_months"], phase1_rate=col["phase1_rate"],
+        phase2_months=col["phase2_months"], phase2_return_pct=col["phase2_return_pct"],
+    )
+    return col, total_months, flow_params
+
+
+def model_inputs(model, params):
+    # 모델 이름 → (딜, 열 벡터, 월 수, 딜 입력 변수, 회사 초기 잔고, 투자자 투입액)
+    if model == "p10":
+        col, total_months, outlay, flow_params = p10_inputs(params)
+        return deal.P10, col, total_months, flow_params, -outlay, col["investment_amount"]
+    if model == "p5":
+        col, total_months, flow_params = p5_inputs(params)
+        return deal.P5, col, total_months, flow_params, deal.P5.initial_balance(**flow_params), col["investor_amount"]
+    if model == "profit2":
+        col, total_months, flow_params = profit2_inputs(params)
+        return (deal.PROFIT2, col, total_months, flow_params, deal.PROFIT2.initial_balance(**flow_params),
+                col["investor_amount"])
+    raise ValueError(f"지원하지 않는 모델: {model}")
+
+
+def p10_schedule(params, rounding=None):
+    # 월별 스케줄 → (입력 열 벡터, 스케줄 dict, 회사 초기 투입분)
+    # 시나리오별 기간이 다르면 가장 긴 기간으로 계산하고 기간 이후 현금흐름은 0
+    # rounding 을 주면 정수 원 모드 (deal.Deal.exact, 금액·잔고가 int64 원 단위, 초기 투입분도 같은 방식으로 반올림)
+    col, total_months, outlay, flow_params = p10_inputs(params)
+    p10 = deal.P10
+    if rounding is not None:
+        p10 = p10.exact(rounding)
+        outlay = engine.settle_won(outlay, rounding)
+    sched = engine.build_schedule(p10.flows, total_months, initial_balance=-outlay, **flow_params)
+    return col, sched, outlay
+
+
+def p10_evaluate(params, method="monthly"):
+    # params: {변수명: 스칼라 또는 (S,) 배열}, 누락된 변수는 P10_DEFAULTS 사용
+    # method="closed_form" 은 월별 배열 없이 구간 합으로 계산 (IRR 제외)
+    if method == "closed_form":
+        return p10_evaluate_closed_form(params)
+
+    col, sched, outlay = p10_schedule(params)
+
+    investor_cf = engine.with_initial(sched["investor"], -col["investment_amount"])
+    company_cf = engine.with_initial(sched["company"], -outlay)
+    monthly_rate = col["discount_rate_annual"] / 12
+
+    inv_irr, inv_irr_status = _annual_irr_rows(investor_cf)
+    com_irr, com_irr_status = _annual_irr_rows(company_cf)
+    start_date = params.get("start_date")
+    calendar = {} if start_date is None else _dated_metrics(col, start_date, investor_cf, company_cf)
+
+    return {
+        "inv_npv": engine.npv(monthly_rate, investor_cf),
+        "inv_irr": inv_irr,
+        "inv_irr_status": inv_irr_status,
+        "inv_roi": closed_form.roi(investor_cf.sum(axis=-1), col["investment_amount"][:, 0]),
+        "com_npv": engine.npv(monthly_rate, company_cf),
+        "com_irr": com_irr,
+        "com_irr_status": com_irr_status,
+        "com_roi": closed_form.roi(company_cf.sum(axis=-1), outlay[:, 0]),
+        "min_balance": sched["balance"].min(axis=-1),
+        "final_balance": sched["balance"][:, -1],
+        "payback_month": engine.payback_month(sched["balance"], col["simulation_years"] * 12),
+        **_recovery_metrics(col, sched, investor_cf, company_cf),
+        **calendar,
+    }
+
+
+def _dated_metrics(col, start_date, investor_cf, company_cf):
+    # 시작일 기준 실제 날짜의 XNPV / XIRR (연 할인율을 경과 일수 / 365 로 적용)
+    dates = dated.flow_dates(start_date, investor_cf.shape[-1] - 1)
+    rate = col["discount_rate_annual"][:, 0]
+    inv_xirr, inv_xirr_status = dated.xirr(investor_cf, dates)
+    com_xirr, com_xirr_status = dated.xirr(company_cf, dates)
+    return {
+        "inv_xnpv": dated.xnpv(rate, investor_cf, dates),
+        "inv_xirr": inv_xirr,
+        "inv_xirr_status": inv_xirr_status,
+        "com_xnpv": dated.xnpv(rate, company_cf, dates),
+        "com_xirr": com_xirr,
+        "com_xirr_status": com_xirr_status,
+    }
+
+
+def _recovery_metrics(col, sched, investor_cf, company_cf):
+    # 누적 배열의 첫 교차 지점 (0시점 포함, 월 수 + 1 = 기간 내 미도달)
+    # 시나리오별 기간이 다르면 기간 이후 달은 보지 않음 (같이 계산한 더 긴 시나리오와 무관하게 행마다 같은 결과)
+    n_months = col["simulation_years"] * 12
+    return {
+        "break_even_month": engine.first_month_at_or_above(np.cumsum(company_cf, axis=-1), first_month=0,
+                                                           lengths=n_months + 1),
+        "inv_payback_month": engine.first_month_at_or_above(np.cumsum(investor_cf, axis=-1), first_month=0,
+                                                            lengths=n_months + 1),
+        "months_under_water": engine.months_below(sched["balance"], lengths=n_months),
+        "longest_under_water": engine.longest_run_below(sched["balance"], lengths=n_months),
+    }
+
+
+def p10_evaluate_closed_form(params):
+    col, total_months, outlay, flow_params = p10_inputs(params)
+    result = closed_form.evaluate(
+        deal.P10, total_months, rate=col["discount_rate_annual"] / 12,
+        initial_balance=-outlay, first_period=1, **flow_params,
+    )
+    investment = col["investment_amount"][:, 0]
+    outlay = outlay[:, 0]
+    inv_total = result["total"]["investor"] - investment
+    com_total = result["total"]["company"] - outlay
+
+    return {
+        "inv_npv": result["npv"]["investor"] - investment,
+        "inv_roi": closed_form.roi(inv_total, investment),
+        "com_npv": result["npv"]["company"] - outlay,
+        "com_roi": closed_form.roi(com_total, outlay),
+        "min_balance": result["min_balance"],
+        "final_balance": result["final_balance"],
+    }
+
+
+def _evaluate_chunked(params, size, base, chunk_size, method):
+    # 시나리오를 chunk_size 단위로 나눠 평가 (시나리오 × 월 배열의 메모리 상한)
+    parts = []
+    for start in range(0, size, chunk_size):
+        chunk = {k: v[start:start + chunk_size] for k, v in params.items()}
+        parts.append(p10_evaluate({**base, **chunk}, method=method))
+    return {k: np.concatenate([part[k] for part in parts]) for k in parts[0]}
+
+
+def evaluate_grid(axes, base=None, chunk_size=DEFAULT_CHUNK_SIZE, method="monthly"):
+    # axes 의 모든 조합을 평가 → 입력 축 + 지표 열을 가진 DataFrame
+    grid = product_grid(**axes)
+    size = len(next(iter(grid.values())))
+    metrics = _evaluate_chunked(grid, size, dict(base or {}), chunk_size, method)
+    return pd.DataFrame({**grid, **metrics})
+
+
+def evaluate_rows(table, base=None, chunk_size=DEFAULT_CHUNK_SIZE, method="monthly"):
+    # 시나리오 표(행 = 시나리오, 열 = 변수)를 그대로 평가
+    params = {c: table[c].to_numpy() for c in table.columns if c in P10_DEFAULTS}
+    metrics = _evaluate_chunked(params, len(table), dict(base or {}), chunk_size, method)
+    return pd.concat([table.reset_index(drop=True), pd.DataFrame(metrics)], axis=1)
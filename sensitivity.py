@@ -0,0 +1,79 @@
+import numpy as np
+import pandas as pd
+
+import scenarios
+
+# ==========================================
+# 민감도(토네이도) 분석 - p10.py 모델
+# ==========================================
+# 사용 예:
+#   table = sensitivity.tornado(params, pct=10)
+#   # 변수별로 -10% / +10% 일 때의 회사 NPV, 투자자 IRR, 회수 월과 변동폭 (회사 NPV 변동폭 내림차순)
+#
+# - 기준 1개 + 변수별 (-x%, +x%) 2개 = 2k+1 개 시나리오를 (시나리오 × 월) 배열 하나로 쌓아 한 번에 평가합니다.
+# - 한 변수가 여러 입력을 묶을 수 있습니다 (설치비 = 인프라 투자비 + 충전기 비용을 같은 비율로 조정).
+
+# 변수 → 함께 조정할 입력 변수
+VARIABLES = {
+    "daily_kwh": ("daily_kwh",),
+    "normal_price": ("normal_price",),
+    "kwh_cost": ("kwh_cost",),
+    "kepco_base": ("kepco_base",),
+    "monthly_maint": ("monthly_maint",),
+    "subsidy": ("subsidy",),
+    "capex": ("infra_cost", "charger_cost"),
+}
+
+LABELS = {
+    "daily_kwh": "일평균 충전량",
+    "normal_price": "정상 요금",
+    "kwh_cost": "전력 매입단가",
+    "kepco_base": "한전 기본료",
+    "monthly_maint": "월 관리비",
+    "subsidy": "보조금",
+    "capex": "설치비(인프라+충전기)",
+}
+
+METRICS = ("com_npv", "inv_irr", "payback_month")
+
+
+def stacked_params(params, variables, pct):
+    # 기준 + 변수별 하향/상향 시나리오를 한 배열로 쌓음 → {입력 변수: (2k+1,) 배열}
+    p = {**scenarios.P10_DEFAULTS, **params}
+    # 월별 전력 단가(TOU)는 전력 매입단가와 같은 비율로 조정
+    monthly = p.pop("kwh_cost_monthly", None)
+    # 월별 실제 일수·시작일은 모든 행에 그대로
+    calendar = {k: p.pop(k) for k in ("days_monthly", "start_date") if k in p}
+    n = 1 + 2 * len(variables)
+    stacked = {k: np.full(n, v) for k, v in p.items()}
+    kwh_scale = np.ones(n)
+    for key in {key for name in variables for key in VARIABLES[name]}:
+        stacked[key] = stacked[key].astype(float)
+    for i, name in enumerate(variables):
+        for j, factor in enumerate((1 - pct / 100, 1 + pct / 100)):
+            for key in VARIABLES[name]:
+                stacked[key][1 + 2 * i + j] = p[key] * factor
+            if "kwh_cost" in VARIABLES[name]:
+                kwh_scale[1 + 2 * i + j] = factor
+    if monthly is not None:
+        stacked["kwh_cost_monthly"] = kwh_scale[:, None] * np.asarray(monthly, dtype=float)
+    return {**stacked, **calendar}
+
+
+def tornado(params=None, variables=tuple(VARIABLES), pct=10.0):
+    # 반환: 변수별 행 - {지표}_low / {지표}_high / {지표}_swing 와 기준값 {지표}_base
+    variables = list(variables)
+    for name in variables:
+        if name not in VARIABLES:
+            raise ValueError(f"지원하지 않는 민감도 변수: {name}")
+
+    result = scenarios.p10_evaluate(stacked_params(dict(params or {}), variables, pct))
+    table = {"variable": variables, "label": [LABELS[name] for name in variables]}
+    for metric in METRICS:
+        values = np.asarray(result[metric], dtype=float)
+        low, high = values[1::2], values[2::2]
+        table[f"{metric}_base"] = np.full(len(variables), values[0])
+        table[f"{metric}_low"] = low
+        table[f"{metric}_high"] = high
+        table[f"{metric}_swing"] = np.abs(high - low)
+    return pd.DataFrame(table).sort_values("com_npv_swing", ascending=False, ignore_index=True)
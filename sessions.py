@@ -0,0 +1,240 @@
+import argparse
+import hashlib
+import os
+import pickle
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+# ==========================================
+# 충전 세션 로그 → 사이트별 수요(일평균 충전량) 보정
+# ==========================================
+# 사용 예:
+#   python sessions.py sessions.csv -o sites.csv      # 사이트별 보정 결과 → batch.py / portfolio.py 입력
+#   daily = sessions.daily_totals("sessions.parquet")  # 사이트 × 날짜 충전량 (캐시 사용)
+#   sites = sessions.calibrate(daily)
+#   montecarlo.run({"daily_kwh": sessions.mc_dist(sites.iloc[0])}, ...)
+#
+# - 로그의 각 행 = 충전 세션 1건 (사이트, 시작 시각, 충전량 kWh). 열 이름은 columns 로 바꿀 수 있습니다.
+# - 파일 전체를 한 번에 읽지 않습니다. CSV 는 chunk_rows 행씩, Parquet 은 배치 단위로 읽어 (사이트, 날짜)
+#   합계만 남깁니다. 메모리는 chunk 크기와 사이트 × 날짜 수에만 비례합니다.
+# - 사이트 × 날짜 합계는 파일 내용 해시 + 읽기 옵션을 키로 cache_dir 에 저장하고, 같은 파일이면 다시 파싱하지 않습니다.
+# - 보정 결과 (사이트별)
+#     daily_kwh        일평균 충전량 (첫 세션 ~ 마지막 세션 사이 세션 없는 날은 0 으로 포함)
+#     daily_kwh_sd / daily_kwh_p10 / _p50 / _p90   일별 분포
+#     monthly_kwh_sd   월평균(일평균 충전량)의 표준편차 - 몬테카를로 월별 변동성 입력
+#     growth_annual    월평균의 로그선형 추세 → 연 증가율
+#     season_1 ~ season_12   달별 계절 계수 (추세 제거 후, 평균 1)
+
+DEFAULT_COLUMNS = {"site": "site_id", "time": "start_time", "kwh": "kwh"}
+DEFAULT_CHUNK_ROWS = 1_000_000
+DEFAULT_CACHE_DIR = os.path.join(".cache", "sessions")
+CACHE_VERSION = 1
+# (사이트, 날짜) 부분 합계가 이 개수만큼 쌓이면 한 번 합쳐 메모리를 줄임
+MERGE_EVERY = 16
+# 분위수 계산 시 한 번에 펼치는 사이트 수 (사이트 × 날짜 배열)
+PERCENTILE_CHUNK_SITES = 1024
+MIN_MONTHS_FOR_TREND = 12
+PARQUET_EXTENSIONS = (".parquet", ".pq")
+HASH_BLOCK = 1 << 20
+
+
+def file_hash(path):
+    # 파일 내용 해시 (1MB 블록 단위로 읽음)
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(HASH_BLOCK), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def iter_chunks(path, columns=None, chunk_rows=DEFAULT_CHUNK_ROWS):
+    # 필요한 열만 chunk 단위 DataFrame 으로 읽음. Parquet 은 pyarrow 필요
+    columns = {**DEFAULT_COLUMNS, **(columns or {})}
+    names = [columns["site"], columns["time"], columns["kwh"]]
+    if os.path.splitext(path)[1].lower() in PARQUET_EXTENSIONS:
+        import pyarrow.parquet as pq
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_rows, columns=names):
+            yield batch.to_pandas()
+    else:
+        yield from pd.read_csv(path, usecols=names, chunksize=chunk_rows)
+
+
+def _daily_chunk(chunk, columns):
+    # 세션 chunk → (사이트, 날짜)별 충전량 합계 / 세션 수
+    frame = pd.DataFrame({
+        "site": chunk[columns["site"]].to_numpy(),
+        "date": pd.to_datetime(chunk[columns["time"]]).dt.normalize().to_numpy(),
+        "kwh": pd.to_numeric(chunk[columns["kwh"]], errors="coerce").to_numpy(),
+    }).dropna()
+    return frame.groupby(["site", "date"], sort=False).agg(kwh=("kwh", "sum"), sessions=("kwh", "size"))
+
+
+def _merge(parts):
+    return pd.concat(parts).groupby(level=["site", "date"], sort=False).sum()
+
+
+def daily_totals(path, columns=None, chunk_rows=DEFAULT_CHUNK_ROWS, cache_dir=DEFAULT_CACHE_DIR):
+    # 반환: site / date / kwh / sessions 열의 DataFrame (사이트, 날짜 순). cache_dir=None 이면 캐시 안 함
+    columns = {**DEFAULT_COLUMNS, **(columns or {})}
+    cache_path = None
+    if cache_dir is not None:
+        key = f"{file_hash(path)}-{columns['site']}-{columns['time']}-{columns['kwh']}-v{CACHE_VERSION}"
+        cache_path = os.path.join(cache_dir, hashlib.blake2b(key.encode(), digest_size=16).hexdigest() + ".pkl")
+        if os.path.exists(cache_path):
+            with open(cache_path, "rb") as f:
+                return pickle.load(f)
+
+    parts = []
+    for chunk in iter_chunks(path, columns, chunk_rows):
+        parts.append(_daily_chunk(chunk, columns))
+        if len(parts) >= MERGE_EVERY:
+            parts = [_merge(parts)]
+    if not parts:
+        raise ValueError("세션 로그가 비어 있습니다.")
+    daily = _merge(parts).sort_index().reset_index()
+    daily["sessions"] = daily["sessions"].astype(np.int64)
+
+    if cache_path is not None:
+        os.makedirs(cache_dir, exist_ok=True)
+        tmp_path = cache_path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            pickle.dump(daily, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, cache_path)
+    return daily
+
+
+def _percentiles(site_code, day, kwh, first, n_days, q):
+    # 사이트별 일별 충전량 분위수 (첫 세션 ~ 마지막 세션 사이 세션 없는 날은 0)
+    n_sites = len(first)
+    out = np.empty((n_sites, len(q)))
+    width = int(n_days.max())
+    order = np.argsort(site_code, kind="stable")
+    bounds = np.searchsorted(site_code[order], np.arange(n_sites + 1))
+    for s0 in range(0, n_sites, PERCENTILE_CHUNK_SITES):
+        s1 = min(s0 + PERCENTILE_CHUNK_SITES, n_sites)
+        dense = np.where(np.arange(width)[None, :] < n_days[s0:s1, None], 0.0, np.nan)
+        rows = order[bounds[s0]:bounds[s1]]
+        dense[site_code[rows] - s0, day[rows] - first[site_code[rows]]] = kwh[rows]
+        out[s0:s1] = np.nanpercentile(dense, q, axis=-1).T
+    return out
+
+
+def calibrate(daily):
+    # daily: daily_totals 결과 → 사이트별 보정 DataFrame (site 순)
+    site_code, sites = pd.factorize(daily["site"], sort=True)
+    day = daily["date"].to_numpy().astype("datetime64[D]").astype(np.int64)
+    kwh = daily["kwh"].to_numpy(dtype=float)
+    n_sites = len(sites)
+
+    first = np.full(n_sites, np.iinfo(np.int64).max)
+    last = np.full(n_sites, np.iinfo(np.int64).min)
+    np.minimum.at(first, site_code, day)
+    np.maximum.at(last, site_code, day)
+    n_days = last - first + 1
+
+    # 일별 분포 (세션 없는 날 0 포함)
+    total = np.bincount(site_code, weights=kwh, minlength=n_sites)
+    total_sq = np.bincount(site_code, weights=kwh * kwh, minlength=n_sites)
+    mean = total / n_days
+    sd = np.sqrt(np.maximum(total_sq / n_days - mean * mean, 0.0) * n_days / np.maximum(n_days - 1, 1))
+    pct = _percentiles(site_code, day, kwh, first, n_days, [10, 50, 90])
+
+    # 월별 일평균 충전량 (각 달의 운영 일수로 나눔, 첫·마지막 달은 일부만)
+    month = daily["date"].to_numpy().astype("datetime64[M]").astype(np.int64)
+    first_month = np.full(n_sites, np.iinfo(np.int64).max)
+    np.minimum.at(first_month, site_code, month)
+    n_months = (last.astype("datetime64[D]").astype("datetime64[M]").astype(np.int64) - first_month + 1)
+    offset = np.concatenate([[0], np.cumsum(n_months)[:-1]])
+    flat = offset[site_code] + month - first_month[site_code]
+    month_kwh = np.bincount(flat, weights=kwh, minlength=int(n_months.sum()))
+
+    slot_site = np.repeat(np.arange(n_sites), n_months)
+    slot_month = first_month[slot_site] + np.arange(len(slot_site)) - offset[slot_site]
+    month_start = slot_month.astype("datetime64[M]").astype("datetime64[D]").astype(np.int64)
+    month_end = (slot_month + 1).astype("datetime64[M]").astype("datetime64[D]").astype(np.int64)
+    days_open = np.minimum(month_end, last[slot_site] + 1) - np.maximum(month_start, first[slot_site])
+    month_avg = month_kwh / days_open
+
+    # 로그선형 추세 + 계절: log(월평균) = 계절(달) + b × 경과 월 (월평균 > 0 인 달만, 사이트별 최소제곱)
+    # 같은 달(1월, 2월 ...)끼리 평균을 빼고 기울기를 구하면 계절 효과와 섞이지 않음
+    x = (slot_month - first_month[slot_site]).astype(float)
+    positive = month_avg > 0
+    y = np.log(np.where(positive, month_avg, 1.0))
+    w = positive.astype(float)
+    key = slot_site * 12 + slot_month % 12
+    group_n = np.bincount(key, weights=w, minlength=n_sites * 12)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        x_mean = np.bincount(key, weights=w * x, minlength=n_sites * 12) / group_n
+        y_mean = np.bincount(key, weights=w * y, minlength=n_sites * 12) / group_n
+    dx = np.where(positive, x - x_mean[key], 0.0)
+    dy = np.where(positive, y - y_mean[key], 0.0)
+    sxx = np.bincount(slot_site, weights=dx * dx, minlength=n_sites)
+    sxy = np.bincount(slot_site, weights=dx * dy, minlength=n_sites)
+    has_trend = (n_months >= MIN_MONTHS_FOR_TREND) & (sxx > 0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        slope = np.where(has_trend, sxy / sxx, 0.0)
+    growth = np.where(has_trend, np.expm1(12 * slope), 0.0)
+
+    # 계절 계수: 추세를 뺀 달별 수준, 평균 1 로 정규화 (추세를 못 구하면 1)
+    level = np.exp(y_mean - np.repeat(slope, 12) * x_mean).reshape(n_sites, 12)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        season = level / np.nanmean(level, axis=-1, keepdims=True)
+    season = np.where(has_trend[:, None] & np.isfinite(season), season, 1.0)
+
+    month_n = np.bincount(slot_site, minlength=n_sites)
+    month_mean = np.bincount(slot_site, weights=month_avg, minlength=n_sites) / month_n
+    month_var = np.bincount(slot_site, weights=(month_avg - month_mean[slot_site]) ** 2, minlength=n_sites)
+
+    table = pd.DataFrame({
+        "site": sites,
+        "first_date": first.astype("datetime64[D]"),
+        "last_date": last.astype("datetime64[D]"),
+        "days": n_days,
+        "sessions": np.bincount(site_code, weights=daily["sessions"].to_numpy(), minlength=n_sites).astype(np.int64),
+        "daily_kwh": mean,
+        "daily_kwh_sd": sd,
+        "daily_kwh_p10": pct[:, 0],
+        "daily_kwh_p50": pct[:, 1],
+        "daily_kwh_p90": pct[:, 2],
+        "monthly_kwh_sd": np.sqrt(month_var / np.maximum(month_n - 1, 1)),
+        "growth_annual": growth,
+    })
+    for m in range(12):
+        table[f"season_{m + 1}"] = season[:, m]
+    return table
+
+
+def mc_dist(site, rho=0.7):
+    # 보정 결과 한 행 → montecarlo.py 의 daily_kwh 분포 (월별 변동성 기준 로그정규)
+    return {"dist": "lognormal", "mean": float(site["daily_kwh"]), "sd": float(site["monthly_kwh_sd"]), "rho": rho}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="충전 세션 로그 → 사이트별 일평균 충전량 보정")
+    parser.add_argument("sessions", help="세션 로그 파일 (.csv / .parquet)")
+    parser.add_argument("-o", "--output", required=True, help="사이트별 보정 결과 파일 (.csv / .parquet)")
+    parser.add_argument("--site-col", default=DEFAULT_COLUMNS["site"], help="사이트 열 이름")
+    parser.add_argument("--time-col", default=DEFAULT_COLUMNS["time"], help="세션 시작 시각 열 이름")
+    parser.add_argument("--kwh-col", default=DEFAULT_COLUMNS["kwh"], help="충전량(kWh) 열 이름")
+    parser.add_argument("--chunk-rows", type=int, default=DEFAULT_CHUNK_ROWS, help="한 번에 읽는 행 수")
+    parser.add_argument("--cache-dir", default=DEFAULT_CACHE_DIR, help="집계 캐시 폴더")
+    parser.add_argument("--no-cache", action="store_true", help="캐시를 쓰지 않고 다시 집계")
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    columns = {"site": args.site_col, "time": args.time_col, "kwh": args.kwh_col}
+    daily = daily_totals(args.sessions, columns, args.chunk_rows, None if args.no_cache else args.cache_dir)
+    table = calibrate(daily)
+    if os.path.splitext(args.output)[1].lower() in PARQUET_EXTENSIONS:
+        table.to_parquet(args.output, index=False)
+    else:
+        table.to_csv(args.output, index=False)
+    print(f"{len(table):,}개 사이트 보정 완료 ({time.perf_counter() - started:.2f}초)", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,26 @@
+import numpy as np
+
+import aggregate
+
+
+def test_streaming_quantiles_within_bin_width():
+    rng = np.random.default_rng(7)
+    values = rng.normal(100, 20, 50_000)
+    edges = aggregate.pilot_edges(values[:1000])
+    hist = aggregate.histogram(edges)
+    for chunk in np.array_split(values, 10):
+        aggregate.histogram_update(hist, chunk)
+    width = edges[1] - edges[0]
+    np.testing.assert_allclose(aggregate.histogram_quantile(hist, [5, 50, 95]),
+                               np.percentile(values, [5, 50, 95]), atol=width)
+
+
+def test_merge_equals_single_pass():
+    rng = np.random.default_rng(8)
+    values = rng.uniform(-5, 5, 4000)
+    edges = np.linspace(-6, 6, 97)
+    whole = aggregate.histogram_update(aggregate.histogram(edges), values)
+    merged = aggregate.histogram_merge(aggregate.histogram_update(aggregate.histogram(edges), values[:1500]),
+                                       aggregate.histogram_update(aggregate.histogram(edges), values[1500:]))
+    np.testing.assert_array_equal(merged["counts"], whole["counts"])
+    assert (merged["min"], merged["max"]) == (whole["min"], whole["max"])
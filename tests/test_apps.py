@@ -0,0 +1,77 @@
+import datetime
+import os
+
+import numpy as np
+import pytest
+
+import engine
+
+streamlit_testing = pytest.importorskip("streamlit.testing.v1")
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.mark.parametrize("name", ["p10", "p5", "profit", "profit2"])
+def test_app_runs_with_default_inputs(name):
+    app = streamlit_testing.AppTest.from_file(os.path.join(ROOT, f"{name}.py"), default_timeout=60)
+    app.run()
+    assert not app.exception
+    # 월별 표가 비어 있지 않음
+    assert any(len(frame.value) > 0 for frame in app.dataframe)
+
+
+def test_p10_discount_rate_change_reuses_cached_schedule(monkeypatch):
+    # 할인율은 NPV 단계에만 쓰이므로 스케줄을 다시 계산하지 않음
+    app = streamlit_testing.AppTest.from_file(os.path.join(ROOT, "p10.py"), default_timeout=60)
+    app.run()
+    before = app.dataframe[0].value.copy()
+    calls = []
+    build_schedule = engine.build_schedule
+    monkeypatch.setattr(engine, "build_schedule", lambda *a, **kw: calls.append(1) or build_schedule(*a, **kw))
+    next(s for s in app.slider if s.label.startswith("연 할인율")).set_value(8.0).run()
+    assert not app.exception
+    assert calls == []
+    np.testing.assert_array_equal(app.dataframe[0].value.to_numpy(), before.to_numpy())
+
+
+@pytest.mark.parametrize("text, error", [("1, 0, 2", False), ("1, x", True), ("1, -2", True), ("", True)])
+def test_p10_rollout_input(text, error):
+    # 입력 형식 오류는 안내 메시지로, 예외로 드러나지 않음
+    app = streamlit_testing.AppTest.from_file(os.path.join(ROOT, "p10.py"), default_timeout=60)
+    app.run()
+    next(c for c in app.checkbox if c.label == "롤아웃 현금흐름 보기").check()
+    next(t for t in app.text_input if t.label.startswith("월별 설치 대수")).set_value(text)
+    app.run()
+    assert not app.exception
+    assert bool(app.error) == error
+
+
+def test_p10_tou_follows_start_date():
+    # TOU 달력은 사업 시작일이 속한 달부터 (여름 시작이면 첫 달 단가가 달라짐)
+    app = streamlit_testing.AppTest.from_file(os.path.join(ROOT, "p10.py"), default_timeout=60)
+    app.run()
+    next(c for c in app.checkbox if c.label.startswith("시간대별 요금")).check()
+    app.run()
+    winter = app.dataframe[0].value.iloc[0].copy()
+    app.date_input[0].set_value(datetime.date(2025, 7, 1)).run()
+    assert not app.exception
+    assert app.dataframe[0].value.iloc[0]["비용(OPEX)"] != winter["비용(OPEX)"]
+
+
+def test_p10_calendar_mode_reports_xirr():
+    app = streamlit_testing.AppTest.from_file(os.path.join(ROOT, "p10.py"), default_timeout=60)
+    app.run()
+    next(c for c in app.checkbox if c.label == "실제 날짜 기준 계산").check()
+    app.date_input[0].set_value(datetime.date(2024, 1, 31)).run()
+    assert not app.exception
+    assert any("XIRR" in caption.value and "2024-01-31 시작" in caption.value for caption in app.caption)
+
+
+@pytest.mark.parametrize("name", ["p10", "p5", "profit", "profit2"])
+def test_tables_use_compact_columns(name):
+    # 라벨은 Categorical, 금액·월은 정수 (행마다 파이썬 문자열/실수를 두지 않음)
+    app = streamlit_testing.AppTest.from_file(os.path.join(ROOT, f"{name}.py"), default_timeout=60)
+    app.run()
+    dtypes = app.dataframe[0].value.dtypes
+    assert not (dtypes == object).any()
+    assert all(dtype == "category" or np.issubdtype(dtype, np.integer) for dtype in dtypes)
@@ -0,0 +1,47 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import batch
+import scenarios
+
+
+def _table():
+    return pd.DataFrame({
+        "site": ["a", "b", "c", "d", "e"],
+        "daily_kwh": [8.0, 15.0, 22.0, 30.0, 45.0],
+        "normal_price": [280, 288, 300, 310, 320],
+        "simulation_years": [10, 7, 10, 5, 8],
+    })
+
+
+@pytest.mark.parametrize("ext", ["csv", "parquet"])
+def test_cli_round_trip_matches_evaluate_rows(tmp_path, ext):
+    if ext == "parquet":
+        pytest.importorskip("pyarrow")
+    table = _table()
+    source, output, schedules = (str(tmp_path / f"{name}.{ext}") for name in ("sites", "results", "schedules"))
+    batch.write_table(table, source)
+
+    assert batch.main([source, "-o", output, "--schedules", schedules, "--chunk-size", "2"]) == 0
+
+    expected = scenarios.evaluate_rows(table)
+    result = batch.read_table(output)
+    assert list(result.columns) == list(expected.columns)
+    pd.testing.assert_frame_equal(result, expected, check_dtype=False, rtol=1e-12)
+
+    # 월별 스케줄: 시나리오마다 자기 기간까지만, 값은 p10_schedule 과 같음
+    monthly = batch.read_table(schedules)
+    np.testing.assert_array_equal(monthly.groupby("scenario").size(), table["simulation_years"] * 12)
+    for i, row in table.iterrows():
+        params = {k: np.array([row[k]]) for k in ("daily_kwh", "normal_price", "simulation_years")}
+        _, sched, _ = scenarios.p10_schedule(params)
+        rows = monthly[monthly["scenario"] == i]
+        for key in ("investor", "company", "balance"):
+            np.testing.assert_allclose(rows[key], sched[key][0, :len(rows)], rtol=1e-12, atol=1e-6)
+
+
+def test_cli_rejects_empty_file(tmp_path):
+    source = tmp_path / "empty.csv"
+    pd.DataFrame(columns=["daily_kwh"]).to_csv(source, index=False)
+    assert batch.main([str(source), "-o", str(tmp_path / "out.csv")]) == 1
@@ -0,0 +1,56 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import chartdata
+
+
+def _frame(n=5000):
+    rng = np.random.default_rng(11)
+    month = np.arange(1, n + 1)
+    flow = rng.normal(size=n)
+    flow[1234] = -40.0                                          # 짧은 급락
+    flow[3777] = 35.0
+    return pd.DataFrame({"month": month, "flow": flow, "balance": np.cumsum(flow), "other": 0.0})
+
+
+@pytest.mark.parametrize("method", chartdata.METHODS)
+@pytest.mark.parametrize("columns", [["flow"], ["flow", "balance"]])
+def test_keeps_ends_and_extremes_within_limit(method, columns):
+    frame = _frame()
+    small = chartdata.downsample(frame, "month", columns, method=method)
+    assert len(small) <= chartdata.MAX_POINTS
+    assert list(small.columns) == ["month", *columns]
+    assert (np.diff(small["month"]) > 0).all()
+    assert small["month"].iloc[0] == 1 and small["month"].iloc[-1] == len(frame)
+    for c in columns:
+        assert small[c].min() == frame[c].min() and small[c].max() == frame[c].max()
+    # 남은 행은 원본 행 그대로
+    original = frame.set_index("month").loc[small["month"], columns].reset_index(drop=True)
+    pd.testing.assert_frame_equal(small[columns], original)
+
+
+def test_small_frame_is_unchanged():
+    frame = _frame().iloc[:120]
+    small = chartdata.downsample(frame, "month", ["balance"], method="lttb")
+    pd.testing.assert_frame_equal(small, frame[["month", "balance"]])
+
+
+def test_lttb_index_count():
+    x = np.arange(1000.0)
+    idx = chartdata.lttb_indices(x, np.sin(x / 30), 50)
+    assert len(idx) == 50 and idx[0] == 0 and idx[-1] == 999 and (np.diff(idx) > 0).all()
+
+
+def test_yearly_rollup():
+    frame = pd.DataFrame({"month": np.arange(1, 31), "flow": 1.0, "balance": np.arange(1, 31) - 10.0})
+    yearly = chartdata.yearly_rollup(frame, "month", sums=["flow"], lasts=["balance"])
+    np.testing.assert_array_equal(yearly["년차"], [1, 2, 3])
+    np.testing.assert_array_equal(yearly["month"], [12, 24, 30])
+    np.testing.assert_array_equal(yearly["flow"], [12, 12, 6])
+    np.testing.assert_array_equal(yearly["balance"], [2, 14, 20])
+
+
+def test_unknown_method():
+    with pytest.raises(ValueError):
+        chartdata.downsample(_frame(), "month", ["flow"], method="nope")
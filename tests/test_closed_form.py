@@ -0,0 +1,38 @@
+import numpy as np
+import pytest
+
+import dated
+import scenarios
+
+KEYS = ("inv_npv", "inv_roi", "com_npv", "com_roi", "min_balance", "final_balance")
+
+
+def _grid():
+    return scenarios.product_grid(daily_kwh=[0.0, 7.5, 20.0, 45.0], p2_share=[0.0, 0.5, 1.0],
+                                  repayment_year=[0, 3, 7], promo_months=[0, 6])
+
+
+@pytest.mark.parametrize("extra", [
+    {},
+    {"kwh_cost_monthly": np.linspace(120, 180, 84)},
+    {"start_date": "2024-01-31"},
+])
+def test_closed_form_matches_monthly(extra):
+    params = {**_grid(), **extra}
+    monthly = scenarios.p10_evaluate(params)
+    closed = scenarios.p10_evaluate(params, method="closed_form")
+    for key in KEYS:
+        np.testing.assert_allclose(closed[key], monthly[key], rtol=1e-9, atol=1e-6, err_msg=key)
+
+
+def test_average_days_reproduce_default_schedule():
+    grid = _grid()
+    base = scenarios.p10_evaluate(grid)
+    same = scenarios.p10_evaluate({**grid, "days_monthly": np.full(84, 365 / 12)})
+    for key in KEYS:
+        np.testing.assert_allclose(same[key], base[key], err_msg=key)
+
+
+def test_days_monthly_from_start_date():
+    col, _, _, flow_params = scenarios.p10_inputs({"start_date": "2024-02-15"})
+    np.testing.assert_array_equal(flow_params["days_monthly"], dated.period_days("2024-02-15", 84))
@@ -0,0 +1,36 @@
+import numpy as np
+
+import cube
+
+AXES = {
+    "daily_kwh": [10.0, 20.0, 30.0],
+    "investment_amount": [0.0, 250_000.0, 500_000.0],
+    "discount_rate_annual": [0.03, 0.06],
+}
+
+
+def _cube(tmp_path):
+    cube.build(str(tmp_path), axes=AXES)
+    return cube.open_cube(str(tmp_path))
+
+
+def test_grid_points_match_engine(tmp_path):
+    c = _cube(tmp_path)
+    params = {"daily_kwh": 20.0, "investment_amount": 250_000.0, "discount_rate_annual": 0.06}
+    found, interpolated = cube.evaluate(c, params)
+    exact, _ = cube.evaluate(None, params)
+    assert interpolated
+    for name in cube.METRICS:
+        np.testing.assert_allclose(found[name], exact[name], rtol=1e-9, err_msg=name)
+
+
+def test_nan_corner_falls_back_to_engine(tmp_path):
+    # 투자액 0 꼭짓점은 투자자 IRR 이 NaN → 그 옆 칸 조회도 값이 있어야 함
+    c = _cube(tmp_path)
+    params = {"daily_kwh": 15.0, "investment_amount": 100_000.0, "discount_rate_annual": 0.04}
+    found, interpolated = cube.evaluate(c, params)
+    exact, _ = cube.evaluate(None, params)
+    assert interpolated
+    assert np.isfinite(found["inv_irr"])
+    assert found["inv_irr"] == exact["inv_irr"]
+    np.testing.assert_allclose(found["inv_npv"], exact["inv_npv"], rtol=0.05)
@@ -0,0 +1,36 @@
+import numpy as np
+import pytest
+
+import dated
+
+# Excel XIRR / XNPV 도움말 예제
+EXCEL_FLOWS = [-10000, 2750, 4250, 3250, 2750]
+EXCEL_DATES = np.array(["2008-01-01", "2008-03-01", "2008-10-30", "2009-02-15", "2009-04-01"], dtype="datetime64[D]")
+
+
+def test_xirr_matches_excel_example():
+    rate, status = dated.xirr(EXCEL_FLOWS, EXCEL_DATES)
+    assert status[0] == 0
+    # Excel 표시값은 자체 반복 허용 오차(1e-8)로 반올림된 값
+    assert rate[0] == pytest.approx(0.373362535, abs=1e-8)
+
+
+def test_xnpv_matches_excel_example():
+    assert dated.xnpv(0.09, EXCEL_FLOWS, EXCEL_DATES) == pytest.approx(2086.647602, abs=1e-6)
+
+
+def test_flow_dates_clip_to_month_end():
+    dates = dated.flow_dates("2024-01-31", 3)
+    assert dates.astype(str).tolist() == ["2024-01-31", "2024-02-29", "2024-03-31", "2024-04-30"]
+
+
+def test_period_days_count_leap_year():
+    assert dated.period_days("2024-01-01", 12).sum() == 366
+    assert dated.period_days("2025-03-10", 12).sum() == 365
+
+
+def test_per_scenario_start_dates():
+    starts = np.array(["2024-01-31", "2023-06-15"], dtype="datetime64[D]")
+    dates = dated.flow_dates(starts, 12)
+    assert dates.shape == (2, 13)
+    assert dates[1, -1] == np.datetime64("2024-06-15")
@@ -0,0 +1,89 @@
+import numpy as np
+import pytest
+
+import deal
+import engine
+import scenarios
+
+P5_PARAMS = {"op_promo": 50_000, "op_normal": 120_000, "promo_months": 6, "p1_years": 2, "p1_rate": 4.7,
+             "p2_years": 1, "p2_share_pct": 30, "investor_amount": 1_234_567, "project_cost": 3_000_000}
+
+
+def _schedule(d, total_months, flow_params, initial):
+    return engine.build_schedule(d.flows, total_months, initial_balance=initial, **flow_params)
+
+
+def _p5_inputs():
+    return scenarios.p5_inputs(scenarios.product_grid(investor_amount=[1_234_567, 2_000_000],
+                                                      p1_rate=[4.7, 5.3], daily_avg_charge=[10, 40]))
+
+
+@pytest.mark.parametrize("policy", sorted(engine.ROUNDING))
+def test_exact_phase_totals_equal_rounded_float_totals(policy):
+    _, total_months, fp = _p5_inputs()
+    exact = deal.P5.exact(policy)
+    unrounded = deal.Deal({**deal.P5.spec, "round": None})
+    a = _schedule(exact, total_months, fp, exact.initial_balance(**fp))
+    b = _schedule(unrounded, total_months, fp, unrounded.initial_balance(**fp))
+    assert a["investor"].dtype == np.int64 and a["balance"].dtype == np.int64
+
+    end = deal.P5.phase_ends(**fp)[0]
+    interest = a["month"] <= end
+    # 1단계(이자) 총액 = 실수 총액을 한 번 반올림한 값 (원금 일시 상환 포함)
+    expected = engine.settle_won((b["investor"] * interest).sum(axis=-1), policy)
+    np.testing.assert_array_equal((a["investor"] * interest).sum(axis=-1), expected)
+    # 마지막 달 외에는 월 차이가 1원 미만
+    diff = np.abs(a["investor"] - b["investor"])
+    assert np.where(a["month"] == end, 0, diff).max() < 1
+
+
+def test_exact_closed_form_matches_monthly():
+    import closed_form
+    col, total_months, outlay, fp = scenarios.p10_inputs(scenarios.product_grid(daily_kwh=[7.3, 23.1],
+                                                                                p1_rate_annual=[0.047]))
+    exact = deal.P10.exact("half_up")
+    initial = engine.settle_won(-outlay, "half_up")
+    sched = _schedule(exact, total_months, fp, initial)
+    result = closed_form.evaluate(exact, total_months, initial_balance=initial, **fp)
+    np.testing.assert_allclose(result["final_balance"], sched["balance"][:, -1])
+
+
+def test_float_mode_keeps_truncated_amounts():
+    amount = deal.P5.phase_amounts(**P5_PARAMS)[0]
+    assert float(np.ravel(amount)[0]) == float(np.trunc(1_234_567 * 0.047 / 12))
+
+
+def test_bullet_paid_at_end_of_named_phase():
+    sched = engine.build_schedule(deal.P5.flows, 48, initial_balance=deal.P5.initial_balance(**P5_PARAMS),
+                                  **P5_PARAMS)
+    np.testing.assert_array_equal(np.flatnonzero(sched["principal"]) + 1, [24])
+    assert sched["principal"][23] == 1_234_567
+    np.testing.assert_array_equal(sched["phase"][[0, 23, 24, 35, 36, 47]], [1, 1, 2, 2, 3, 3])
+    # 배분 단계는 영업이익 × 30% (절사)
+    assert sched["investor"][24] == np.trunc(120_000 * 0.3)
+    assert deal.P5.initial_balance(**P5_PARAMS) == 1_234_567 - 3_000_000
+
+
+def test_level_net_of_prior_reaches_target_total():
+    params = {"op_promo": 80_000, "op_normal": 80_000, "promo_months": 0, "phase1_months": 6,
+              "phase2_months": 18, "total_principal": 1_000_000, "phase1_rate": 6.0, "target_investor_roi": 20}
+    sched = engine.build_schedule(deal.PROFIT.flows, 30, **params)
+    np.testing.assert_allclose(sched["investor"].sum(), 1_000_000 * 1.2)
+    assert (sched["investor"][24:] == 0).all()
+
+
+@pytest.mark.parametrize("spec", [
+    {"operating": "hourly", "phases": [{"name": "독점"}]},
+    {"phases": []},
+    {"phases": [{"name": "독점"}, {"name": "배분", "months": 12}]},
+    {"phases": [{"name": "이자", "months": 12, "pay": {"rule": "bonus"}}, {"name": "독점"}]},
+    {"phases": [{"name": "독점"}], "events": [{"rule": "bullet", "amount": 1, "at_end_of": "이자"}]},
+])
+def test_invalid_spec_rejected(spec):
+    with pytest.raises(ValueError):
+        deal.Deal(spec)
+
+
+def test_unknown_rounding_policy_rejected():
+    with pytest.raises(ValueError):
+        deal.P5.exact("banker")
@@ -0,0 +1,63 @@
+import numpy as np
+
+import engine
+
+
+def test_npv_matches_discounted_sum():
+    values = np.array([-1000.0, 300.0, 400.0, 500.0])
+    expected = sum(v / 1.01 ** t for t, v in enumerate(values))
+    np.testing.assert_allclose(engine.npv(0.01, values), expected)
+    rows = np.vstack([values, 2 * values])
+    np.testing.assert_allclose(engine.npv(np.array([[0.01], [0.0]]), rows), [expected, 2 * values.sum()])
+
+
+def test_with_initial_broadcasts_per_row():
+    flows = engine.with_initial(np.ones((2, 3)), np.array([[-5.0], [-7.0]]))
+    np.testing.assert_array_equal(flows, [[-5, 1, 1, 1], [-7, 1, 1, 1]])
+    np.testing.assert_array_equal(engine.with_initial(np.ones(2), -3), [-3, 1, 1])
+
+
+def test_balance_adds_months_in_order():
+    # 월별 루프와 같은 순서로 더해야 표시용 절사 값이 같음
+    company = np.array([0.1, 0.2, 0.3, -0.6, 1e16, -1e16])
+
+    def flows(months):
+        return {"company": company[months - 1], "investor": np.zeros(len(months))}
+
+    sched = engine.build_schedule(flows, 6, initial_balance=0.7)
+    expected, running = [], 0.7
+    for value in company:
+        running += value
+        expected.append(running)
+    np.testing.assert_array_equal(sched["balance"], expected)
+    np.testing.assert_array_equal(sched["month"], np.arange(1, 7))
+
+
+def test_schedule_zeroes_months_after_each_horizon():
+    def flows(months, level):
+        return {"company": level * np.ones(len(months)), "investor": level * np.ones(len(months))}
+
+    sched = engine.build_schedule(flows, np.array([[2], [4]]), initial_balance=np.array([[-1.0], [0.0]]),
+                                  level=np.array([[1.0], [2.0]]))
+    np.testing.assert_array_equal(sched["company"], [[1, 1, 0, 0], [2, 2, 2, 2]])
+    np.testing.assert_array_equal(sched["balance"], [[0, 1, 1, 1], [2, 4, 6, 8]])
+
+
+def test_payback_month():
+    balance = np.array([[-3, -1, 2, -1, 4], [1, 2, 3, 4, 5], [-1, -1, -1, -1, -1]], dtype=float)
+    np.testing.assert_array_equal(engine.payback_month(balance), [5, 0, 6])
+
+
+def test_flat_operating_profit():
+    profit = engine.flat_operating_profit(20, 300, 150, 10000, 2)
+    assert profit == (20 * 150 * 30 - (2390 * 7 + 3000 + 10000)) * 2
+
+
+def test_recovery_helpers_respect_lengths():
+    values = np.array([[-1, -2, 3, -4, -5, -6], [1, -1, -1, 2, -1, -1]], dtype=float)
+    np.testing.assert_array_equal(engine.months_below(values), [5, 4])
+    np.testing.assert_array_equal(engine.longest_run_below(values), [3, 2])
+    np.testing.assert_array_equal(engine.months_below(values, lengths=np.array([4, 6])), [3, 4])
+    np.testing.assert_array_equal(engine.longest_run_below(values, lengths=np.array([[4], [3]])), [2, 2])
+    np.testing.assert_array_equal(engine.first_month_at_or_above(values, lengths=np.array([2, 6])), [3, 1])
+    np.testing.assert_array_equal(engine.payback_month(values, lengths=np.array([3, 4])), [3, 4])
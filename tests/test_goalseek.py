@@ -0,0 +1,84 @@
+import numpy as np
+import pytest
+
+import engine
+import goalseek
+import irr
+import scenarios
+
+P5_SITES = {"daily_avg_charge": np.array([12.0, 20.0, 30.0, 60.0])}
+P10_SITES = {"daily_kwh": np.array([10.0, 20.0, 30.0, 50.0])}
+
+
+def _meets(model, params, min_balance, target_irr):
+    # 월별 스케줄(engine.build_schedule) + 일괄 IRR(irr.solve_irr)로 직접 확인
+    deal, _, total_months, flow_params, initial_balance, outlay = scenarios.model_inputs(model, params)
+    sched = engine.build_schedule(deal.flows, total_months, initial_balance=initial_balance, **flow_params)
+    ok = np.ones(len(outlay), dtype=bool)
+    if min_balance is not None:
+        ok &= sched["balance"].min(axis=-1) >= min_balance - 1e-6
+    if target_irr is not None:
+        monthly, _ = irr.solve_irr(engine.with_initial(sched["investor"], -outlay))
+        ok &= irr.annualize(monthly) >= target_irr - 1e-9
+    return ok
+
+
+def _bounds(variable):
+    bounds = goalseek.VARIABLES[variable]["bounds"]
+    return (0.0, np.inf) if bounds == "funding" else bounds
+
+
+@pytest.mark.parametrize("model, variable, sites, min_balance, target_irr", [
+    ("p5", "investor_amount", P5_SITES, 0.0, None),
+    ("p5", "investor_amount", P5_SITES, 0.0, 0.07),
+    ("p5", "p1_years", P5_SITES, 0.0, 0.07),
+    ("p5", "p2_share_pct", P5_SITES, 0.0, 0.07),
+    ("p10", "investment_amount", P10_SITES, 0.0, 0.08),
+    ("p10", "p1_years", P10_SITES, None, 0.1),
+    ("p10", "p2_share", P10_SITES, 0.0, None),
+])
+def test_solution_matches_monthly_schedule(model, variable, sites, min_balance, target_irr):
+    result = goalseek.solve(model, variable, sites, min_balance=min_balance, target_irr=target_irr)
+    spec = goalseek.VARIABLES[variable]
+    lo, hi = _bounds(variable)
+    found = result["status"] == goalseek.SEEK_OK
+    assert found.any()
+
+    # 찾은 값은 조건을 충족
+    value = result["value"][found]
+    picked = {k: v[found] for k, v in sites.items()}
+    assert _meets(model, {**picked, variable: value}, min_balance, target_irr).all()
+
+    # 한 단계 더 (min 은 작게, max 는 크게) 가면 탐색 범위 안에서는 조건을 벗어남
+    step = spec.get("step", 1)
+    beyond = value - step if spec["direction"] == "min" else value + step
+    inside = (beyond >= lo) & (beyond <= hi)
+    if inside.any():
+        params = {**{k: v[inside] for k, v in picked.items()}, variable: beyond[inside]}
+        assert not _meets(model, params, min_balance, target_irr).any()
+
+    # 충족 불가로 나온 부지는 범위 양 끝에서도 충족하지 않음
+    missed = result["status"] == goalseek.SEEK_INFEASIBLE
+    if missed.any():
+        others = {k: v[missed] for k, v in sites.items()}
+        ends = [lo, hi] if np.isfinite(hi) else [lo + step, 1e8]
+        for end in ends:
+            assert not _meets(model, {**others, variable: np.full(missed.sum(), end)}, min_balance, target_irr).any()
+
+
+def test_infeasible_sites_report_nan():
+    result = goalseek.solve("p5", "investor_amount", {"daily_avg_charge": [0.5]}, min_balance=0)
+    assert result["status"][0] == goalseek.SEEK_INFEASIBLE
+    assert np.isnan(result["value"][0])
+
+
+def test_amount_independent_irr_has_no_minimum():
+    # p5 는 이자·배분이 유치 금액에 비례해 IRR 이 금액과 무관 → 0 보다 큰 모든 금액이 충족
+    result = goalseek.solve("p5", "investor_amount", min_balance=None, target_irr=0.06)
+    assert result["status"][0] == goalseek.SEEK_NO_MINIMUM
+    assert np.isnan(result["value"][0])
+
+
+def test_requires_a_condition():
+    with pytest.raises(ValueError):
+        goalseek.solve("p5", "investor_amount", min_balance=None, target_irr=None)
@@ -0,0 +1,89 @@
+import numpy as np
+import pytest
+
+import irr
+
+
+def _npf_irr(values):
+    # numpy_financial.irr 과 같은 정의: 다항식 근 중 실수 근, 0 에 가장 가까운 것
+    roots = np.roots(np.asarray(values, dtype=float)[::-1])
+    roots = roots[(roots.imag == 0) & (roots.real > 0)].real
+    if len(roots) == 0:
+        return np.nan
+    rates = 1 / roots - 1
+    return rates[np.argmin(np.abs(rates))]
+
+
+# numpy_financial.irr 문서 예제 (값, 소수 5자리 기대값)
+DOC_EXAMPLES = [
+    ([-100, 39, 59, 55, 20], 0.28095),
+    ([-100, 0, 0, 74], -0.0955),
+    ([-100, 100, 0, -7], -0.0833),
+    ([-100, 100, 0, 7], 0.06206),
+    ([-5, 10.5, 1, -8, 1], 0.0886),
+]
+
+
+@pytest.mark.parametrize("values, expected", DOC_EXAMPLES)
+def test_documented_examples(values, expected):
+    rate, _ = irr.solve_irr(values)
+    assert round(rate[0], 5) == expected
+
+
+def test_single_root_rows_match_reference():
+    rng = np.random.default_rng(0)
+    flows = np.concatenate([-rng.uniform(1e6, 3e6, (200, 1)), rng.uniform(1e4, 8e4, (200, 84))], axis=1)
+    rate, status = irr.solve_irr(flows)
+    assert (status == irr.IRR_OK).all()
+    np.testing.assert_allclose(rate, [_npf_irr(row) for row in flows], rtol=1e-9, atol=1e-12)
+
+
+@pytest.mark.parametrize("values, expected", [
+    ([1, -2.4, 1.43], 0.1),         # 근 0.1, 0.3
+    ([1, -2.11, 1.113], 0.05),      # 근 0.05, 0.06 - 같은 격자 칸
+    ([1, -2.47, 1.455], -0.03),     # 근 -0.03, 0.5
+])
+def test_multiple_roots_pick_nearest_zero(values, expected):
+    rate, status = irr.solve_irr(values)
+    assert rate[0] == pytest.approx(expected, abs=1e-12)
+    assert status[0] == irr.IRR_MULTIPLE
+
+
+def test_random_multi_sign_rows_match_reference():
+    rng = np.random.default_rng(1)
+    flows = rng.normal(size=(500, 12))
+    flows[:, 0] = -np.abs(flows[:, 0])
+    rate, _ = irr.solve_irr(flows)
+    np.testing.assert_allclose(rate, [_npf_irr(row) for row in flows], rtol=1e-8, atol=1e-10)
+
+
+def test_guess_does_not_change_root():
+    flows = np.array([[1, -2.4, 1.43]] * 3)
+    rate, _ = irr.solve_irr(flows, guess=np.array([0.29, 0.31, np.nan]))
+    np.testing.assert_allclose(rate, 0.1)
+
+
+@pytest.mark.parametrize("values, expected", [([-1, 3], 2.0), ([-1, 0, 400], 19.0), ([-1, 2, 3], 2.0)])
+def test_roots_above_grid(values, expected):
+    rate, status = irr.solve_irr(values)
+    assert rate[0] == pytest.approx(expected, rel=1e-12)
+    assert status[0] == irr.IRR_OK
+
+
+def test_roots_beyond_search_range_are_flagged():
+    rate, status = irr.solve_irr([[-1, 1e6], [1, -1e-7]])
+    assert np.isnan(rate).all()
+    assert (status == irr.IRR_OUT_OF_RANGE).all()
+
+
+def test_no_sign_change_has_no_root():
+    rate, status = irr.solve_irr([[100, 10, 10], [-100, -10, -10], [0, 0, 0]])
+    assert np.isnan(rate).all()
+    assert (status == irr.IRR_NO_ROOT).all()
+
+
+def test_fractional_times_match_integer_times():
+    flows = np.array([[-1000, 300, 400, 500]])
+    a, _ = irr.solve_irr(flows)
+    b, _ = irr.solve_irr(flows, times=[0.0, 1.0, 2.0, 3.0])
+    np.testing.assert_allclose(a, b)
@@ -0,0 +1,84 @@
+import threading
+import time
+
+import jobs
+
+
+def _wait(job, timeout=10.0):
+    deadline = time.time() + timeout
+    while not job.finished:
+        assert time.time() < deadline, "작업이 끝나지 않음"
+        time.sleep(0.01)
+    return job.snapshot()
+
+
+def _blocking(release):
+    # release 가 풀릴 때까지 진행률을 보고하며 대기하는 작업
+    def fn(job):
+        while not release.wait(0.01):
+            job.report(0.5, partial="half")
+        return "done"
+    return fn
+
+
+def test_identical_params_share_one_job():
+    runner = jobs.JobRunner()
+    calls = []
+    first = runner.submit("kind", {"a": 1, "b": [1, 2]}, lambda job: calls.append(1) or 42)
+    second = runner.submit("kind", {"b": [1, 2], "a": 1}, lambda job: calls.append(1) or 43)
+    assert second is first
+    assert _wait(first)["result"] == 42 and len(calls) == 1
+    assert runner.get("kind", {"a": 1, "b": [1, 2]}) is first
+    assert runner.submit("other", {"a": 1, "b": [1, 2]}, lambda job: 0) is not first
+
+
+def test_cancel_stops_at_next_report():
+    runner = jobs.JobRunner()
+    release = threading.Event()
+    job = runner.submit("kind", {}, _blocking(release))
+    while job.snapshot()["partial"] is None:
+        time.sleep(0.01)
+    job.cancel()
+    snapshot = _wait(job)
+    assert snapshot["status"] == jobs.CANCELLED
+    assert snapshot["partial"] == "half" and snapshot["result"] is None
+
+
+def test_restart_resubmits_only_failed_or_cancelled():
+    runner = jobs.JobRunner()
+
+    def fail(job):
+        raise RuntimeError("boom")
+
+    failed = runner.submit("fail", {}, fail)
+    assert _wait(failed)["status"] == jobs.FAILED and "boom" in failed.error
+    retried = runner.submit("fail", {}, lambda job: "ok", restart=True)
+    assert retried is not failed and _wait(retried)["result"] == "ok"
+
+    # 완료된 작업은 restart=True 여도 그대로
+    assert runner.submit("fail", {}, lambda job: "again", restart=True) is retried
+
+    release = threading.Event()
+    running = runner.submit("slow", {}, _blocking(release))
+    assert runner.submit("slow", {}, lambda job: 0, restart=True) is running
+    running.cancel()
+    assert _wait(running)["status"] == jobs.CANCELLED
+    restarted = runner.submit("slow", {}, lambda job: "fresh", restart=True)
+    assert restarted is not running and _wait(restarted)["result"] == "fresh"
+
+
+def test_prune_keeps_running_jobs():
+    runner = jobs.JobRunner(max_workers=2, max_jobs=2)
+    release = threading.Event()
+    running = runner.submit("slow", {}, _blocking(release))
+    done = [runner.submit("quick", {"i": i}, lambda job: 0) for i in range(4)]
+    for job in done:
+        _wait(job)
+    runner.submit("quick", {"i": 4}, lambda job: 0)
+    try:
+        assert runner.get("slow", {}) is running            # 진행 중인 작업은 가장 오래됐어도 남음
+        assert runner.get("quick", {"i": 0}) is None        # 끝난 작업은 오래된 것부터 제거
+        assert len(runner._jobs) == 2
+    finally:
+        release.set()
+        _wait(running)
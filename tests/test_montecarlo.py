@@ -0,0 +1,57 @@
+import numpy as np
+import pytest
+
+import montecarlo
+
+DISTS = {
+    "daily_kwh": {"dist": "lognormal", "mean": 20, "sd": 12, "rho": 0.7},
+    "kwh_cost": {"dist": "normal", "mean": 150, "sd": 40, "rho": 0.9},
+}
+BASE = {"simulation_years": 3, "investment_amount": 1e6, "promo_months": 9}
+
+
+def test_path_irr_does_not_depend_on_guess():
+    seed = np.random.SeedSequence(7)
+    cold, _ = montecarlo.simulate_paths(DISTS, BASE, 400, seed)
+    for guess in (-0.08, 0.0, 0.06, 0.5):
+        warm, _ = montecarlo.simulate_paths(DISTS, BASE, 400, seed, guess)
+        np.testing.assert_allclose(warm["inv_irr"], cold["inv_irr"], rtol=1e-9)
+        np.testing.assert_array_equal(warm["inv_irr_status"], cold["inv_irr_status"])
+
+
+def test_same_seed_same_summary_for_any_worker_count(monkeypatch):
+    monkeypatch.setattr(montecarlo, "INLINE_MAX_PATHS", 0)
+    one, _ = montecarlo.run(DISTS, BASE, n_paths=600, seed=3, chunk_size=200, workers=1)
+    two, _ = montecarlo.run(DISTS, BASE, n_paths=600, seed=3, chunk_size=200, workers=2)
+    np.testing.assert_equal(one, two)
+
+
+def test_pool_is_reused_between_runs(monkeypatch):
+    monkeypatch.setattr(montecarlo, "INLINE_MAX_PATHS", 0)
+    montecarlo.run(DISTS, BASE, n_paths=600, seed=1, chunk_size=200, workers=2)
+    pool = montecarlo._pools[2]
+    montecarlo.run(DISTS, BASE, n_paths=600, seed=2, chunk_size=200, workers=2)
+    assert montecarlo._pools[2] is pool
+
+
+def test_small_runs_stay_in_process():
+    # 작은 실행은 풀을 만들지 않음
+    before = dict(montecarlo._pools)
+    montecarlo.run(DISTS, BASE, n_paths=600, seed=1, chunk_size=200, workers=3)
+    assert 3 not in montecarlo._pools and montecarlo._pools == before
+
+
+@pytest.mark.parametrize("n_paths, chunk_size", [(0, 100), (-5, 100), (100, 0)])
+def test_invalid_sizes_raise(n_paths, chunk_size):
+    with pytest.raises(ValueError):
+        montecarlo.run(DISTS, BASE, n_paths=n_paths, chunk_size=chunk_size)
+
+
+def test_pool_runs_inside_a_thread(monkeypatch):
+    # jobs.py 처럼 스레드 안에서 프로세스 풀을 써도 멈추지 않아야 함
+    from concurrent.futures import ThreadPoolExecutor
+    monkeypatch.setattr(montecarlo, "INLINE_MAX_PATHS", 0)
+    with ThreadPoolExecutor(max_workers=2) as threads:
+        futures = [threads.submit(montecarlo.run, DISTS, BASE, 600, seed, 200, 2) for seed in (1, 1)]
+        first, second = (f.result(timeout=120)[0] for f in futures)
+    np.testing.assert_equal(first, second)
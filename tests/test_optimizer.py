@@ -0,0 +1,34 @@
+import numpy as np
+
+import optimizer
+
+
+def _non_dominated(com_npv, inv_irr):
+    # 직접 비교: 두 지표 모두 같거나 낫고 하나는 더 나은 점이 없으면 front
+    keep = []
+    for i in range(len(com_npv)):
+        better = (com_npv >= com_npv[i]) & (inv_irr >= inv_irr[i]) & ((com_npv > com_npv[i]) | (inv_irr > inv_irr[i]))
+        if not better.any():
+            keep.append(i)
+    return keep
+
+
+def test_hand_built_front():
+    com_npv = np.array([100.0, 90.0, 90.0, 80.0, 70.0, 60.0, 50.0])
+    inv_irr = np.array([0.05, 0.04, 0.07, 0.06, 0.08, 0.08, 0.10])
+    # 1 은 2 에, 3 은 2 에, 5 는 4 에 지배됨 (NPV 가 같으면 IRR 이 높은 점만)
+    assert sorted(optimizer.pareto_front(com_npv, inv_irr)) == [0, 2, 4, 6]
+
+
+def test_front_is_non_dominated():
+    rng = np.random.default_rng(3)
+    com_npv = rng.normal(size=400)
+    inv_irr = rng.normal(size=400) - 0.5 * com_npv
+    front = optimizer.pareto_front(com_npv, inv_irr)
+    assert sorted(front) == _non_dominated(com_npv, inv_irr)
+
+
+def test_nan_irr_is_skipped():
+    com_npv = np.array([100.0, 90.0, 80.0])
+    inv_irr = np.array([np.nan, 0.05, 0.07])
+    assert sorted(optimizer.pareto_front(com_npv, inv_irr)) == [1, 2]
@@ -0,0 +1,41 @@
+import numpy as np
+
+import pipeline
+import scenarios
+
+ARRAYS = (("operating", "op_profit"), ("flows", "investor"), ("flows", "company"), ("balance", "balance"))
+
+
+def _assert_same(a, b):
+    for stage, key in ARRAYS:
+        np.testing.assert_allclose(a[stage][key], b[stage][key], err_msg=f"{stage}.{key}")
+    np.testing.assert_allclose(a["npv"]["com_npv"], b["npv"]["com_npv"])
+    np.testing.assert_allclose(a["npv"]["inv_npv"], b["npv"]["inv_npv"])
+    for key in ("inv_irr", "com_irr", "inv_irr_status", "com_irr_status"):
+        np.testing.assert_allclose(a["returns"][key], b["returns"][key], rtol=1e-9, err_msg=key)
+
+
+def test_incremental_updates_match_full_recompute():
+    rng = np.random.default_rng(3)
+    pipe = pipeline.p10_pipeline()
+    # p10.py 와 같이 월별 입력(TOU 단가, 실제 일수)도 함께 넘김
+    params = {**scenarios.P10_DEFAULTS, "kwh_cost_monthly": None, "days_monthly": None}
+    pipe.update(**params)
+    for _ in range(40):
+        params["promo_months"] = int(rng.integers(0, 13))
+        params["daily_kwh"] = float(rng.uniform(5, 50))
+        params["discount_rate_annual"] = float(rng.uniform(0.01, 0.15))
+        params["repayment_year"] = int(rng.integers(1, params["simulation_years"] + 1))
+        _assert_same(pipe.update(**params), pipeline.p10_pipeline().update(**params))
+
+
+def test_irr_does_not_depend_on_update_order():
+    # 회사 현금흐름에 근이 여러 개인 조합 (월 -8.3%, +6.2%) - 직전 상태와 관계없이 처음 계산과 같아야 함
+    params = {**scenarios.P10_DEFAULTS, "kwh_cost_monthly": None, "days_monthly": None,
+              "simulation_years": 3, "investment_amount": 1e6, "daily_kwh": 30, "promo_months": 9,
+              "discount_rate_annual": 0.1}
+    fresh = pipeline.p10_pipeline().update(**params)
+    for key, value in (("promo_months", 0), ("investment_amount", 2e6), ("simulation_years", 5)):
+        pipe = pipeline.p10_pipeline()
+        pipe.update(**{**params, key: value})
+        _assert_same(pipe.update(**params), fresh)
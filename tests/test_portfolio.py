@@ -0,0 +1,52 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import engine
+import portfolio
+import scenarios
+
+SITE = {"daily_kwh": 12.0, "investment_amount": 1000000.0, "normal_price": 300.0}
+
+
+def test_single_site_matches_p10_evaluate():
+    metrics = portfolio.evaluate(pd.DataFrame([SITE]))["metrics"]
+    expected = scenarios.p10_evaluate({k: np.array([v]) for k, v in SITE.items()})
+    for key in metrics.keys() & expected.keys():
+        np.testing.assert_allclose(metrics[key], expected[key][0], rtol=1e-9, atol=1e-6, err_msg=key)
+
+
+def test_offsets_shift_site_schedules():
+    sites = pd.DataFrame([{**SITE, "simulation_years": 7}, {**SITE, "daily_kwh": 30.0, "simulation_years": 5}])
+    sites["install_month"] = [0, 7]
+    monthly = portfolio.evaluate(sites)["monthly"]
+
+    # 사이트별 (0시점 포함) 현금흐름을 설치 시점만큼 밀어 직접 합산
+    investor = np.zeros(len(monthly))
+    company = np.zeros(len(monthly))
+    for (_, site), offset in zip(sites.iterrows(), sites["install_month"]):
+        params = {k: np.array([site[k]]) for k in sites.columns if k in scenarios.P10_DEFAULTS}
+        col, sched, outlay = scenarios.p10_schedule(params)
+        inv = engine.with_initial(sched["investor"], -col["investment_amount"])[0]
+        com = engine.with_initial(sched["company"], -outlay)[0]
+        n = int(col["simulation_years"][0, 0]) * 12 + 1
+        investor[offset:offset + n] += inv[:n]
+        company[offset:offset + n] += com[:n]
+
+    assert len(monthly) == 7 * 12 + 1
+    np.testing.assert_allclose(monthly["investor"], investor, atol=1e-6)
+    np.testing.assert_allclose(monthly["company"], company, atol=1e-6)
+    np.testing.assert_allclose(monthly["balance"], np.cumsum(company), atol=1e-6)
+    np.testing.assert_array_equal(monthly["active_sites"][[0, 1, 7, 8, 67, 68, 84]], [0, 1, 1, 2, 2, 1, 1])
+
+
+def test_install_date_offsets():
+    sites = pd.DataFrame({"install_date": ["2025-03", "2025-01", "2026-02"]})
+    np.testing.assert_array_equal(portfolio.install_offsets(sites), [2, 0, 13])
+
+
+def test_rejects_empty_and_negative_offsets():
+    with pytest.raises(ValueError):
+        portfolio.evaluate(pd.DataFrame(columns=["daily_kwh"]))
+    with pytest.raises(ValueError):
+        portfolio.install_offsets(pd.DataFrame({"install_month": [0, -1]}))
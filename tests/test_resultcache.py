@@ -0,0 +1,27 @@
+import os
+
+import numpy as np
+
+import resultcache
+
+
+def test_model_modules_exist():
+    here = os.path.dirname(os.path.abspath(resultcache.__file__))
+    missing = [name for name in resultcache.MODEL_MODULES if not os.path.exists(os.path.join(here, name))]
+    assert missing == []
+
+
+def test_key_ignores_order_and_numpy_types():
+    a = resultcache.cache_key("p10", {"x": np.float64(2.0), "y": [1, 2]})
+    b = resultcache.cache_key("p10", {"y": (1, 2), "x": 2})
+    assert a == b
+    assert a != resultcache.cache_key("p10", {"x": 2, "y": [1, 2]}, version="other")
+
+
+def test_get_or_compute_reuses_stored_value(tmp_path):
+    cache = resultcache.ResultCache(str(tmp_path / "results.sqlite"))
+    calls = []
+    for _ in range(2):
+        value = cache.get_or_compute("p10", {"x": 1}, lambda: calls.append(1) or {"npv": np.arange(3)})
+    assert len(calls) == 1
+    np.testing.assert_array_equal(value["npv"], np.arange(3))
@@ -0,0 +1,15 @@
+import numpy as np
+import pytest
+
+import rollout
+
+
+@pytest.mark.parametrize("method", ["cumsum", "fft"])
+def test_convolution_matches_direct_sum(method):
+    rng = np.random.default_rng(5)
+    installs = rng.integers(0, 4, 18).astype(float)
+    unit = np.repeat(rng.normal(size=6), 10)    # 구간별 상수 스케줄
+    direct = np.zeros(len(installs) + len(unit) - 1)
+    for month, count in enumerate(installs):
+        direct[month:month + len(unit)] += count * unit
+    np.testing.assert_allclose(rollout.convolve(installs, unit, method=method), direct, atol=1e-9)
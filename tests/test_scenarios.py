@@ -0,0 +1,32 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import scenarios
+
+# 기간이 다른 시나리오를 한 번에 계산해도 행마다 따로 계산한 것과 같아야 함
+MIXED = {
+    "simulation_years": np.array([3, 20, 7, 1]),
+    "daily_kwh": np.array([10.0, 10.0, 40.0, 5.0]),
+    "promo_months": np.array([9, 0, 30, 3]),
+}
+
+
+@pytest.mark.parametrize("method", ["monthly", "closed_form"])
+def test_row_alone_equals_row_in_mixed_batch(method):
+    batch = scenarios.p10_evaluate(MIXED, method=method)
+    for i in range(len(MIXED["simulation_years"])):
+        alone = scenarios.p10_evaluate({k: v[i:i + 1] for k, v in MIXED.items()}, method=method)
+        for key, value in alone.items():
+            np.testing.assert_allclose(value, batch[key][i:i + 1], rtol=1e-9, atol=1e-6, err_msg=f"{i} {key}")
+
+
+def test_unrecovered_month_uses_own_horizon():
+    result = scenarios.p10_evaluate({"simulation_years": [3, 20], "daily_kwh": [10, 10]})
+    assert result["payback_month"][0] == 37
+
+
+def test_chunk_size_does_not_change_rows():
+    table = pd.DataFrame(MIXED)
+    pd.testing.assert_frame_equal(scenarios.evaluate_rows(table, chunk_size=1), scenarios.evaluate_rows(table),
+                                  rtol=1e-9)
@@ -0,0 +1,50 @@
+import numpy as np
+import pytest
+
+import scenarios
+import sensitivity
+
+BASE = {"daily_kwh": 18.0, "investment_amount": 1500000, "normal_price": 295}
+
+
+def _single(params):
+    # 시나리오 하나만 따로 평가
+    result = scenarios.p10_evaluate({k: np.array([v]) for k, v in params.items()})
+    return {metric: float(result[metric][0]) for metric in sensitivity.METRICS}
+
+
+def test_low_high_match_single_scenario_reruns():
+    pct = 15.0
+    table = sensitivity.tornado(BASE, pct=pct).set_index("variable")
+    full = {**scenarios.P10_DEFAULTS, **BASE}
+    base = _single(full)
+    for name, keys in sensitivity.VARIABLES.items():
+        low = _single({**full, **{k: full[k] * (1 - pct / 100) for k in keys}})
+        high = _single({**full, **{k: full[k] * (1 + pct / 100) for k in keys}})
+        for metric in sensitivity.METRICS:
+            row = table.loc[name]
+            np.testing.assert_allclose(row[f"{metric}_base"], base[metric], rtol=1e-9, err_msg=f"{name} {metric}")
+            np.testing.assert_allclose(row[f"{metric}_low"], low[metric], rtol=1e-9, err_msg=f"{name} {metric}")
+            np.testing.assert_allclose(row[f"{metric}_high"], high[metric], rtol=1e-9, err_msg=f"{name} {metric}")
+
+
+def test_sorted_by_npv_swing():
+    table = sensitivity.tornado(BASE)
+    assert (np.diff(table["com_npv_swing"]) <= 0).all()
+
+
+def test_unknown_variable():
+    with pytest.raises(ValueError):
+        sensitivity.tornado(BASE, variables=["nope"])
+
+
+def test_monthly_kwh_cost_scales_with_kwh_cost():
+    years = scenarios.P10_DEFAULTS["simulation_years"]
+    monthly = np.linspace(120.0, 180.0, years * 12)
+    table = sensitivity.tornado({**BASE, "kwh_cost_monthly": monthly}, variables=["kwh_cost"], pct=20.0)
+    full = {**scenarios.P10_DEFAULTS, **BASE}
+    for column, factor in (("com_npv_low", 0.8), ("com_npv_high", 1.2)):
+        params = {k: np.array([v]) for k, v in full.items()}
+        params["kwh_cost_monthly"] = factor * monthly[None, :]
+        expected = scenarios.p10_evaluate(params)["com_npv"][0]
+        np.testing.assert_allclose(table[column][0], expected, rtol=1e-9)
@@ -0,0 +1,80 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import sessions
+
+SEASON = np.array([1.3, 1.2, 1.0, 0.9, 0.8, 0.8, 0.9, 1.0, 1.0, 1.0, 1.0, 1.1])
+SEASON = SEASON / SEASON.mean()
+GROWTH = 0.2
+
+
+def _session_log():
+    # 사이트 A: 3년간 매일 (달마다 추세 × 계절 수준, 하루 2세션으로 나눔)
+    days = pd.date_range("2022-01-01", "2024-12-31", freq="D")
+    months = (days.year - 2022) * 12 + days.month - 1
+    level = 20.0 * (1 + GROWTH) ** (months / 12) * SEASON[days.month - 1]
+    a = pd.DataFrame({"site_id": "A", "start_time": np.repeat(days, 2) + pd.Timedelta(hours=9),
+                      "kwh": np.repeat(level, 2) / 2})
+    # 사이트 B: 200일 중 짝수 날만 세션 (홀수 날은 0 으로 분포에 포함)
+    b_days = pd.date_range("2024-03-01", periods=200, freq="D")[::2]
+    b = pd.DataFrame({"site_id": "B", "start_time": b_days + pd.Timedelta(hours=20),
+                      "kwh": np.arange(len(b_days)) % 17 + 3.0})
+    return pd.concat([a, b]).sample(frac=1, random_state=0)
+
+
+@pytest.fixture(params=["csv", "parquet"])
+def log_path(request, tmp_path):
+    log = _session_log()
+    path = tmp_path / f"sessions.{request.param}"
+    if request.param == "csv":
+        log.to_csv(path, index=False)
+    else:
+        pytest.importorskip("pyarrow")
+        log.to_parquet(path, index=False)
+    return str(path)
+
+
+def test_calibrate_recovers_known_demand(log_path):
+    daily = sessions.daily_totals(log_path, chunk_rows=500, cache_dir=None)
+    table = sessions.calibrate(daily).set_index("site")
+
+    a = table.loc["A"]
+    assert a["days"] == 3 * 365 + 1 and a["sessions"] == 2 * a["days"]
+    np.testing.assert_allclose(a["growth_annual"], GROWTH, rtol=1e-9)
+    np.testing.assert_allclose(a[[f"season_{m}" for m in range(1, 13)]].to_numpy(dtype=float), SEASON, rtol=1e-9)
+
+    # B: 세션 없는 날을 0 으로 넣은 일별 분포와 같음 (첫 세션 ~ 마지막 세션)
+    b = table.loc["B"]
+    every_day = np.zeros(199)
+    every_day[::2] = np.arange(100) % 17 + 3.0
+    assert b["days"] == 199
+    np.testing.assert_allclose(b["daily_kwh"], every_day.mean())
+    np.testing.assert_allclose(b[["daily_kwh_p10", "daily_kwh_p50", "daily_kwh_p90"]].to_numpy(dtype=float),
+                               np.percentile(every_day, [10, 50, 90]))
+    np.testing.assert_allclose(b["daily_kwh_sd"], every_day.std(ddof=1))
+    # 12개월 미만이면 추세·계절 없음
+    assert b["growth_annual"] == 0 and (b[[f"season_{m}" for m in range(1, 13)]] == 1).all()
+
+
+def test_cache_reused_until_file_changes(tmp_path, monkeypatch):
+    path = tmp_path / "sessions.csv"
+    _session_log().to_csv(path, index=False)
+    cache_dir = str(tmp_path / "cache")
+    calls = []
+    parse = sessions._daily_chunk
+    monkeypatch.setattr(sessions, "_daily_chunk", lambda chunk, columns: calls.append(1) or parse(chunk, columns))
+
+    first = sessions.daily_totals(str(path), cache_dir=cache_dir)
+    parsed = len(calls)
+    assert parsed > 0
+    again = sessions.daily_totals(str(path), cache_dir=cache_dir)
+    assert len(calls) == parsed                                  # 같은 파일 → 캐시에서 읽음
+    pd.testing.assert_frame_equal(again, first)
+
+    # 내용이 바뀌면 해시가 달라져 다시 집계
+    with open(path, "a") as f:
+        f.write("C,2024-06-01 10:00:00,7.5\n")
+    changed = sessions.daily_totals(str(path), cache_dir=cache_dir)
+    assert len(calls) > parsed
+    assert "C" in set(changed["site"]) and "C" not in set(first["site"])
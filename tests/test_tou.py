@@ -0,0 +1,49 @@
+import numpy as np
+
+import scenarios
+import tou
+
+FLAT_TARIFF = {"bands": tou.DEFAULT_TARIFF["bands"], "prices": np.full((3, 3), 150.0)}
+FLAT_PROFILE = np.full(24, 1 / 24)
+
+
+def test_flat_tariff_gives_flat_kwh_cost():
+    rolled = tou.monthly_rollup([10.0, 25.0], n_months=26, start="2024-01", tariff=FLAT_TARIFF, profile=FLAT_PROFILE)
+    _, hours = tou.month_hours("2024-01", 26)
+    np.testing.assert_allclose(rolled["kwh_cost"], 150.0)
+    np.testing.assert_allclose(rolled["kwh"], np.array([[10.0], [25.0]]) * hours / 24)
+    np.testing.assert_allclose(rolled["energy_cost"], 150.0 * rolled["kwh"])
+
+
+def test_flat_tou_schedule_equals_plain_schedule():
+    years = scenarios.P10_DEFAULTS["simulation_years"]
+    rolled = tou.monthly_rollup([12.0, 30.0], n_months=years * 12, tariff=FLAT_TARIFF, profile=FLAT_PROFILE)
+    params = {"daily_kwh": np.array([12.0, 30.0]), "kwh_cost": 150}
+    _, plain, _ = scenarios.p10_schedule(params)
+    _, with_tou, _ = scenarios.p10_schedule({**params, "kwh_cost_monthly": rolled["kwh_cost"]})
+    for key in ("investor", "company", "balance"):
+        np.testing.assert_allclose(with_tou[key], plain[key], atol=1e-6)
+
+
+def test_month_hours_follow_calendar():
+    _, hours = tou.month_hours("2024-01", 24)
+    assert hours[1] == 29 * 24 and hours[13] == 28 * 24        # 2024 윤년 2월 / 2025 2월
+    assert hours[:12].sum() == 366 * 24 and hours[12:].sum() == 365 * 24
+    np.testing.assert_array_equal(hours[[0, 3, 6, 10]], np.array([31, 30, 31, 30]) * 24)
+
+
+def test_calendar_hours_and_weekdays():
+    cal = tou.calendar("2025-01", 1, 2)                         # 2025년 2월 ~ 3월
+    assert len(cal["hour"]) == (28 + 31) * 24
+    np.testing.assert_array_equal(cal["month_offsets"], [0, 28 * 24])
+    assert cal["weekend"][0]                                    # 2025-02-01 토요일
+    assert not cal["weekend"][2 * 24]                           # 2025-02-03 월요일
+    assert (cal["season"][:28 * 24] == tou.WINTER).all() and (cal["season"][28 * 24:] == tou.SPRING_FALL).all()
+
+
+def test_chunking_does_not_change_result():
+    daily = np.array([8.0, 15.0, 22.0, 40.0, 5.0])
+    full = tou.monthly_rollup(daily, n_months=30, start="2023-11")
+    chunked = tou.monthly_rollup(daily, n_months=30, start="2023-11", chunk_months=7, chunk_sites=2)
+    for key in full:
+        np.testing.assert_allclose(chunked[key], full[key])
@@ -0,0 +1,117 @@
+import numpy as np
+
+# ==========================================
+# 시간대별(TOU) 전력 요금 - 시간 단위 계산 후 월 단위로 합산
+# ==========================================
+# 사용 예:
+#   rolled = tou.monthly_rollup(daily_kwh=[15, 20, 30], n_months=240, start="2025-01")
+#   rolled["kwh_cost"]   # (사이트 × 월) 월별 실효 전력 단가 = 월 전력 요금 / 월 충전량
+#   scenarios.p10_evaluate({"daily_kwh": [15, 20, 30], "kwh_cost_monthly": rolled["kwh_cost"]})
+#
+# - 계절(여름/봄·가을/겨울) × 시간대(경부하/중간부하/최대부하) 단가를 시간별 충전량에 곱해 월별로 합산합니다.
+# - 시간별 충전량 = 일평균 충전량 × 시간대 비중(profile, 24시간 합 1). 평일/주말 프로필을 따로 줄 수 있고,
+#   load_fn(calendar) 으로 실제 시간별 충전량을 직접 넣을 수도 있습니다.
+# - 20년 × 사이트 수만큼의 시간 배열을 한 번에 만들지 않고, chunk_months 개월 × chunk_sites 개 사이트씩 계산 후
+#   np.add.reduceat 으로 월별 합계만 남기므로 메모리는 chunk 크기에만 비례합니다.
+# - 단가/시간대는 예시 값입니다. 실제 계약 요금표로 tariff 를 바꿔 쓰세요.
+
+SUMMER, SPRING_FALL, WINTER = 0, 1, 2
+OFF_PEAK, MID_PEAK, ON_PEAK = 0, 1, 2
+
+# 달(1~12월) → 계절
+SEASON_OF_MONTH = np.array([WINTER, WINTER, SPRING_FALL, SPRING_FALL, SPRING_FALL, SUMMER,
+                            SUMMER, SUMMER, SPRING_FALL, SPRING_FALL, WINTER, WINTER])
+
+_O, _M, _P = OFF_PEAK, MID_PEAK, ON_PEAK
+DEFAULT_TARIFF = {
+    # 계절별 0~23시 시간대 구분
+    "bands": np.array([
+        [_O] * 8 + [_M] * 2 + [_P] * 2 + [_M] + [_P] * 4 + [_M] * 5 + [_O] * 2,   # 여름
+        [_O] * 8 + [_M] * 2 + [_P] * 2 + [_M] + [_P] * 4 + [_M] * 5 + [_O] * 2,   # 봄·가을
+        [_O] * 8 + [_M] * 1 + [_P] * 3 + [_M] * 4 + [_P] * 3 + [_M] * 3 + [_O] * 2,  # 겨울
+    ]),
+    # 계절 × 시간대 전력량 요금 (원/kWh) [경부하, 중간부하, 최대부하]
+    "prices": np.array([
+        [87.3, 162.6, 237.6],
+        [78.6, 97.4, 112.5],
+        [104.1, 153.5, 201.7],
+    ]),
+}
+
+# 시간대별 충전 비중 예시 (저녁·심야 위주, 24시간 합 1)
+DEFAULT_PROFILE = np.array([
+    6, 5, 4, 3, 2, 2, 2, 3, 4, 4, 4, 4,
+    4, 4, 4, 4, 4, 5, 6, 7, 7, 6, 5, 5,
+], dtype=float)
+DEFAULT_PROFILE /= DEFAULT_PROFILE.sum()
+
+DEFAULT_CHUNK_MONTHS = 12
+DEFAULT_CHUNK_SITES = 1024
+
+
+def month_hours(start, n_months):
+    # 달력 월별 시간 수 (윤년 포함) → (월 시작일, 시간 수)
+    first = np.datetime64(start, "M") + np.arange(n_months)
+    days = ((first + 1).astype("datetime64[D]") - first.astype("datetime64[D]")).astype(np.int64)
+    return first, days * 24
+
+
+def calendar(start, first_month, n_months):
+    # first_month 부터 n_months 개월의 시간별 달력 (각 월은 0시부터 시작)
+    month_start, hours = month_hours(np.datetime64(start, "M") + first_month, n_months)
+    day0 = month_start[0].astype("datetime64[D]").astype(np.int64)
+    h = np.arange(hours.sum())
+    days = day0 + h // 24
+    month_of_year = month_start.astype(np.int64) % 12          # 0 = 1월
+    return {
+        "hour": h % 24,
+        "weekend": (days + 3) % 7 >= 5,                        # 1970-01-01 은 목요일
+        "season": np.repeat(SEASON_OF_MONTH[month_of_year], hours),
+        "month_offsets": np.concatenate([[0], np.cumsum(hours)[:-1]]),
+    }
+
+
+def hourly_price(cal, tariff=DEFAULT_TARIFF):
+    band = tariff["bands"][cal["season"], cal["hour"]]
+    return tariff["prices"][cal["season"], band]
+
+
+def profile_load(daily_kwh, profile=DEFAULT_PROFILE):
+    # 일평균 충전량 × 시간대 비중 → load_fn. profile 이 (2, 24) 면 [평일, 주말]
+    daily_kwh = np.atleast_1d(np.asarray(daily_kwh, dtype=float))
+    profile = np.asarray(profile, dtype=float)
+
+    def load_fn(cal, sites):
+        if profile.ndim == 2:
+            share = profile[cal["weekend"].astype(int), cal["hour"]]
+        else:
+            share = profile[cal["hour"]]
+        return daily_kwh[sites, None] * share[None, :]
+
+    return load_fn, len(daily_kwh)
+
+
+def monthly_rollup(daily_kwh=None, n_months=12, start="2025-01", tariff=DEFAULT_TARIFF, profile=DEFAULT_PROFILE,
+                   load_fn=None, n_sites=None, chunk_months=DEFAULT_CHUNK_MONTHS, chunk_sites=DEFAULT_CHUNK_SITES):
+    # 반환: {"kwh", "energy_cost", "kwh_cost"} (사이트 × 월)
+    # load_fn(calendar, 사이트 인덱스 배열) → (사이트, 시간) 충전량. 없으면 daily_kwh × profile
+    if load_fn is None:
+        load_fn, n_sites = profile_load(daily_kwh, profile)
+    elif n_sites is None:
+        raise ValueError("load_fn 을 쓸 때는 n_sites 가 필요합니다.")
+
+    kwh = np.zeros((n_sites, n_months))
+    cost = np.zeros((n_sites, n_months))
+    for m0 in range(0, n_months, chunk_months):
+        m1 = min(m0 + chunk_months, n_months)
+        cal = calendar(start, m0, m1 - m0)
+        price = hourly_price(cal, tariff)
+        for s0 in range(0, n_sites, chunk_sites):
+            sites = np.arange(s0, min(s0 + chunk_sites, n_sites))
+            load = load_fn(cal, sites)
+            kwh[sites, m0:m1] = np.add.reduceat(load, cal["month_offsets"], axis=-1)
+            cost[sites, m0:m1] = np.add.reduceat(load * price, cal["month_offsets"], axis=-1)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        unit = np.where(kwh > 0, cost / kwh, 0.0)
+    return {"kwh": kwh, "energy_cost": cost, "kwh_cost": unit}